@@ -18,6 +18,7 @@ Arquitectura modular con src/:
 import streamlit as st
 
 from src.core.config import CUSTOM_CSS
+from src.core.database import DB_PATH, init_database
 from src.data import load_or_process_data
 from src.ui import render_sidebar, apply_filters
 from src.ui import render_overview_tab, render_deep_analysis_tab, render_hot_leads_tab, render_concerns_tab
@@ -46,6 +47,22 @@ def render_header() -> None:
     st.markdown("---")
 
 
+def render_migration_warning() -> None:
+    """
+    Prepara el schema de una base existente y avisa si la migración al
+    índice único de clients quitó registros duplicados.
+    """
+    if not DB_PATH.exists():
+        return
+    
+    removed = init_database()
+    if removed:
+        st.warning(
+            f"⚠️ Se quitaron {removed} registros duplicados al actualizar la base de datos. "
+            "Quedaron respaldados en la tabla clients_duplicates_backup."
+        )
+
+
 def validate_filtered_data(df_filtered) -> bool:
     """
     Valida que hay datos después de aplicar filtros.
@@ -62,12 +79,13 @@ def validate_filtered_data(df_filtered) -> bool:
     return True
 
 
-def render_tabs(df_filtered) -> None:
+def render_tabs(df_filtered, filters) -> None:
     """
     Renderiza las pestañas principales del dashboard.
     
     Args:
         df_filtered: DataFrame filtrado con los datos
+        filters: Filtros del sidebar (los agregados por grupo se calculan en SQLite)
     """
     tab1, tab2, tab3, tab4 = st.tabs([
         "📈 Overview",
@@ -77,10 +95,10 @@ def render_tabs(df_filtered) -> None:
     ])
     
     with tab1:
-        render_overview_tab(df_filtered)
+        render_overview_tab(df_filtered, filters)
     
     with tab2:
-        render_deep_analysis_tab(df_filtered)
+        render_deep_analysis_tab(df_filtered, filters)
     
     with tab3:
         render_hot_leads_tab(df_filtered)
@@ -95,12 +113,15 @@ def main() -> None:
     
     Flujo:
     1. Configurar página
-    2. Intentar cargar datos desde SQLite
-    3. Si no hay datos: mostrar pantalla de carga inicial
-    4. Si hay datos: mostrar dashboard con filtros y métricas
+    2. Preparar la base existente (avisa de duplicados quitados)
+    3. Intentar cargar datos desde SQLite
+    4. Si no hay datos: mostrar pantalla de carga inicial
+    5. Si hay datos: mostrar dashboard con filtros y métricas
     """
     configure_page()
     
+    render_migration_warning()
+    
     df = load_or_process_data()
     
     if df is None:
@@ -116,7 +137,7 @@ def main() -> None:
     if not validate_filtered_data(df_filtered):
         st.stop()
     
-    render_tabs(df_filtered)
+    render_tabs(df_filtered, filters)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+🔁 RE-CATEGORIZACIÓN SELECTIVA
+Vuelve a categorizar solo los leads que lo necesitan.
+
+Por defecto toma los leads con categorization_success = 0 (equivale al
+botón "Reintentar Fallidas" del sidebar). Con --stale toma los leads
+categorizados con otra versión de instrucciones/schema/modelo, primero
+los abiertos, hasta --budget por ejecución. Las filas se toman de SQLite,
+pasan por el pipeline de batches y se actualizan por id; el resto de la
+base no se toca. Si se interrumpe, la siguiente ejecución retoma desde el
+último checkpoint.
+
+Uso:
+    python recategorize.py
+    python recategorize.py --rpm 5 --threads 2
+    python recategorize.py --stale --budget 100   # programable con cron
+"""
+
+import argparse
+import sys
+
+from src.core.ai.config import GEMINI_API_KEY, configure_gemini
+from src.core.ai.defaults import (
+    MAX_CONCURRENT_BATCHES,
+    REQUESTS_PER_MINUTE,
+    STALE_RECATEGORIZATION_BUDGET,
+    TOKENS_PER_MINUTE
+)
+from src.core.ai.concurrency import configure_concurrency_controller
+from src.core.ai.rate_limiter import configure_rate_limiter
+from src.core.ai.versioning import get_categorization_version, get_current_versions
+from src.core.database import count_failed_categorizations, count_stale_categorizations
+from src.data.recategorize import recategorize_stale_rows, retry_failed_categorizations
+
+
+def parse_args() -> argparse.Namespace:
+    """Define los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Re-categoriza los leads fallidos o desactualizados")
+    parser.add_argument("--stale", action="store_true",
+                        help="Re-categorizar los leads de una versión anterior del prompt/schema/modelo")
+    parser.add_argument("--budget", type=int, default=STALE_RECATEGORIZATION_BUDGET,
+                        help="Máximo de leads desactualizados por ejecución (con --stale)")
+    parser.add_argument("--threads", type=int, default=MAX_CONCURRENT_BATCHES,
+                        help="Batches en paralelo")
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE,
+                        help="Requests por minuto")
+    parser.add_argument("--tpm", type=int, default=TOKENS_PER_MINUTE,
+                        help="Tokens por minuto")
+    return parser.parse_args()
+
+
+def report_progress(current: int, total: int) -> None:
+    """Muestra el avance en una sola línea de la consola."""
+    print(f"   {current}/{total} transcripciones", end="\r")
+
+
+def retry_failed() -> None:
+    """Re-categoriza las filas fallidas."""
+    failed_count = count_failed_categorizations()
+    if failed_count == 0:
+        print("✅ No hay leads con categorización fallida")
+        return
+    
+    print(f"🔁 Reintentando {failed_count} categorizaciones fallidas")
+    summary = retry_failed_categorizations(progress_callback=report_progress)
+    
+    print(f"✅ {summary['recovered']} de {summary['failed']} leads categorizados correctamente")
+    if summary["still_failed"] > 0:
+        print(f"⚠️ {summary['still_failed']} leads siguen con categorización fallida")
+
+
+def recategorize_stale(budget: int) -> None:
+    """Re-categoriza hasta `budget` filas de versiones anteriores."""
+    version = get_categorization_version()
+    stale_count = count_stale_categorizations(get_current_versions())
+    if stale_count == 0:
+        print(f"✅ Todos los leads están categorizados con la versión {version}")
+        return
+    
+    print(f"🔁 {stale_count} leads desactualizados respecto de la versión {version}; se procesan hasta {budget}")
+    summary = recategorize_stale_rows(budget, progress_callback=report_progress)
+    
+    print(f"✅ {summary['updated']} de {summary['selected']} leads actualizados a la versión {summary['version']}")
+    if summary["remaining"] > 0:
+        print(f"⏭️ Quedan {summary['remaining']} leads desactualizados para la próxima ejecución")
+
+
+def main() -> None:
+    """Configura Gemini y re-categoriza las filas fallidas o desactualizadas."""
+    args = parse_args()
+    
+    if not GEMINI_API_KEY:
+        print("⚠️ GEMINI_API_KEY no está configurada. Por favor, configura la variable de entorno.")
+        sys.exit(1)
+    
+    configure_gemini()
+    configure_rate_limiter(args.rpm, args.tpm)
+    configure_concurrency_controller(args.threads, max_limit=args.threads)
+    
+    print(f"⚙️ {args.rpm} RPM, {args.threads} hilos")
+    
+    if args.stale:
+        recategorize_stale(args.budget)
+    else:
+        retry_failed()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark de la compactación de transcripciones.
+
+Mide la reducción de tokens de compact_transcript (modo normal y solo
+señales) y verifica offline que no se pierda información respecto de las
+categorizaciones ya guardadas en la base:
+- frases de ejemplo de las preocupaciones que siguen presentes en el texto compactado
+- campos de la pre-extracción local que no cambian al compactar
+Con --live además recategoriza una muestra con el texto compactado y
+compara campo por campo contra lo guardado.
+
+Uso:
+    python -m scripts.benchmark_compaction [archivo.csv] [--cues-only] [--live] [--sample N]
+    
+Sin archivo se usan las transcripciones categorizadas de la base; si la
+base está vacía, un set sintético. El CSV debe tener "Nombre" y
+"Transcripcion" (y opcionalmente las columnas de categorización).
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from src.core.ai.client import call_gemini_api
+from src.core.ai.compaction import compact_transcript, learn_boilerplate
+from src.core.ai.config import configure_gemini
+from src.core.ai.local_extractor import extract_local_fields
+from src.core.ai.near_duplicates import normalize_transcript
+from src.core.ai.prompts import build_single_categorization_prompt
+from src.core.ai.response_schema import get_response_schema
+from src.core.ai.tokens import estimate_tokens
+from src.core.database import load_processed_data
+from scripts.benchmark_pre_extraction import build_synthetic_transcripts
+
+
+_SCALAR_FIELDS = (
+    "sector_principal", "volumen_nivel", "es_pico_estacional", "fuente_primaria", "urgencia_nivel"
+)
+
+_SYNTHETIC_GREETINGS = [
+    "Hola, buenos días. ¿Cómo estás? Muy bien, gracias por el espacio.",
+    "Buenas tardes, eh, gracias por conectarte. Sí, sí, perfecto.",
+]
+_SYNTHETIC_CLOSINGS = [
+    "Perfecto, quedamos atentos. Muchas gracias, que tengas buen día.",
+    "Genial, gracias. Hablamos pronto, saludos.",
+]
+
+
+def load_corpus(csv_path: Optional[str], synthetic: int) -> pd.DataFrame:
+    """
+    Carga las transcripciones a evaluar.
+    
+    Args:
+        csv_path: CSV opcional
+        synthetic: Cantidad de transcripciones sintéticas si no hay datos
+        
+    Returns:
+        DataFrame con Nombre, Transcripcion y, si existen, las categorías guardadas
+    """
+    if csv_path:
+        return pd.read_csv(csv_path).dropna(subset=["Transcripcion"])
+    
+    df = load_processed_data()
+    if df is not None and not df.empty:
+        return df[df["_categorization_success"]]
+    
+    rng = random.Random(11)
+    transcripts, names = build_synthetic_transcripts(synthetic)
+    transcripts = [
+        f"{rng.choice(_SYNTHETIC_GREETINGS)}   {t}  Mmm, bueno bueno.  {rng.choice(_SYNTHETIC_CLOSINGS)}"
+        for t in transcripts
+    ]
+    return pd.DataFrame({"Nombre": names, "Transcripcion": transcripts})
+
+
+def run_offline(df: pd.DataFrame, cues_only: bool) -> Dict[str, Any]:
+    """
+    Compacta el corpus y mide tokens, tiempos y retención de información.
+    
+    Args:
+        df: Corpus (ver load_corpus)
+        cues_only: Si True compacta en modo solo señales
+        
+    Returns:
+        Dict con métricas y las transcripciones compactadas
+    """
+    transcripts = df["Transcripcion"].astype(str).tolist()
+    
+    start = time.perf_counter()
+    boilerplate = learn_boilerplate(transcripts)
+    learn_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    compacted = [compact_transcript(t, cues_only=cues_only, boilerplate=boilerplate) for t in transcripts]
+    compaction_ms = (time.perf_counter() - start) * 1000
+    
+    quotes = quotes_kept = 0
+    if "preocupaciones" in df.columns:
+        for concerns, text in zip(df["preocupaciones"], compacted):
+            normalized = normalize_transcript(text)
+            for concern in concerns if isinstance(concerns, list) else []:
+                quote = normalize_transcript(concern.get("ejemplo_frase", ""))
+                if quote:
+                    quotes += 1
+                    quotes_kept += quote in normalized
+    
+    local_changes: Dict[str, int] = {}
+    for raw, text in zip(transcripts, compacted):
+        before, after = extract_local_fields(raw), extract_local_fields(text)
+        for field in before:
+            if before[field]["value"] != after[field]["value"]:
+                local_changes[field] = local_changes.get(field, 0) + 1
+    
+    return {
+        "transcripts": len(transcripts),
+        "boilerplate_phrases": sorted(boilerplate),
+        "learn_ms": learn_ms,
+        "compaction_ms": compaction_ms,
+        "raw_tokens": sum(estimate_tokens(t) for t in transcripts),
+        "compact_tokens": sum(estimate_tokens(t) for t in compacted),
+        "quotes": quotes,
+        "quotes_kept": quotes_kept,
+        "local_changes": local_changes,
+        "compacted": compacted,
+    }
+
+
+def run_live(df: pd.DataFrame, compacted: List[str], sample: int) -> Dict[str, Any]:
+    """
+    Recategoriza una muestra con el texto compactado y la compara con lo guardado.
+    
+    Args:
+        df: Corpus con las categorías guardadas
+        compacted: Transcripciones compactadas alineadas con df
+        sample: Cantidad máxima de transcripciones a enviar
+        
+    Returns:
+        Dict con la concordancia por campo (0-1) y la latencia
+    """
+    configure_gemini()
+    
+    agreement: Dict[str, List[bool]] = {field: [] for field in (*_SCALAR_FIELDS, "preocupaciones", "potencial_upsell")}
+    latencies = []
+    
+    for (_, row), text in list(zip(df.iterrows(), compacted))[:sample]:
+        prompt = build_single_categorization_prompt(text, str(row["Nombre"]), native_schema=True)
+        start = time.perf_counter()
+        result = call_gemini_api(prompt, response_schema=get_response_schema())
+        latencies.append(time.perf_counter() - start)
+        
+        for field in _SCALAR_FIELDS:
+            agreement[field].append(result.get(field) == row[field])
+        agreement["preocupaciones"].append(
+            {c.get("tipo") for c in result.get("preocupaciones", [])} == {c.get("tipo") for c in row["preocupaciones"]}
+        )
+        agreement["potencial_upsell"].append(set(result.get("potencial_upsell", [])) == set(row["potencial_upsell"]))
+    
+    return {
+        "agreement": {field: sum(values) / len(values) for field, values in agreement.items() if values},
+        "latency_p50": statistics.median(latencies) if latencies else 0.0,
+    }
+
+
+def _print_report(offline: Dict[str, Any], live: Optional[Dict[str, Any]] = None) -> None:
+    """Imprime el reporte."""
+    raw, compact = offline["raw_tokens"], offline["compact_tokens"]
+    
+    print(f"📊 {offline['transcripts']} transcripciones")
+    print(
+        f"⏱️ Aprendizaje de frases: {offline['learn_ms']:.1f} ms · "
+        f"compactación: {offline['compaction_ms']:.1f} ms "
+        f"({offline['compaction_ms'] / max(1, offline['transcripts']):.3f} ms por transcripción)"
+    )
+    print(f"📥 Tokens de transcripciones (estimados): {raw:,} → {compact:,} ({(compact - raw) / raw if raw else 0:+.1%})")
+    print(f"🧹 {len(offline['boilerplate_phrases'])} frases de cortesía aprendidas")
+    for phrase in offline["boilerplate_phrases"][:10]:
+        print(f"   «{phrase}»")
+    
+    if offline["quotes"]:
+        print(
+            f"🔎 Frases de ejemplo conservadas: {offline['quotes_kept']}/{offline['quotes']} "
+            f"({offline['quotes_kept'] / offline['quotes']:.1%})"
+        )
+    if offline["local_changes"]:
+        for field, count in sorted(offline["local_changes"].items()):
+            print(f"⚠️ Pre-extracción distinta tras compactar en {field}: {count} transcripciones")
+    else:
+        print("✅ La pre-extracción local da los mismos valores con y sin compactar")
+    
+    if live:
+        print(f"🌐 Latencia p50: {live['latency_p50']:.2f}s")
+        for field, ratio in live["agreement"].items():
+            print(f"   {field}: {ratio:.0%} igual a lo guardado")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de compactación de transcripciones")
+    parser.add_argument("csv", nargs="?", help="CSV con columnas Nombre y Transcripcion")
+    parser.add_argument("--cues-only", action="store_true", help="Conservar solo las oraciones con señales")
+    parser.add_argument("--live", action="store_true", help="Recategorizar con Gemini y comparar con lo guardado")
+    parser.add_argument("--sample", type=int, default=20, help="Transcripciones a recategorizar con --live")
+    parser.add_argument("--synthetic", type=int, default=200, help="Cantidad de transcripciones sintéticas")
+    args = parser.parse_args()
+    
+    df = load_corpus(args.csv, args.synthetic)
+    offline = run_offline(df, args.cues_only)
+    
+    live = None
+    if args.live:
+        if "sector_principal" not in df.columns:
+            print("⚠️ --live necesita categorizaciones guardadas para comparar")
+        else:
+            live = run_live(df, offline["compacted"], args.sample)
+    
+    _print_report(offline, live)
+
+
+if __name__ == "__main__":
+    main()
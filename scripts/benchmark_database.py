@@ -0,0 +1,316 @@
+"""
+Micro-benchmark de carga y guardado incremental en SQLite.
+
+Compara dos modos sobre la misma base y los mismos datos:
+- legacy: cada función abre y cierra su conexión (rollback journal), y
+  init_database() re-ejecuta el DDL en cada llamada, como antes de
+  connection.py
+- shared: load_processed_data / append_processed_data actuales, con la
+  conexión por thread en WAL y los pragmas de config.py
+  
+Cada modo corre en un directorio temporal. Además de la latencia aislada
+de cada operación se mide un escenario mixto: --readers threads cargan
+la base en bucle (sesiones de Streamlit) mientras se agregan filas.
+
+Para cada --snapshot-sizes se compara load_processed_data leyendo
+SQLite, reconstruyendo el snapshot Arrow (primera carga después de una
+escritura) y leyendo el snapshot vigente.
+
+Uso:
+    python -m scripts.benchmark_database [--rows 5000] [--append-rows 50]
+        [--repeat 30] [--readers 4] [--snapshot-sizes 10000 100000]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Any, List, Set, Tuple
+
+import pandas as pd
+
+from scripts.benchmark_pipeline import build_dataset
+from src.core.ai.defaults import get_default_categorization
+from src.core.database import append_processed_data, load_processed_data, save_processed_data
+from src.core.database.config import DB_PATH, SNAPSHOT_PATH
+from src.core.database.connection import close_connections, get_connection, transaction
+from src.core.database.crud import _INSERT_CLIENT, _load_from_database
+from src.core.database.snapshot import bump_generation
+from src.core.database.serialization import dataframe_to_records, records_to_dataframe
+from src.data.transformer import expand_categories_to_dataframe
+from src.data.validation import normalize_dataframe
+
+
+_LOAD_QUERY = """
+    SELECT
+        client_name, correo_electronico, numero_telefono, fecha_reunion,
+        vendedor_asignado, closed, transcript,
+        sector_principal, sector_secundario,
+        volumen_numerico, volumen_nivel, es_pico_estacional,
+        fuente_primaria, fuente_detalle, preocupaciones,
+        urgencia_nivel, potencial_upsell, categorization_success, categorization_version
+    FROM clients
+    ORDER BY id
+"""
+
+
+def build_processed(size: int, offset: int = 0) -> pd.DataFrame:
+    """
+    Genera filas ya categorizadas listas para guardar.
+    
+    Args:
+        size: Cantidad de filas
+        offset: Desplazamiento de los nombres (para filas nuevas, no duplicadas)
+        
+    Returns:
+        DataFrame con columnas del CSV + categorías
+    """
+    df = normalize_dataframe(build_dataset(size, seed=offset + 11))
+    df["Nombre"] = [f"Cliente {offset + i + 1}" for i in range(size)]
+    categories = [get_default_categorization() for _ in range(size)]
+    return expand_categories_to_dataframe(df, categories)
+
+
+class LegacyDatabase:
+    """Reproduce el acceso anterior: una conexión nueva por función."""
+    
+    def __init__(self):
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        self._ddl = [
+            re.sub(r"^CREATE (UNIQUE )?(TABLE|INDEX) ", r"CREATE \1\2 IF NOT EXISTS ", sql)
+            for (sql,) in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+        conn.close()
+    
+    def _init_database(self) -> None:
+        conn = sqlite3.connect(DB_PATH)
+        for statement in self._ddl:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+    
+    def _has_data(self) -> bool:
+        conn = sqlite3.connect(DB_PATH)
+        count = conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+        conn.close()
+        return count > 0
+    
+    def _existing_keys(self) -> Set[Tuple[str, str, str]]:
+        if not self._has_data():
+            return set()
+        conn = sqlite3.connect(DB_PATH)
+        keys = set(conn.execute("SELECT client_name, correo_electronico, fecha_reunion FROM clients"))
+        conn.close()
+        return keys
+    
+    def load(self) -> pd.DataFrame:
+        """Equivalente a load_processed_data()."""
+        self._has_data()
+        self._init_database()
+        conn = sqlite3.connect(DB_PATH)
+        df_raw = pd.read_sql_query(_LOAD_QUERY, conn)
+        conn.close()
+        return records_to_dataframe(df_raw)
+    
+    def append(self, df_new: pd.DataFrame) -> int:
+        """Equivalente a append_processed_data()."""
+        self._init_database()
+        existing = self._existing_keys()
+        mask = [
+            (row.get("Nombre"), row.get("Correo Electronico", ""), str(row.get("Fecha de la Reunion", "")))
+            not in existing
+            for _, row in df_new.iterrows()
+        ]
+        records = dataframe_to_records(df_new[mask])
+        conn = sqlite3.connect(DB_PATH)
+        conn.executemany(_INSERT_CLIENT, records)
+        conn.commit()
+        conn.close()
+        return len(records)
+
+
+class SharedDatabase:
+    """Funciones actuales del paquete database."""
+    
+    def load(self) -> pd.DataFrame:
+        return load_processed_data()
+    
+    def append(self, df_new: pd.DataFrame) -> int:
+        return append_processed_data(df_new)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95 en milisegundos."""
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    }
+
+
+def _timed(operation: Callable[[], Any], repeat: int) -> List[float]:
+    """Ejecuta una operación `repeat` veces y retorna las duraciones."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_mode(mode: str, rows: int, append_rows: int, repeat: int, readers: int) -> Dict[str, Any]:
+    """
+    Mide un modo de acceso en un directorio temporal con `rows` filas iniciales.
+    
+    Args:
+        mode: "legacy" o "shared"
+        rows: Filas guardadas antes de medir
+        append_rows: Filas nuevas por cada append
+        repeat: Repeticiones por operación
+        readers: Threads que cargan la base durante el escenario mixto
+        
+    Returns:
+        Dict con percentiles de load, append, append con lectores y
+        carga de los lectores, y errores de los lectores
+    """
+    initial = build_processed(rows)
+    batches = [build_processed(append_rows, offset=rows + i * append_rows) for i in range(repeat * 2)]
+    original_dir = os.getcwd()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            save_processed_data(initial)
+            close_connections()
+            database = LegacyDatabase() if mode == "legacy" else SharedDatabase()
+            database.load()
+            
+            load_samples = _timed(database.load, repeat)
+            pending = iter(batches)
+            append_samples = _timed(lambda: database.append(next(pending)), repeat)
+            
+            stop = threading.Event()
+            reader_samples: List[float] = []
+            reader_errors: List[str] = []
+            
+            def reader() -> None:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        database.load()
+                    except sqlite3.OperationalError as e:
+                        reader_errors.append(str(e))
+                    reader_samples.append(time.perf_counter() - start)
+            
+            threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+            for thread in threads:
+                thread.start()
+            mixed_samples = _timed(lambda: database.append(next(pending)), repeat)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            
+            close_connections()
+        finally:
+            os.chdir(original_dir)
+    
+    return {
+        "mode": mode,
+        "load": _percentiles(load_samples),
+        "append": _percentiles(append_samples),
+        "mixed_append": _percentiles(mixed_samples),
+        "mixed_load": _percentiles(reader_samples) if reader_samples else None,
+        "reader_errors": len(reader_errors),
+    }
+
+
+def run_snapshot(size: int, repeat: int) -> Dict[str, Any]:
+    """
+    Mide las tres formas de load_processed_data con `size` filas.
+    
+    Args:
+        size: Filas guardadas
+        repeat: Repeticiones por variante
+        
+    Returns:
+        Dict con percentiles de sql, rebuild y snapshot, y el tamaño del archivo
+    """
+    processed = build_processed(size)
+    original_dir = os.getcwd()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            save_processed_data(processed)
+            sql_samples = _timed(lambda: _load_from_database(get_connection()), repeat)
+            
+            rebuild_samples = []
+            for _ in range(repeat):
+                with transaction() as conn:
+                    bump_generation(conn)
+                rebuild_samples.extend(_timed(load_processed_data, 1))
+            
+            snapshot_samples = _timed(load_processed_data, repeat)
+            snapshot_bytes = SNAPSHOT_PATH.stat().st_size
+            close_connections()
+        finally:
+            os.chdir(original_dir)
+    
+    return {
+        "size": size,
+        "sql": _percentiles(sql_samples),
+        "rebuild": _percentiles(rebuild_samples),
+        "snapshot": _percentiles(snapshot_samples),
+        "snapshot_mb": snapshot_bytes / 1024 / 1024,
+    }
+
+
+def _print_snapshot_report(result: Dict[str, Any]) -> None:
+    """Imprime el resultado del snapshot para un tamaño."""
+    print(f"\n🧊 snapshot · {result['size']:,} filas ({result['snapshot_mb']:.1f} MB)")
+    for label, key in [("SQLite", "sql"), ("reconstrucción", "rebuild"), ("snapshot vigente", "snapshot")]:
+        stats = result[key]
+        print(f"   ⏱️ {label}: p50 {stats['p50']:.1f}ms · p95 {stats['p95']:.1f}ms")
+
+
+def _print_report(result: Dict[str, Any], readers: int) -> None:
+    """Imprime el resultado de un modo."""
+    print(f"\n🗄️ {result['mode']}")
+    for label, key in [("load", "load"), ("append", "append"), (f"append + {readers} lectores", "mixed_append")]:
+        stats = result[key]
+        print(f"   ⏱️ {label}: p50 {stats['p50']:.1f}ms · p95 {stats['p95']:.1f}ms")
+    if result["mixed_load"]:
+        stats = result["mixed_load"]
+        print(
+            f"   👀 load de los lectores: p50 {stats['p50']:.1f}ms · p95 {stats['p95']:.1f}ms · "
+            f"{result['reader_errors']} errores"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de carga/guardado en SQLite")
+    parser.add_argument("--rows", type=int, default=5000, help="Filas en la base antes de medir")
+    parser.add_argument("--append-rows", type=int, default=50, help="Filas nuevas por append")
+    parser.add_argument("--repeat", type=int, default=30, help="Repeticiones por operación")
+    parser.add_argument("--readers", type=int, default=4, help="Threads lectores en el escenario mixto")
+    parser.add_argument("--snapshot-sizes", type=int, nargs="*", default=[10000, 100000],
+                        help="Filas para comparar SQLite vs snapshot (vacío para omitir)")
+    args = parser.parse_args()
+    
+    for mode in ("legacy", "shared"):
+        result = run_mode(mode, args.rows, args.append_rows, args.repeat, args.readers)
+        _print_report(result, args.readers)
+    
+    for size in args.snapshot_sizes:
+        _print_snapshot_report(run_snapshot(size, min(args.repeat, 10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark offline del pipeline ingesta → categorización → guardado.
+
+No necesita API key: usa SyntheticProvider (latencia, errores 429 y JSON
+malformado configurables) o ReplayProvider con respuestas grabadas
+previamente con AI_PROVIDER=record. Cada tamaño corre en un directorio
+temporal, con base de datos y caché vacíos.
+
+Uso:
+    python -m scripts.benchmark_pipeline [--sizes 1000 10000] [--latency 0.5]
+        [--rate-limit-rate 0.02] [--malformed-rate 0.02] [--threads 4] [--replay]
+        
+Reporta transcripciones/segundo, latencia p50/p95 por llamada de batch,
+llamadas extra (reintentos y re-envíos parciales) y resultados por defecto.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Any
+
+import pandas as pd
+
+from src.core.ai.batch import batch_categorize_with_progress
+from src.core.ai.concurrency import configure_concurrency_controller
+from src.core.ai.defaults import MAX_CONCURRENT_BATCHES
+from src.core.ai.planner import plan_batches
+from src.core.ai.providers import ReplayProvider, SyntheticProvider, ResponseProvider, set_provider
+from src.core.ai.rate_limiter import configure_rate_limiter
+from src.core.database import save_processed_data
+from src.data.transformer import expand_categories_to_dataframe
+from src.data.validation import normalize_dataframe
+
+
+_SECTORS = ["un e-commerce de ropa", "una clínica dental", "una consultora", "una startup SaaS", "un restaurante"]
+_SOURCES = ["un webinar", "una recomendación", "LinkedIn", "una conferencia", "Google"]
+
+
+def build_dataset(size: int, seed: int = 11) -> pd.DataFrame:
+    """
+    Genera un archivo de carga sintético con las columnas requeridas.
+    
+    Args:
+        size: Cantidad de filas
+        seed: Semilla para reproducibilidad
+        
+    Returns:
+        DataFrame con el formato de un CSV subido
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        transcript = (
+            f"Somos {rng.choice(_SECTORS)} y los conocimos por {rng.choice(_SOURCES)}. "
+            f"Recibimos cerca de {rng.randint(10, 300)} consultas diarias y en temporada alta se duplican. "
+            "Nos preocupa la integración con nuestro CRM y mantener el tono de marca. " * rng.randint(1, 4)
+        )
+        rows.append({
+            "Nombre": f"Cliente {i + 1}",
+            "Correo Electronico": f"cliente{i + 1}@empresa.com",
+            "Numero de Telefono": f"+56 9 {rng.randint(10000000, 99999999)}",
+            "Fecha de la Reunion": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "Vendedor asignado": rng.choice(["Ana", "Bruno", "Carla"]),
+            "closed": rng.choice([0, 1]),
+            "Transcripcion": transcript,
+        })
+    return pd.DataFrame(rows)
+
+
+def run_pipeline(size: int, provider: ResponseProvider, threads: int) -> Dict[str, Any]:
+    """
+    Ejecuta el pipeline completo en un directorio temporal.
+    
+    Args:
+        size: Cantidad de transcripciones
+        provider: Proveedor de respuestas
+        threads: Batches en paralelo
+        
+    Returns:
+        Dict con tiempos por etapa y métricas del proveedor
+    """
+    provider.reset_stats()
+    set_provider(provider)
+    controller = configure_concurrency_controller(threads, max_limit=threads)
+    
+    timings = {}
+    original_dir = os.getcwd()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            start = time.perf_counter()
+            df = normalize_dataframe(build_dataset(size))
+            timings["ingest"] = time.perf_counter() - start
+            
+            transcripts = df["Transcripcion"].tolist()
+            names = df["Nombre"].tolist()
+            planned_batches = len(plan_batches(transcripts))
+            
+            start = time.perf_counter()
+            categories = batch_categorize_with_progress(transcripts, names, max_workers=threads)
+            timings["categorize"] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            save_processed_data(expand_categories_to_dataframe(df, categories))
+            timings["save"] = time.perf_counter() - start
+        finally:
+            os.chdir(original_dir)
+    
+    stats = provider.get_stats()
+    total = sum(timings.values())
+    
+    return {
+        "size": size,
+        "timings": timings,
+        "throughput": size / total if total else 0.0,
+        "categorize_throughput": size / timings["categorize"] if timings["categorize"] else 0.0,
+        "planned_batches": planned_batches,
+        "calls": stats["calls"],
+        "errors": stats["errors"],
+        "extra_calls": stats["calls"] - planned_batches,
+        "latency": stats["latency"],
+        "concurrency": controller.get_stats(),
+        "defaults": sum(1 for c in categories if not c.get("_categorization_success", False)),
+    }
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    """Imprime el resultado de un tamaño."""
+    timings = result["timings"]
+    latency = result["latency"]
+    print(f"\n📊 {result['size']:,} transcripciones")
+    print(
+        f"   ⏱️ ingesta {timings['ingest']:.2f}s · categorización {timings['categorize']:.2f}s · "
+        f"guardado {timings['save']:.2f}s"
+    )
+    print(
+        f"   🚀 {result['throughput']:.1f} transcripciones/s end-to-end "
+        f"({result['categorize_throughput']:.1f}/s solo categorización)"
+    )
+    print(f"   📦 latencia por batch: p50 {latency['p50']:.2f}s · p95 {latency['p95']:.2f}s")
+    print(
+        f"   🔁 {result['calls']} llamadas para {result['planned_batches']} batches "
+        f"({result['extra_calls']} extra, {result['errors']} con error) · "
+        f"{result['defaults']} resultados por defecto"
+    )
+    concurrency = result["concurrency"]
+    print(
+        f"   🚦 concurrencia final {concurrency['limit']} · {concurrency['rate_limited']} rechazos 429 · "
+        f"{concurrency['circuit_opens']} pausas ({concurrency['held_seconds']:.1f}s de espera acumulada)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark offline del pipeline de categorización")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--threads", type=int, default=MAX_CONCURRENT_BATCHES)
+    parser.add_argument("--latency", type=float, default=0.5, help="Latencia base por llamada (s)")
+    parser.add_argument("--latency-per-item", type=float, default=0.1, help="Latencia por transcripción (s)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probabilidad de error 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Probabilidad de JSON truncado")
+    parser.add_argument("--rpm", type=int, default=0, help="Límite de requests/minuto (0 = sin límite)")
+    parser.add_argument("--replay", action="store_true", help="Usar respuestas grabadas en lugar del simulador")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    configure_rate_limiter(args.rpm or 1_000_000, 1_000_000_000)
+    
+    for size in args.sizes:
+        if args.replay:
+            provider = ReplayProvider()
+        else:
+            provider = SyntheticProvider(
+                latency=args.latency,
+                latency_per_item=args.latency_per_item,
+                rate_limit_rate=args.rate_limit_rate,
+                malformed_rate=args.malformed_rate,
+                seed=args.seed
+            )
+        _print_report(run_pipeline(size, provider, args.threads))
+
+
+if __name__ == "__main__":
+    main()
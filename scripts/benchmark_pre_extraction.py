@@ -0,0 +1,186 @@
+"""
+Benchmark de la pre-extracción local de campos.
+
+Compara los prompts de batch con y sin "campos ya resueltos": tokens de
+entrada, tokens de salida estimados y cobertura por campo. Con --live
+además envía ambos prompts a Gemini y mide latencia y tokens reales.
+
+Uso:
+    python -m scripts.benchmark_pre_extraction [archivo.csv] [--live] [--batch-size N]
+    
+El CSV debe tener las columnas "Nombre" y "Transcripcion". Sin archivo se
+usa un set sintético de transcripciones.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Dict, Any, List, Tuple
+
+import pandas as pd
+
+from src.core.ai.client import call_gemini_batch_api_raw
+from src.core.ai.config import configure_gemini
+from src.core.ai.defaults import MAX_BATCH_ITEMS
+from src.core.ai.local_extractor import extract_local_fields, get_confident_fields
+from src.core.ai.prompts import build_batch_categorization_prompt
+from src.core.ai.tokens import estimate_tokens, OUTPUT_TOKENS_PER_ITEM
+
+
+_SYNTHETIC_VOLUMES = [
+    "Recibimos cerca de {n} consultas diarias por WhatsApp.",
+    "Manejamos unas {n} interacciones semanales entre correo y chat.",
+    "Son aproximadamente {n} mensajes mensuales.",
+    "Tenemos bastante demanda, pero no sabría darte un número exacto.",
+]
+_SYNTHETIC_PEAKS = [
+    "En temporada alta el volumen se duplica.",
+    "Con las promociones tenemos picos difíciles de cubrir.",
+    "",
+]
+
+
+def build_synthetic_transcripts(count: int, seed: int = 7) -> Tuple[List[str], List[str]]:
+    """
+    Genera transcripciones sintéticas con menciones de volumen y estacionalidad.
+    
+    Args:
+        count: Cantidad de transcripciones
+        seed: Semilla para reproducibilidad
+        
+    Returns:
+        Tupla (transcripciones, nombres)
+    """
+    rng = random.Random(seed)
+    transcripts = []
+    for _ in range(count):
+        volume = rng.choice(_SYNTHETIC_VOLUMES).format(n=rng.choice([40, 80, 150, 300, 600, 2000]))
+        transcripts.append(
+            "Somos una empresa mediana y nos contactaron por una recomendación. "
+            f"{volume} {rng.choice(_SYNTHETIC_PEAKS)} "
+            "Nos preocupa integrar la herramienta con nuestro CRM y mantener el tono de marca."
+        )
+    return transcripts, [f"Cliente {i + 1}" for i in range(count)]
+
+
+def run_offline(transcripts: List[str], names: List[str], batch_size: int) -> Dict[str, Any]:
+    """
+    Mide tiempos de extracción y tokens estimados con y sin pre-extracción.
+    
+    Args:
+        transcripts: Transcripciones
+        names: Nombres de clientes
+        batch_size: Transcripciones por prompt
+        
+    Returns:
+        Dict con métricas agregadas y los prompts generados
+    """
+    start = time.perf_counter()
+    hints = [get_confident_fields(extract_local_fields(t)) for t in transcripts]
+    extraction_ms = (time.perf_counter() - start) * 1000
+    
+    coverage: Dict[str, int] = {}
+    for transcript_hints in hints:
+        for field in transcript_hints:
+            coverage[field] = coverage.get(field, 0) + 1
+    
+    prompts = []
+    for start_index in range(0, len(transcripts), batch_size):
+        end_index = min(start_index + batch_size, len(transcripts))
+        args = (transcripts[start_index:end_index], names[start_index:end_index], start_index, end_index - start_index)
+        prompts.append((
+            build_batch_categorization_prompt(*args),
+            build_batch_categorization_prompt(*args, hints=hints[start_index:end_index])
+        ))
+    
+    # Los campos resueltos dejan de generarse: se descuentan de la salida estimada
+    skipped_output = sum(estimate_tokens(json.dumps(h, ensure_ascii=False)) for h in hints if h)
+    
+    return {
+        "transcripts": len(transcripts),
+        "extraction_ms_total": extraction_ms,
+        "extraction_ms_per_item": extraction_ms / max(1, len(transcripts)),
+        "coverage": {field: count / max(1, len(transcripts)) for field, count in coverage.items()},
+        "input_tokens_without": sum(estimate_tokens(p) for p, _ in prompts),
+        "input_tokens_with": sum(estimate_tokens(p) for _, p in prompts),
+        "output_tokens_without": len(transcripts) * OUTPUT_TOKENS_PER_ITEM,
+        "output_tokens_with": len(transcripts) * OUTPUT_TOKENS_PER_ITEM - skipped_output,
+        "prompts": prompts,
+    }
+
+
+def run_live(prompts: List[Tuple[str, str]]) -> Dict[str, Dict[str, float]]:
+    """
+    Envía cada par de prompts a Gemini y mide latencia y tokens reportados.
+    
+    Args:
+        prompts: Lista de tuplas (prompt sin hints, prompt con hints)
+        
+    Returns:
+        Dict {"without"/"with": métricas}
+    """
+    configure_gemini()
+    
+    samples: Dict[str, Dict[str, List[float]]] = {
+        mode: {"latency": [], "output_chars": []} for mode in ("without", "with")
+    }
+    for prompt_pair in prompts:
+        for mode, prompt in zip(("without", "with"), prompt_pair):
+            start = time.perf_counter()
+            objects = call_gemini_batch_api_raw(prompt)
+            samples[mode]["latency"].append(time.perf_counter() - start)
+            samples[mode]["output_chars"].append(len(json.dumps(objects, ensure_ascii=False)))
+    
+    return {
+        mode: {
+            "latency_p50": statistics.median(values["latency"]),
+            "latency_mean": statistics.mean(values["latency"]),
+            "output_tokens": sum(values["output_chars"]) / 4,
+        }
+        for mode, values in samples.items()
+    }
+
+
+def _print_report(offline: Dict[str, Any], live: Dict[str, Dict[str, float]] = None) -> None:
+    """Imprime el reporte comparativo."""
+    def saving(before: float, after: float) -> str:
+        return f"{before:,.0f} → {after:,.0f} ({(after - before) / before:+.1%})" if before else "-"
+    
+    print(f"📊 {offline['transcripts']} transcripciones")
+    print(
+        f"⏱️ Pre-extracción: {offline['extraction_ms_total']:.1f} ms "
+        f"({offline['extraction_ms_per_item']:.3f} ms por transcripción)"
+    )
+    for field, ratio in sorted(offline["coverage"].items()):
+        print(f"   {field}: resuelto localmente en {ratio:.0%}")
+    print(f"📥 Tokens de entrada (estimados): {saving(offline['input_tokens_without'], offline['input_tokens_with'])}")
+    print(f"📤 Tokens de salida (estimados): {saving(offline['output_tokens_without'], offline['output_tokens_with'])}")
+    
+    if live:
+        print(f"🌐 Latencia p50: {live['without']['latency_p50']:.2f}s → {live['with']['latency_p50']:.2f}s")
+        print(f"🌐 Tokens de salida reales: {saving(live['without']['output_tokens'], live['with']['output_tokens'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de pre-extracción local")
+    parser.add_argument("csv", nargs="?", help="CSV con columnas Nombre y Transcripcion")
+    parser.add_argument("--live", action="store_true", help="Llamar a Gemini para medir latencia real")
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_ITEMS)
+    parser.add_argument("--synthetic", type=int, default=200, help="Cantidad de transcripciones sintéticas")
+    args = parser.parse_args()
+    
+    if args.csv:
+        df = pd.read_csv(args.csv).dropna(subset=["Transcripcion"])
+        transcripts, names = df["Transcripcion"].tolist(), df["Nombre"].astype(str).tolist()
+    else:
+        transcripts, names = build_synthetic_transcripts(args.synthetic)
+    
+    offline = run_offline(transcripts, names, args.batch_size)
+    live = run_live(offline["prompts"]) if args.live else None
+    _print_report(offline, live)
+
+
+if __name__ == "__main__":
+    main()
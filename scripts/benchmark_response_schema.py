@@ -0,0 +1,181 @@
+"""
+Benchmark del modo response_schema nativo contra el prompt detallado.
+
+Compara, para los mismos batches, el prompt con instrucciones completas
+(enums en el texto, JSON libre) y el prompt reducido + response_schema:
+tokens de entrada estimados (el schema también cuenta como entrada) y,
+con --live, latencia, tokens de salida y objetos válidos por respuesta.
+
+Uso:
+    python -m scripts.benchmark_response_schema [archivo.csv] [--live] [--batch-size N]
+    
+El CSV debe tener las columnas "Nombre" y "Transcripcion". Sin archivo se
+usa el set sintético de benchmark_pre_extraction.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, Any, List, Tuple
+
+import pandas as pd
+
+from scripts.benchmark_pre_extraction import build_synthetic_transcripts
+from src.core.ai.client import call_gemini_batch_api_raw
+from src.core.ai.config import configure_gemini
+from src.core.ai.defaults import MAX_BATCH_ITEMS
+from src.core.ai.local_extractor import get_prompt_hints
+from src.core.ai.prompts import build_batch_categorization_prompt, get_shared_resolved_fields
+from src.core.ai.response_schema import get_response_schema
+from src.core.ai.tokens import estimate_tokens
+from src.core.ai.validation import is_valid_categorization
+
+
+_MODES = ("verbose", "schema")
+
+Request = Tuple[str, Dict[str, Any], List[Dict[str, Any]]]
+
+
+def build_requests(transcripts: List[str], names: List[str], batch_size: int) -> Dict[str, List[Request]]:
+    """
+    Construye las llamadas de ambos modos para los mismos batches.
+    
+    Args:
+        transcripts: Transcripciones
+        names: Nombres de clientes
+        batch_size: Transcripciones por llamada
+        
+    Returns:
+        Dict {modo: [(prompt, response_schema o None, hints), ...]}
+    """
+    requests: Dict[str, List[Request]] = {mode: [] for mode in _MODES}
+    
+    for start in range(0, len(transcripts), batch_size):
+        end = min(start + batch_size, len(transcripts))
+        hints = [get_prompt_hints(t) for t in transcripts[start:end]]
+        args = (transcripts[start:end], names[start:end], start, end - start)
+        
+        requests["verbose"].append((build_batch_categorization_prompt(*args, hints=hints), None, hints))
+        requests["schema"].append((
+            build_batch_categorization_prompt(*args, hints=hints, native_schema=True),
+            get_response_schema(get_shared_resolved_fields(hints), batch=True),
+            hints
+        ))
+    
+    return requests
+
+
+def run_offline(requests: Dict[str, List[Request]]) -> Dict[str, Dict[str, float]]:
+    """
+    Estima tokens de entrada por modo.
+    
+    Args:
+        requests: Salida de build_requests
+        
+    Returns:
+        Dict {modo: {"prompt_tokens", "schema_tokens", "input_tokens"}}
+    """
+    report = {}
+    for mode, mode_requests in requests.items():
+        prompt_tokens = sum(estimate_tokens(prompt) for prompt, _, _ in mode_requests)
+        schema_tokens = sum(
+            estimate_tokens(json.dumps(schema, ensure_ascii=False))
+            for _, schema, _ in mode_requests if schema is not None
+        )
+        report[mode] = {
+            "prompt_tokens": prompt_tokens,
+            "schema_tokens": schema_tokens,
+            "input_tokens": prompt_tokens + schema_tokens,
+        }
+    return report
+
+
+def run_live(requests: Dict[str, List[Request]]) -> Dict[str, Dict[str, float]]:
+    """
+    Envía las llamadas de ambos modos, intercaladas, y mide la respuesta.
+    
+    Args:
+        requests: Salida de build_requests
+        
+    Returns:
+        Dict {modo: métricas de latencia, salida y validez}
+    """
+    configure_gemini()
+    
+    samples: Dict[str, Dict[str, List[float]]] = {
+        mode: {"latency": [], "output_chars": [], "valid": [], "expected": [], "errors": []} for mode in _MODES
+    }
+    for pair in zip(*(requests[mode] for mode in _MODES)):
+        for mode, (prompt, schema, hints) in zip(_MODES, pair):
+            start = time.perf_counter()
+            try:
+                objects = call_gemini_batch_api_raw(prompt, response_schema=schema)
+            except Exception:
+                objects = None
+            samples[mode]["latency"].append(time.perf_counter() - start)
+            samples[mode]["expected"].append(len(hints))
+            samples[mode]["errors"].append(objects is None)
+            
+            objects = objects or []
+            samples[mode]["output_chars"].append(len(json.dumps(objects, ensure_ascii=False)))
+            valid = 0
+            for obj, obj_hints in zip(objects, hints):
+                if isinstance(obj, dict):
+                    obj.update(obj_hints)
+                    valid += is_valid_categorization(obj)
+            samples[mode]["valid"].append(valid)
+    
+    return {
+        mode: {
+            "latency_p50": statistics.median(values["latency"]),
+            "latency_mean": statistics.mean(values["latency"]),
+            "output_tokens": sum(values["output_chars"]) / 4,
+            "valid_ratio": sum(values["valid"]) / max(1, sum(values["expected"])),
+            "errors": sum(values["errors"]),
+        }
+        for mode, values in samples.items()
+    }
+
+
+def _print_report(offline: Dict[str, Dict[str, float]], live: Dict[str, Dict[str, float]] = None) -> None:
+    """Imprime el reporte comparativo."""
+    def change(before: float, after: float) -> str:
+        return f"{before:,.0f} → {after:,.0f} ({(after - before) / before:+.1%})" if before else "-"
+    
+    verbose, schema = offline["verbose"], offline["schema"]
+    print(f"📥 Tokens de prompt (estimados): {change(verbose['prompt_tokens'], schema['prompt_tokens'])}")
+    print(f"📐 Tokens del response_schema: {schema['schema_tokens']:,.0f}")
+    print(f"📥 Entrada total (estimada): {change(verbose['input_tokens'], schema['input_tokens'])}")
+    
+    if live:
+        print(f"🌐 Latencia p50: {live['verbose']['latency_p50']:.2f}s → {live['schema']['latency_p50']:.2f}s")
+        print(f"🌐 Tokens de salida: {change(live['verbose']['output_tokens'], live['schema']['output_tokens'])}")
+        print(
+            f"✅ Objetos válidos: {live['verbose']['valid_ratio']:.1%} → {live['schema']['valid_ratio']:.1%} "
+            f"(respuestas no parseables: {live['verbose']['errors']} → {live['schema']['errors']})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de response_schema nativo")
+    parser.add_argument("csv", nargs="?", help="CSV con columnas Nombre y Transcripcion")
+    parser.add_argument("--live", action="store_true", help="Llamar a Gemini para medir latencia real")
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_ITEMS)
+    parser.add_argument("--synthetic", type=int, default=200, help="Cantidad de transcripciones sintéticas")
+    args = parser.parse_args()
+    
+    if args.csv:
+        df = pd.read_csv(args.csv).dropna(subset=["Transcripcion"])
+        transcripts, names = df["Transcripcion"].tolist(), df["Nombre"].astype(str).tolist()
+    else:
+        transcripts, names = build_synthetic_transcripts(args.synthetic)
+    
+    requests = build_requests(transcripts, names, args.batch_size)
+    offline = run_offline(requests)
+    live = run_live(requests) if args.live else None
+    _print_report(offline, live)
+
+
+if __name__ == "__main__":
+    main()
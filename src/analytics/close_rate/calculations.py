@@ -4,30 +4,37 @@ Funciones de cálculo para métricas de tasa de cierre.
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
+from src.core.database import query_heatmap_stats, query_monthly_stats
 from src.core.utils import get_month_name_es
 
 
-def calculate_monthly_stats(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_monthly_stats(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
     """
     Calcula estadísticas mensuales de cierre.
     
     Args:
         df: DataFrame con datos
-        
+        filters: Filtros del sidebar; si se indican, se agrupa en SQLite
+            en lugar de sobre df
+            
     Returns:
         DataFrame con estadísticas por mes
     """
-    df_monthly = df.copy()
-    df_monthly["Fecha de la Reunion"] = pd.to_datetime(df_monthly["Fecha de la Reunion"])
-    df_monthly["year_month"] = df_monthly["Fecha de la Reunion"].dt.to_period("M")
-    
-    monthly_stats = df_monthly.groupby("year_month").agg({
-        "closed": ["sum", "count"]
-    }).reset_index()
+    if filters is not None:
+        monthly_stats = query_monthly_stats(filters)
+    else:
+        df_monthly = df.copy()
+        df_monthly["Fecha de la Reunion"] = pd.to_datetime(df_monthly["Fecha de la Reunion"])
+        df_monthly["year_month"] = df_monthly["Fecha de la Reunion"].dt.to_period("M")
+        
+        monthly_stats = df_monthly.groupby("year_month").agg({
+            "closed": ["sum", "count"]
+        }).reset_index()
+        
+        monthly_stats.columns = ["year_month", "closed_sum", "total"]
     
-    monthly_stats.columns = ["year_month", "closed_sum", "total"]
     monthly_stats["close_rate"] = monthly_stats["closed_sum"] / monthly_stats["total"]
     monthly_stats["month_name"] = monthly_stats["year_month"].apply(
         lambda x: f"{get_month_name_es(x.month)} {x.year}"
@@ -91,25 +98,46 @@ def calculate_forecast(monthly_stats: pd.DataFrame, n_months: int = 6) -> Tuple[
     return future_y, future_months_names, avg_forecast
 
 
-def prepare_heatmap_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+def prepare_heatmap_data(
+    df: pd.DataFrame,
+    filters: Optional[Dict[str, Any]] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
     """
     Prepara datos para el heatmap.
     
+    Solo se consideran los leads con sector principal y nivel de volumen.
+    
     Args:
         df: DataFrame con datos categorizados
-        
+        filters: Filtros del sidebar; si se indican, se agrupa en SQLite
+            en lugar de sobre df
+            
     Returns:
-        Tuple con (pivot de tasas, pivot de conteos, orden de columnas)
+        Tuple con (pivot de tasas, pivot de conteos, orden de columnas);
+        pivots vacíos si no hay leads categorizados
     """
-    pivot = df.pivot_table(
-        index="sector_principal",
-        columns="volumen_nivel",
-        values="closed",
-        aggfunc=["mean", "count"]
-    )
-    
-    close_rate_pivot = pivot["mean"].fillna(0)
-    count_pivot = pivot["count"].fillna(0)
+    if filters is not None:
+        heatmap_stats = query_heatmap_stats(filters)
+        close_rate_pivot = heatmap_stats.pivot(
+            index="sector_principal", columns="volumen_nivel", values="close_rate"
+        ).fillna(0)
+        count_pivot = heatmap_stats.pivot(
+            index="sector_principal", columns="volumen_nivel", values="count"
+        ).fillna(0)
+    else:
+        df_cat = df[df["sector_principal"].notna() & df["volumen_nivel"].notna()]
+        if len(df_cat) == 0:
+            return pd.DataFrame(), pd.DataFrame(), []
+        
+        pivot = df_cat.pivot_table(
+            index="sector_principal",
+            columns="volumen_nivel",
+            values="closed",
+            aggfunc=["mean", "count"]
+        )
+        
+        close_rate_pivot = pivot["mean"].fillna(0)
+        count_pivot = pivot["count"].fillna(0)
     
     volume_order = ["Bajo (<100)", "Medio (100-250)", "Alto (251-500)", "Muy Alto (>500)", "Desconocido"]
     existing_cols = [col for col in volume_order if col in close_rate_pivot.columns]
@@ -4,17 +4,23 @@ API pública para métricas de tasa de cierre.
 
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from src.core.config import COLORS
+from src.core.database import query_close_rate, query_group_stats
 from .calculations import calculate_monthly_stats, prepare_heatmap_data, create_hover_text
 from .charts import create_close_rate_chart, create_empty_heatmap
 
 
-def calculate_global_close_rate(df: pd.DataFrame) -> Dict[str, Any]:
+def calculate_global_close_rate(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Calcula la tasa de cierre global y genera pronóstico para los próximos 6 meses.
     
+    Args:
+        df: DataFrame filtrado
+        filters: Filtros del sidebar; si se indican, los agregados se
+            calculan en SQLite en lugar de sobre df
+            
     Returns:
         Dict con:
         - current_rate: Tasa actual
@@ -22,9 +28,9 @@ def calculate_global_close_rate(df: pd.DataFrame) -> Dict[str, Any]:
         - monthly_data: DataFrame con datos mensuales
         - chart: Figura de Plotly
     """
-    current_rate = df["closed"].mean()
+    current_rate = query_close_rate(filters) if filters is not None else df["closed"].mean()
     
-    monthly_stats = calculate_monthly_stats(df)
+    monthly_stats = calculate_monthly_stats(df, filters)
     
     chart, predicted_6m = create_close_rate_chart(monthly_stats)
     
@@ -36,24 +42,32 @@ def calculate_global_close_rate(df: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
-def calculate_close_rate_by_seller(df: pd.DataFrame) -> Dict[str, Any]:
+def calculate_close_rate_by_seller(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Calcula la tasa de cierre por vendedor con gráfico de barras horizontales.
     
+    Args:
+        df: DataFrame filtrado
+        filters: Filtros del sidebar; si se indican, los agregados se
+            calculan en SQLite en lugar de sobre df
+            
     Returns:
         Dict con:
         - seller_stats: DataFrame con estadísticas por vendedor
         - chart: Figura de Plotly
     """
-    seller_stats = df.groupby("Vendedor asignado").agg({
-        "closed": ["sum", "count", "mean"]
-    }).reset_index()
+    if filters is not None:
+        seller_stats = query_group_stats("vendedor_asignado", filters)
+        avg_rate = query_close_rate(filters)
+    else:
+        seller_stats = df.groupby("Vendedor asignado").agg({
+            "closed": ["sum", "count", "mean"]
+        }).reset_index()
+        avg_rate = df["closed"].mean()
     
     seller_stats.columns = ["vendedor", "closed_count", "total", "close_rate"]
     seller_stats = seller_stats.sort_values("close_rate", ascending=True)
     
-    avg_rate = df["closed"].mean()
-    
     fig = go.Figure()
     
     colors_list = [
@@ -104,27 +118,30 @@ def calculate_close_rate_by_seller(df: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
-def calculate_close_heatmap(df: pd.DataFrame) -> go.Figure:
+def calculate_close_heatmap(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> go.Figure:
     """
     Genera un heatmap de tasa de cierre: Sector Principal × Volumen Nivel.
     
+    Args:
+        df: DataFrame filtrado
+        filters: Filtros del sidebar; si se indican, los agregados se
+            calculan en SQLite en lugar de sobre df
+            
     Returns:
         Figura de Plotly con heatmap
     """
     if "sector_principal" not in df.columns or "volumen_nivel" not in df.columns:
         return create_empty_heatmap("⚠️ Ejecuta la categorización primero para ver esta métrica")
     
-    df_cat = df[df["sector_principal"].notna() & df["volumen_nivel"].notna()].copy()
+    close_rate_pivot, count_pivot, _ = prepare_heatmap_data(df, filters)
     
-    if len(df_cat) == 0:
+    if len(close_rate_pivot) == 0:
         return create_empty_heatmap(
             "No hay datos categorizados aún. Ejecuta la categorización primero.",
             color="text",
             size=14
         )
     
-    close_rate_pivot, count_pivot, _ = prepare_heatmap_data(df_cat)
-    
     hover_text = create_hover_text(close_rate_pivot, count_pivot)
     
     fig = go.Figure(data=go.Heatmap(
@@ -7,6 +7,7 @@ import plotly.graph_objects as go
 from typing import Dict, Any
 
 from src.core.config import COLORS
+from src.core.database import load_concern_aggregates
 from src.core.utils import parse_json_field
 
 
@@ -14,36 +15,29 @@ def calculate_top_concerns(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Identifica las preocupaciones que más afectan el cierre.
     
+    Si el DataFrame viene de load_processed_data (tiene client_id), las
+    preocupaciones se agregan en SQLite (tabla client_concerns); si no,
+    se decodifica la columna preocupaciones de cada fila.
+    
+    Args:
+        df: DataFrame filtrado con closed y Nombre, y client_id o preocupaciones
+        
     Returns:
         Dict con:
         - concern_stats: DataFrame con estadísticas
         - chart: Figura de Plotly
+        - concerns_df: DataFrame (tipo, closed, nombre) con una fila por mención
     """
-    concerns_list = []
+    if "client_id" in df.columns:
+        aggregates = load_concern_aggregates(df["client_id"].tolist())
+    else:
+        aggregates = _aggregate_concerns_from_json(df)
+    concern_stats = aggregates["stats"]
+    concerns_df = aggregates["mentions"]
     
-    for idx, row in df.iterrows():
-        preocupaciones_data = row.get("preocupaciones")
-        preocupaciones = parse_json_field(preocupaciones_data)
-        
-        if preocupaciones and isinstance(preocupaciones, list):
-            for concern in preocupaciones:
-                if isinstance(concern, dict):
-                    concerns_list.append({
-                        "tipo": concern.get("tipo", "Otra"),
-                        "closed": row["closed"],
-                        "nombre": row["Nombre"]
-                    })
-    
-    if len(concerns_list) == 0:
+    if len(concern_stats) == 0:
         return {"concern_stats": pd.DataFrame(), "chart": go.Figure()}
     
-    concerns_df = pd.DataFrame(concerns_list)
-    
-    concern_stats = concerns_df.groupby("tipo").agg({
-        "closed": ["count", lambda x: (x == 0).sum(), "mean"]
-    }).reset_index()
-    
-    concern_stats.columns = ["tipo", "total", "no_closed_count", "close_rate"]
     concern_stats["no_close_percentage"] = concern_stats["no_closed_count"] / concern_stats["total"]
     concern_stats = concern_stats.sort_values("no_close_percentage", ascending=False).head(5)
     
@@ -72,3 +66,38 @@ def calculate_top_concerns(df: pd.DataFrame) -> Dict[str, Any]:
         "chart": fig,
         "concerns_df": concerns_df
     }
+
+
+def _aggregate_concerns_from_json(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Equivalente en pandas de load_concern_aggregates, para DataFrames que
+    no se cargaron desde SQLite.
+    
+    Args:
+        df: DataFrame con preocupaciones, closed y Nombre
+        
+    Returns:
+        Dict con stats y mentions en el formato de load_concern_aggregates
+    """
+    concerns_list = []
+    
+    for idx, row in df.iterrows():
+        preocupaciones = parse_json_field(row.get("preocupaciones"))
+        
+        if preocupaciones and isinstance(preocupaciones, list):
+            for concern in preocupaciones:
+                if isinstance(concern, dict):
+                    concerns_list.append({
+                        "tipo": concern.get("tipo", "Otra"),
+                        "closed": row["closed"],
+                        "nombre": row["Nombre"]
+                    })
+    
+    mentions = pd.DataFrame(concerns_list, columns=["tipo", "closed", "nombre"])
+    stats = mentions.groupby("tipo").agg(
+        total=("closed", "count"),
+        no_closed_count=("closed", lambda x: (x == 0).sum()),
+        close_rate=("closed", "mean")
+    ).reset_index()
+    
+    return {"stats": stats, "mentions": mentions}
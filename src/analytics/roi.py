@@ -4,16 +4,22 @@ Métricas de ROI de fuentes de descubrimiento.
 
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from src.core.config import COLORS
+from src.core.database import query_group_stats
 
 
-def calculate_source_roi(df: pd.DataFrame) -> Dict[str, Any]:
+def calculate_source_roi(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Calcula el ROI de cada fuente de descubrimiento.
     ROI Score = (% leads × % cierre)
     
+    Args:
+        df: DataFrame filtrado
+        filters: Filtros del sidebar; si se indican, los agregados se
+            calculan en SQLite en lugar de sobre df
+            
     Returns:
         Dict con:
         - source_stats: DataFrame con estadísticas
@@ -30,18 +36,19 @@ def calculate_source_roi(df: pd.DataFrame) -> Dict[str, Any]:
             )
         }
     
-    df_cat = df[df["fuente_primaria"].notna()].copy()
+    if filters is not None:
+        source_stats = query_group_stats("fuente_primaria", filters)
+    else:
+        source_stats = df.groupby("fuente_primaria").agg({
+            "closed": ["sum", "count", "mean"]
+        }).reset_index()
     
-    if len(df_cat) == 0:
+    if len(source_stats) == 0:
         return {"source_stats": pd.DataFrame(), "chart": go.Figure()}
     
-    source_stats = df_cat.groupby("fuente_primaria").agg({
-        "closed": ["sum", "count", "mean"]
-    }).reset_index()
-    
     source_stats.columns = ["fuente", "closed_count", "total", "close_rate"]
     
-    total_leads = len(df_cat)
+    total_leads = source_stats["total"].sum()
     source_stats["lead_percentage"] = source_stats["total"] / total_leads
     
     source_stats["roi_score"] = source_stats["lead_percentage"] * source_stats["close_rate"]
@@ -4,8 +4,10 @@ Métricas de oportunidades de upsell.
 
 import pandas as pd
 import plotly.graph_objects as go
+from typing import Dict
 
 from src.core.config import COLORS
+from src.core.database import count_upsell_addons
 from src.core.utils import parse_json_field
 
 
@@ -13,6 +15,13 @@ def calculate_upsell_radar(df: pd.DataFrame) -> go.Figure:
     """
     Radar chart con el % de clientes que mencionan cada add-on.
     
+    Si el DataFrame viene de load_processed_data (tiene client_id), las
+    menciones se cuentan en SQLite (tabla client_upsell); si no, se
+    decodifica la columna potencial_upsell de cada fila.
+    
+    Args:
+        df: DataFrame filtrado con client_id o potencial_upsell
+        
     Returns:
         Figura de Plotly (radar chart)
     """
@@ -24,17 +33,12 @@ def calculate_upsell_radar(df: pd.DataFrame) -> go.Figure:
         "Reportes y analíticos de atención al cliente"
     ]
     
-    upsell_list = []
+    if "client_id" in df.columns:
+        upsell_counts = count_upsell_addons(df["client_id"].tolist())
+    else:
+        upsell_counts = _count_upsell_from_json(df)
     
-    for idx, row in df.iterrows():
-        upsell_data = row.get("potencial_upsell")
-        upsell = parse_json_field(upsell_data)
-        
-        if upsell and isinstance(upsell, list):
-            for item in upsell:
-                upsell_list.append(item)
-    
-    if len(upsell_list) == 0:
+    if len(upsell_counts) == 0:
         fig = go.Figure()
         fig.add_annotation(
             text="⚠️ Ejecuta la categorización primero para ver esta métrica",
@@ -44,8 +48,6 @@ def calculate_upsell_radar(df: pd.DataFrame) -> go.Figure:
         )
         return fig
     
-    upsell_counts = pd.Series(upsell_list).value_counts()
-    
     total_leads = len(df)
     
     upsell_percentages = {}
@@ -93,3 +95,25 @@ def calculate_upsell_radar(df: pd.DataFrame) -> go.Figure:
     )
     
     return fig
+
+
+def _count_upsell_from_json(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Equivalente en pandas de count_upsell_addons, para DataFrames que no
+    se cargaron desde SQLite.
+    
+    Args:
+        df: DataFrame con potencial_upsell
+        
+    Returns:
+        Dict {add-on: cantidad de menciones}
+    """
+    upsell_list = []
+    
+    for idx, row in df.iterrows():
+        upsell = parse_json_field(row.get("potencial_upsell"))
+        
+        if upsell and isinstance(upsell, list):
+            upsell_list.extend(item for item in upsell if isinstance(item, str))
+    
+    return pd.Series(upsell_list, dtype=object).value_counts().to_dict()
@@ -6,16 +6,41 @@ Módulos:
 - config: Configuración de la API de Gemini
 - defaults: Valores por defecto y constantes
 - prompts: Construcción de prompts
+- response_schema: CATEGORIZATION_SCHEMA como response_schema nativo de Gemini
+- local_extractor: Pre-extracción determinística de campos mecánicos (regex)
+- compaction: Compactación de transcripciones antes del prompt (muletillas, frases de cortesía)
+- near_duplicates: Reutilización de categorizaciones de transcripciones casi idénticas (MinHash/LSH)
 - api: Llamadas a la API de Gemini
+- client_pool: Modelos reutilizables entre threads + métricas de latencia
+- context_cache: Caché de contexto de Gemini para el prefijo de instrucciones
+- providers: Proveedores de respuestas (Gemini, grabación/replay, simulador)
 - single: Categorización individual con caché
-- batch: Procesamiento en batch optimizado
+- batch: Procesamiento en batch optimizado (concurrente)
+- planner: Empaquetado de batches por presupuesto de tokens
+- long_transcripts: Categorización map-reduce de transcripciones muy largas
+- rate_limiter: Token bucket de requests/tokens por minuto
+- concurrency: Concurrencia adaptativa (AIMD) + circuit breaker ante 429
+- cascade: Cascada de modelos (económico primero, escalamiento al fuerte)
+- tokens: Estimación de tokens
+- json_stream: Parser incremental de arrays JSON en streaming
+- persistent_cache: Caché persistente de categorizaciones en SQLite
+- validation: Validación de categorizaciones contra el schema
+- versioning: Versión de categorización (hash de instrucciones, schema y modelo)
 - cache: Gestión del caché
 
 Funciones públicas exportadas:
 - configure_gemini(): Configura la API key
 - categorize_transcript(): Categoriza una sola transcripción (con caché)
-- batch_categorize_transcripts(): Categoriza múltiples en grupos de 5 (optimizado)
+- batch_categorize_transcripts(): Categoriza múltiples en batches empaquetados por tokens (optimizado)
 - clear_categorization_cache(): Limpia el caché de categorizaciones
+- get_cache_stats(): Estadísticas del caché persistente (entradas, hits, misses)
+- get_client_latency_stats(): Latencias de las llamadas a Gemini (setup vs generación)
+- get_concurrency_stats(): Concurrencia actual, backoff y llamadas rechazadas (429)
+- get_context_cache_stats(): Tokens de instrucciones servidos desde el caché de contexto
+- get_compaction_stats(): Tokens de transcripciones ahorrados por la compactación
+- get_cascade_stats(): Transcripciones, latencia y escalamientos por nivel de la cascada
+- get_categorization_version(): Versión vigente de instrucciones/schema/modelo
+- get_current_versions(): Versiones aceptadas (GEMINI_MODEL y, con cascada, el modelo económico)
 """
 
 from typing import Dict, Any, List, Optional, Callable
@@ -26,6 +51,13 @@ from .config import configure_gemini
 from .single import categorize_single_transcript
 from .batch import batch_categorize_with_progress
 from .cache import clear_categorization_cache as _clear_cache
+from .persistent_cache import get_cache_stats
+from .client_pool import get_client_pool
+from .concurrency import get_concurrency_controller
+from .context_cache import get_context_cache
+from .compaction import get_compaction_stats
+from .cascade import get_cascade_tracker
+from .versioning import get_categorization_version, get_current_versions
 
 
 def categorize_transcript(transcript: str, client_name: str = "") -> Dict[str, Any]:
@@ -51,40 +83,105 @@ def categorize_transcript(transcript: str, client_name: str = "") -> Dict[str, A
 def batch_categorize_transcripts(
     transcripts: List[str],
     client_names: List[str],
-    _progress_callback: Optional[Callable] = None
+    _progress_callback: Optional[Callable] = None,
+    _result_callback: Optional[Callable] = None,
+    job_id: Optional[str] = None,
+    run_stats: Optional[Dict[str, int]] = None
 ) -> List[Dict[str, Any]]:
     """
-    Categoriza múltiples transcripciones en GRUPOS DE 5 usando una sola llamada API por grupo.
+    Categoriza múltiples transcripciones en GRUPOS usando una sola llamada API por grupo.
     Esto reduce drásticamente el uso de tokens y llamadas a la API.
     
     Args:
         transcripts: Lista de transcripciones
         client_names: Lista de nombres de clientes
         _progress_callback: Función opcional para actualizar progreso
-        
+        _result_callback: Función opcional (índice, categorización) invocada
+            apenas cada resultado está disponible
+        job_id: Trabajo reanudable en el que se guarda un checkpoint por grupo
+        run_stats: Dict opcional que se completa con el origen de los resultados
+            (cache_hits, checkpoint_hits, near_duplicate_hits, coalesced_items, model_items)
+            
     Returns:
         Lista de diccionarios con categorías
         
     Note:
-        - Procesa en grupos de 5 para optimizar costos
+        - Agrupa según un presupuesto de tokens (hasta MAX_BATCH_ITEMS por grupo)
+        - Mantiene varios grupos en paralelo, regulados por un rate limiter
+          de requests/tokens por minuto
         - Implementa retry con exponential backoff
+        - Ante errores 429 reduce la concurrencia y pausa los despachos en
+          lugar de usar valores por defecto
         - Usa valores por defecto si falla después de 3 intentos
-        - NO usa cache para permitir callbacks de progreso de Streamlit
+        - Consulta el caché persistente (SQLite) antes de llamar a la API
+        - Reutiliza la categorización de transcripciones casi idénticas ya procesadas
+        - Las transcripciones repetidas dentro de la carga se categorizan una sola vez
+        - Lee la respuesta en streaming y entrega cada objeto al cerrarse
     """
-    return batch_categorize_with_progress(transcripts, client_names, _progress_callback)
+    return batch_categorize_with_progress(
+        transcripts,
+        client_names,
+        _progress_callback,
+        result_callback=_result_callback,
+        job_id=job_id,
+        run_stats=run_stats
+    )
 
 
-def clear_categorization_cache() -> None:
+def clear_categorization_cache(persistent: bool = True) -> None:
     """
     Limpia el caché de categorizaciones.
     Útil cuando se quiere forzar una re-categorización.
     
-    Note:
-        batch_categorize_transcripts no usa cache (para compatibilidad con Streamlit),
-        solo limpia el cache de categorize_single_transcript.
+    Args:
+        persistent: Si también debe vaciar el caché persistente en SQLite.
+            Con False solo se limpia el caché en memoria de Streamlit.
+    """
+    _clear_cache(persistent=persistent)
+
+
+def get_client_latency_stats() -> Dict[str, Any]:
+    """
+    Retorna las latencias de las llamadas a Gemini de este proceso.
+    
+    Returns:
+        Dict con totales y latencias (count, mean, p50, p95) de las fases
+        setup (construir el modelo), cold (primera llamada) y warm
+    """
+    return get_client_pool().get_latency_stats()
+
+
+def get_concurrency_stats() -> Dict[str, Any]:
+    """
+    Retorna el estado del controlador de concurrencia adaptativo.
+    
+    Returns:
+        Dict con limit, in_flight, state (closed/open/half_open),
+        backoff_remaining y contadores (rate_limited, circuit_opens, ...)
+    """
+    return get_concurrency_controller().get_stats()
+
+
+def get_context_cache_stats() -> Dict[str, Any]:
+    """
+    Retorna el uso del caché de contexto del prefijo de instrucciones.
+    
+    Returns:
+        Dict con cached_calls, inline_calls, cached_tokens (no reenviados),
+        inline_prefix_tokens, caches_created, refreshes, failures y active_caches
+    """
+    return get_context_cache().get_stats()
+
+
+def get_cascade_stats() -> Dict[str, Any]:
+    """
+    Retorna las métricas de la cascada de modelos.
+    
+    Returns:
+        Dict con tiers ({fast/strong: model, calls, items, resolved, latency})
+        y escalations ({motivo: cantidad})
     """
-    categorize_single_transcript.clear()
-    _clear_cache()
+    return get_cascade_tracker().get_stats()
 
 
 __all__ = [
@@ -92,4 +189,12 @@ __all__ = [
     "categorize_transcript",
     "batch_categorize_transcripts",
     "clear_categorization_cache",
+    "get_cache_stats",
+    "get_client_latency_stats",
+    "get_concurrency_stats",
+    "get_context_cache_stats",
+    "get_compaction_stats",
+    "get_cascade_stats",
+    "get_categorization_version",
+    "get_current_versions",
 ]
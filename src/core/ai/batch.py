@@ -2,108 +2,783 @@
 Procesamiento en batch de transcripciones.
 """
 
+import copy
+import queue
+import threading
 import time
-from typing import Dict, Any, List, Optional, Callable
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-from .client import call_gemini_batch_api
-from .prompts import build_batch_categorization_prompt
+from src.core.database.jobs import load_job_checkpoint, save_job_checkpoint
+from .cascade import (
+    ESCALATION_ERROR,
+    TIER_FAST,
+    TIER_STRONG,
+    get_cascade_tracker,
+    get_escalation_reason,
+    get_tier_model_name
+)
+from .client import call_gemini_batch_api_raw, stream_gemini_batch_api
+from .compaction import CompactionRun, compact_transcripts, start_compaction_run
+from .concurrency import (
+    OUTCOME_ERROR,
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_SUCCESS,
+    get_concurrency_controller,
+    is_rate_limit_error
+)
+from .persistent_cache import build_cache_key, get_cached_categorizations, store_categorizations
+from .local_extractor import get_prompt_hints
+from .long_transcripts import categorize_long_transcript, is_long_transcript
+from .near_duplicates import find_near_duplicates, index_categorizations, normalize_transcript
+from .context_cache import get_context_cache
+from .prompts import (
+    build_batch_categorization_prompt,
+    build_batch_instruction_prefix,
+    get_shared_resolved_fields
+)
+from .planner import plan_batches, describe_batch_plan
+from .rate_limiter import get_rate_limiter
+from .response_schema import get_response_schema
+from .tokens import estimate_call_tokens
+from .validation import is_valid_categorization
+from .versioning import is_current_version, mark_categorized
 from .defaults import (
-    BATCH_SIZE,
+    CASCADE_ENABLED,
+    CONTEXT_CACHE_ENABLED,
     RETRY_ATTEMPTS,
-    RATE_LIMIT_DELAY,
+    SPLIT_AFTER_FAILURES,
+    MAX_CONCURRENT_BATCHES,
+    NATIVE_RESPONSE_SCHEMA,
+    NEAR_DUPLICATE_ENABLED,
+    RATE_LIMIT_MAX_REQUEUES,
+    STREAM_BATCH_RESPONSES,
     get_default_categorization
 )
 
 
+_EVENT_POLL_INTERVAL = 0.2
+
+
 def process_batch(
     batch_transcripts: List[str],
     batch_names: List[str],
-    batch_start: int
+    batch_start: int,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    compaction: Optional[CompactionRun] = None
 ) -> List[Dict[str, Any]]:
     """
-    Procesa un grupo de transcripciones con retry automático.
+    Procesa un grupo de transcripciones con retry y recuperación parcial.
+    
+    Si la respuesta trae menos objetos (o algunos inválidos), se conservan
+    los válidos y solo se reenvían las transcripciones faltantes. Ante
+    fallos repetidos el grupo se divide en mitades que se procesan por
+    separado, hasta aislar las transcripciones problemáticas.
+    
+    Antes de cada llamada se reserva cupo en el controlador de concurrencia
+    y en el rate limiter compartidos, de modo que varios grupos pueden
+    ejecutarse en paralelo sin exceder los límites de requests/tokens por
+    minuto. Ante un 429 el grupo no se descarta: sus transcripciones
+    pendientes se reenvían cuando el circuit breaker vuelve a despachar,
+    hasta RATE_LIMIT_MAX_REQUEUES veces.
+    
+    Un grupo formado por una sola transcripción que supera
+    LONG_TRANSCRIPT_TOKENS se categoriza por fragmentos (map-reduce). Con
+    CASCADE_ENABLED el grupo pasa primero por el modelo económico y solo
+    las transcripciones escaladas siguen el camino anterior con GEMINI_MODEL.
     
     Args:
         batch_transcripts: Transcripciones del grupo
         batch_names: Nombres del grupo
         batch_start: Índice de inicio del grupo
-        
+        on_result: Callback opcional (posición en el grupo, resultado) invocado
+            apenas cada categorización válida está disponible
+        compaction: Compactación de la ejecución (frases de cortesía y
+            reducción de tokens); None compacta sin frases aprendidas
+            
     Returns:
         Lista de resultados para el grupo
     """
     batch_size = len(batch_transcripts)
+    if batch_size == 1 and is_long_transcript(batch_transcripts[0]):
+        return [_process_long_transcript(batch_transcripts[0], batch_names[0], on_result, compaction)]
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * batch_size
+    last_error = ""
+    pending = list(range(batch_size))
+    tier = None
+    
+    if CASCADE_ENABLED:
+        pending = _run_fast_tier(batch_transcripts, batch_names, batch_start, results, on_result, compaction)
+        tier = TIER_STRONG
+    
+    try:
+        last_error = _categorize_group(
+            pending,
+            batch_transcripts,
+            batch_names,
+            batch_start,
+            results,
+            on_result,
+            tier,
+            compaction
+        )
+    except Exception as e:
+        if not is_rate_limit_error(e):
+            raise
+        st.error(f"❌ Límite de API alcanzado en batch {batch_start+1}-{batch_start+batch_size}")
+        st.info("💡 Espera unos minutos o verifica tu cuota en Google AI Studio")
+    
+    if tier:
+        get_cascade_tracker().record_resolved(tier, sum(1 for index in pending if results[index] is not None))
+    
+    failed = sum(1 for result in results if result is None)
+    if failed > 0 and last_error:
+        st.warning(
+            f"⚠️ {failed} de {batch_size} transcripciones del grupo "
+            f"{batch_start+1}-{batch_start+batch_size} quedaron sin categorizar: {last_error[:100]}"
+        )
+    
+    # Las transcripciones que no se pudieron recuperar usan valores por defecto
+    return [result if result is not None else get_default_categorization() for result in results]
+
+
+def _run_fast_tier(
+    batch_transcripts: List[str],
+    batch_names: List[str],
+    batch_start: int,
+    results: List[Optional[Dict[str, Any]]],
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    compaction: Optional[CompactionRun] = None
+) -> List[int]:
+    """
+    Primer nivel de la cascada: una sola llamada al modelo económico.
+    
+    Los resultados aceptados se escriben en `results` y se notifican; el
+    resto se escala sin reintentar con el modelo económico.
+    
+    Args:
+        batch_transcripts: Transcripciones del grupo
+        batch_names: Nombres del grupo
+        batch_start: Índice de inicio del grupo
+        results: Lista de resultados del grupo, se completa in-place
+        on_result: Callback opcional por cada categorización aceptada
+        compaction: Compactación de la ejecución
+        
+    Returns:
+        Posiciones escaladas al modelo fuerte
+    """
+    indices = list(range(len(batch_transcripts)))
+    failed_call = False
+    try:
+        salvaged = _request_group(
+            indices, batch_transcripts, batch_names, batch_start, tier=TIER_FAST, compaction=compaction
+        )
+    except Exception:
+        salvaged = {}
+        failed_call = True
+    
+    escalated = []
+    reasons: Counter = Counter()
+    for index in indices:
+        reason = ESCALATION_ERROR if failed_call else get_escalation_reason(salvaged.get(index), batch_transcripts[index])
+        if reason:
+            escalated.append(index)
+            reasons[reason] += 1
+            continue
+        results[index] = salvaged[index]
+        if on_result:
+            on_result(index, results[index])
+    
+    tracker = get_cascade_tracker()
+    tracker.record_resolved(TIER_FAST, len(indices) - len(escalated))
+    tracker.record_escalations(reasons)
+    return escalated
+
+
+def _process_long_transcript(
+    transcript: str,
+    client_name: str,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    compaction: Optional[CompactionRun] = None
+) -> Dict[str, Any]:
+    """
+    Categoriza una transcripción larga por fragmentos, con la categorización por defecto ante fallos.
+    
+    Args:
+        transcript: Texto de la transcripción
+        client_name: Nombre del cliente
+        on_result: Callback opcional (posición 0, resultado) si la categorización es válida
+        compaction: Compactación de la ejecución
+        
+    Returns:
+        Categorización combinada o por defecto
+    """
+    try:
+        result = categorize_long_transcript(transcript, client_name, compaction=compaction)
+    except Exception as e:
+        st.warning(f"⚠️ Error al categorizar la transcripción larga de {client_name}: {str(e)[:100]}")
+        return get_default_categorization()
+    
+    if on_result:
+        on_result(0, result)
+    return result
+
+
+def _categorize_group(
+    indices: List[int],
+    batch_transcripts: List[str],
+    batch_names: List[str],
+    batch_start: int,
+    results: List[Optional[Dict[str, Any]]],
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    tier: Optional[str] = None,
+    compaction: Optional[CompactionRun] = None
+) -> str:
+    """
+    Categoriza las posiciones `indices` del grupo, bisecando ante fallos repetidos.
+    
+    Escribe cada resultado válido en `results`. Las llamadas que recuperan
+    al menos un objeto no cuentan como fallo; tras SPLIT_AFTER_FAILURES
+    fallos seguidos el subgrupo se divide en dos mitades. Los errores de
+    rate limit tampoco cuentan como fallo: las posiciones pendientes se
+    reenvían cuando el controlador de concurrencia lo permite.
+    
+    Args:
+        indices: Posiciones (dentro del grupo) pendientes de categorizar
+        batch_transcripts: Transcripciones del grupo
+        batch_names: Nombres del grupo
+        batch_start: Índice de inicio del grupo
+        results: Lista de resultados del grupo, se completa in-place
+        on_result: Callback opcional por cada categorización válida
+        tier: Nivel de la cascada (None sin cascada)
+        compaction: Compactación de la ejecución
+        
+    Returns:
+        Último mensaje de error observado ("" si no hubo errores)
+        
+    Raises:
+        Exception: Si la API sigue respondiendo con rate limit/cuota tras
+            RATE_LIMIT_MAX_REQUEUES reenvíos
+    """
+    remaining = list(indices)
+    failures = 0
+    requeues = 0
+    last_error = ""
+    
+    while remaining:
+        if failures >= RETRY_ATTEMPTS or (failures >= SPLIT_AFTER_FAILURES and len(remaining) > 1):
+            break
+        
+        if failures > 0:
+            time.sleep(2 ** failures)  # Exponential backoff
+        
+        try:
+            salvaged = _request_group(
+                remaining, batch_transcripts, batch_names, batch_start, on_result, tier, compaction
+            )
+        except Exception as e:
+            if is_rate_limit_error(e):
+                requeues += 1
+                if requeues > RATE_LIMIT_MAX_REQUEUES:
+                    raise
+                continue
+            salvaged = {}
+            last_error = str(e)
+        
+        if not salvaged:
+            failures += 1
+            if not last_error:
+                last_error = "La respuesta no contenía categorizaciones válidas"
+            continue
+        
+        for index, result in salvaged.items():
+            results[index] = result
+        remaining = [index for index in remaining if index not in salvaged]
+    
+    if len(remaining) > 1:
+        middle = len(remaining) // 2
+        for half in (remaining[:middle], remaining[middle:]):
+            last_error = _categorize_group(
+                half, batch_transcripts, batch_names, batch_start, results, on_result, tier, compaction
+            ) or last_error
+    
+    return last_error
+
+
+def _request_group(
+    indices: List[int],
+    batch_transcripts: List[str],
+    batch_names: List[str],
+    batch_start: int,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    tier: Optional[str] = None,
+    compaction: Optional[CompactionRun] = None
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Envía una llamada con las transcripciones `indices` y rescata los objetos válidos.
+    
+    Con STREAM_BATCH_RESPONSES cada objeto se asocia a su transcripción y se
+    notifica por `on_result` apenas se cierra en el stream. Si el stream se
+    corta (también por rate limit), se conservan los objetos que ya habían
+    llegado. La llamada ocupa un lugar del controlador de concurrencia,
+    que se libera informando si terminó bien o con un 429. Los campos
+    resueltos por el pre-extractor local se omiten en la respuesta y se
+    completan aquí antes de validar. Con NATIVE_RESPONSE_SCHEMA la llamada
+    lleva el schema del array y el prompt reducido. Con CONTEXT_CACHE_ENABLED
+    las instrucciones viajan como prefijo cacheable y el prompt solo lleva
+    las transcripciones, compactadas (ver compaction.py). Con `tier` la
+    llamada usa el modelo de ese nivel de la cascada y se registra su
+    latencia; el nivel económico además pide "confianza" por objeto.
+    
+    Args:
+        indices: Posiciones (dentro del grupo) a enviar
+        batch_transcripts: Transcripciones del grupo
+        batch_names: Nombres del grupo
+        batch_start: Índice de inicio del grupo
+        on_result: Callback opcional por cada categorización válida
+        tier: Nivel de la cascada (None sin cascada: GEMINI_MODEL)
+        compaction: Compactación de la ejecución (frases de cortesía de la carga)
+        
+    Returns:
+        Dict {posición: categorización} solo con los objetos válidos
+    """
+    transcript_ids = [batch_start + index + 1 for index in indices]
+    hints = [get_prompt_hints(batch_transcripts[index]) for index in indices]
+    skip_fields = get_shared_resolved_fields(hints)
+    model_name = get_tier_model_name(tier) if tier else None
+    with_confidence = tier == TIER_FAST
+    cached_prefix = (
+        build_batch_instruction_prefix(skip_fields, NATIVE_RESPONSE_SCHEMA, with_confidence)
+        if CONTEXT_CACHE_ENABLED else None
+    )
     prompt = build_batch_categorization_prompt(
-        batch_transcripts, 
-        batch_names, 
-        batch_start, 
-        batch_size
+        compact_transcripts((batch_transcripts[index] for index in indices), compaction),
+        [batch_names[index] for index in indices],
+        batch_start,
+        len(indices),
+        transcript_ids=transcript_ids,
+        hints=hints,
+        native_schema=NATIVE_RESPONSE_SCHEMA,
+        include_instructions=cached_prefix is None,
+        with_confidence=with_confidence
+    )
+    response_schema = (
+        get_response_schema(skip_fields, batch=True, with_confidence=with_confidence)
+        if NATIVE_RESPONSE_SCHEMA else None
     )
     
-    for attempt in range(RETRY_ATTEMPTS):
+    position_by_id = {transcript_id: position for position, transcript_id in enumerate(transcript_ids)}
+    matched: Dict[int, Dict[str, Any]] = {}
+    unmatched: List[Any] = []
+    
+    def on_item(obj: Any) -> None:
+        if not (isinstance(obj, dict) and "transcripcion_id" in obj):
+            unmatched.append(obj)
+            return
         try:
-            if attempt > 0:
-                time.sleep(2 ** attempt)  # Exponential backoff
-            
-            batch_results = call_gemini_batch_api(prompt, batch_size)
-            
-            for result in batch_results:
-                result["_categorization_success"] = True
-            
-            return batch_results
+            position = position_by_id.get(int(obj.pop("transcripcion_id")))
+        except (TypeError, ValueError):
+            return
+        if _accept_result(obj, position, matched, hints, model_name) and on_result:
+            on_result(indices[position], obj)
+    
+    controller = get_concurrency_controller()
+    dispatched_at = controller.acquire()
+    outcome = OUTCOME_ERROR
+    
+    try:
+        get_rate_limiter().acquire(estimate_call_tokens((cached_prefix or "") + prompt, len(indices)))
+        call_start = time.perf_counter()
+        if STREAM_BATCH_RESPONSES:
+            stream_gemini_batch_api(
+                prompt,
+                on_item=on_item,
+                response_schema=response_schema,
+                cached_prefix=cached_prefix,
+                model_name=model_name
+            )
+        else:
+            for obj in call_gemini_batch_api_raw(
+                prompt, response_schema=response_schema, cached_prefix=cached_prefix, model_name=model_name
+            ):
+                on_item(obj)
+        outcome = OUTCOME_SUCCESS
+        if tier:
+            get_cascade_tracker().record_call(tier, len(indices), time.perf_counter() - call_start)
+    except Exception as e:
+        if is_rate_limit_error(e):
+            outcome = OUTCOME_RATE_LIMITED
+        if not matched:
+            raise
+    finally:
+        controller.release(dispatched_at, outcome)
+    
+    # Sin "transcripcion_id" en ningún objeto se recurre al orden de la
+    # respuesta, solo cuando la cantidad de objetos coincide
+    if not matched and len(unmatched) == len(transcript_ids):
+        for position, obj in enumerate(unmatched):
+            if _accept_result(obj, position, matched, hints, model_name) and on_result:
+                on_result(indices[position], obj)
+    
+    return {indices[position]: result for position, result in matched.items()}
+
+
+def _accept_result(
+    obj: Any,
+    position: Optional[int],
+    matched: Dict[int, Dict[str, Any]],
+    hints: List[Dict[str, Any]],
+    model_name: Optional[str] = None
+) -> bool:
+    """
+    Registra `obj` en `matched` si es una categorización válida para una posición libre.
+    
+    Args:
+        obj: Elemento parseado de la respuesta
+        position: Posición de la transcripción asociada (None si no corresponde)
+        matched: Dict {posición: categorización}, se completa in-place
+        hints: Campos pre-extraídos por posición, se agregan al objeto
+        model_name: Modelo que produjo el objeto, para su versión (None: GEMINI_MODEL)
         
-        except Exception as e:
-            error_msg = str(e)
-            
-            if "429" in error_msg or "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                st.error(f"❌ Límite de API alcanzado en batch {batch_start+1}-{batch_start+batch_size}")
-                st.info("💡 Espera unos minutos o verifica tu cuota en Google AI Studio")
-                return [get_default_categorization() for _ in range(batch_size)]
-            
-            if attempt == RETRY_ATTEMPTS - 1:
-                st.warning(f"⚠️ Error en grupo {batch_start+1}-{batch_start+batch_size}: {error_msg[:100]}")
+    Returns:
+        True si el objeto fue aceptado
+    """
+    if not isinstance(obj, dict) or position is None or position in matched:
+        return False
+    
+    obj.update(hints[position])
+    if not is_valid_categorization(obj):
+        return False
+    
+    mark_categorized(obj, model_name)
+    matched[position] = obj
+    return True
+
+
+def _log_batch_plan(batches: List[Tuple[int, int]]) -> None:
+    """Imprime la distribución de tamaños del plan para ajustar el presupuesto de tokens."""
+    if not batches:
+        return
+    
+    plan = describe_batch_plan(batches)
+    print(
+        f"📦 {plan['items']} transcripciones en {plan['batches']} batches "
+        f"(tamaño {plan['min_size']}-{plan['max_size']}, promedio {plan['avg_size']}): "
+        f"{plan['size_distribution']}"
+    )
+
+
+def _log_reuse(stats: Dict[str, int]) -> None:
+    """Imprime cuántas transcripciones se resolvieron sin llamar al modelo."""
+    reused = stats["total"] - stats["model_items"]
+    if stats["total"] == 0 or reused == 0:
+        return
+    
+    print(
+        f"♻️ {reused}/{stats['total']} transcripciones sin llamar al modelo "
+        f"({reused / stats['total']:.0%}): {stats['cache_hits']} del caché, "
+        f"{stats['checkpoint_hits']} del checkpoint, {stats['near_duplicate_hits']} casi duplicadas, "
+        f"{stats['coalesced_items']} repetidas en la misma carga"
+    )
+
+
+def _log_context_cache_savings(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """Imprime los tokens de instrucciones que la ejecución sirvió desde el caché de contexto."""
+    cached_calls = after["cached_calls"] - before["cached_calls"]
+    inline_calls = after["inline_calls"] - before["inline_calls"]
+    if cached_calls + inline_calls == 0:
+        return
+    
+    cached_tokens = after["cached_tokens"] - before["cached_tokens"]
+    inline_tokens = after["inline_prefix_tokens"] - before["inline_prefix_tokens"]
+    total = cached_tokens + inline_tokens
+    print(
+        f"🧠 Caché de contexto: {cached_calls}/{cached_calls + inline_calls} llamadas con instrucciones cacheadas · "
+        f"{cached_tokens:,} de {total:,} tokens de instrucciones sin reenviar "
+        f"({cached_tokens / total if total else 0:.0%})"
+    )
+
+
+def _log_compaction_savings(stats: Dict[str, Any]) -> None:
+    """Imprime cuántos tokens de transcripciones ahorró la compactación en la ejecución."""
+    if stats["raw_tokens"] == 0:
+        return
+    
+    print(
+        f"🗜️ Compactación: {stats['raw_tokens']:,} → {stats['compact_tokens']:,} tokens de transcripciones "
+        f"({-stats['reduction']:+.1%}) · {stats['boilerplate_phrases']} frases de cortesía aprendidas"
+    )
+
+
+def _log_cascade(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """Imprime cuántas transcripciones resolvió cada nivel de la cascada en la ejecución."""
+    fast_items = after["tiers"][TIER_FAST]["items"] - before["tiers"][TIER_FAST]["items"]
+    if fast_items == 0:
+        return
+    
+    parts = []
+    for tier, label in ((TIER_FAST, "económico"), (TIER_STRONG, "fuerte")):
+        stats = after["tiers"][tier]
+        resolved = stats["resolved"] - before["tiers"][tier]["resolved"]
+        parts.append(f"{resolved} en el modelo {label} ({stats['model']}, p50 {stats['latency']['p50']:.1f}s)")
     
-    # Si falla después de todos los intentos, usar valores por defecto
-    return [get_default_categorization() for _ in range(batch_size)]
+    escalations = {
+        reason: count - before["escalations"].get(reason, 0)
+        for reason, count in after["escalations"].items()
+        if count > before["escalations"].get(reason, 0)
+    }
+    print(f"🪜 Cascada: {' · '.join(parts)} · escaladas: {escalations or 0}")
+
+
+def _attach_script_context(ctx) -> None:
+    """Asocia el contexto de Streamlit al worker para que pueda emitir mensajes."""
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def _run_batches(
+    transcripts: List[str],
+    client_names: List[str],
+    on_result: Callable[[int, Dict[str, Any]], None],
+    on_batch_done: Callable[[int, List[Dict[str, Any]]], None],
+    max_workers: int,
+    compaction: Optional[CompactionRun] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ejecuta los grupos en un pool de hilos y reensambla los resultados en orden.
+    
+    Los workers publican cada categorización en una cola a medida que llega;
+    el hilo principal la vacía mientras espera, así los callbacks (y la UI)
+    se ejecutan siempre en el hilo principal.
+    
+    Args:
+        transcripts: Transcripciones a categorizar
+        client_names: Nombres de clientes alineados con transcripts
+        on_result: Callback (índice, resultado) invocado desde el hilo
+            principal por cada categorización válida recibida
+        on_batch_done: Callback (batch_start, resultados) invocado desde el
+            hilo principal cada vez que termina un grupo
+        max_workers: Cantidad máxima de grupos procesándose en paralelo
+        compaction: Compactación de la ejecución, compartida por los grupos
+        
+    Returns:
+        Lista de resultados en el mismo orden de entrada
+    """
+    batches = plan_batches(transcripts)
+    _log_batch_plan(batches)
+    results_by_start: Dict[int, List[Dict[str, Any]]] = {}
+    events: "queue.Queue[Tuple[int, Dict[str, Any]]]" = queue.Queue()
+    
+    def drain_events() -> None:
+        while True:
+            try:
+                index, result = events.get_nowait()
+            except queue.Empty:
+                return
+            on_result(index, result)
+    
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers),
+        initializer=_attach_script_context,
+        initargs=(get_script_run_ctx(),)
+    ) as executor:
+        futures = {
+            executor.submit(
+                process_batch,
+                transcripts[batch_start:batch_end],
+                client_names[batch_start:batch_end],
+                batch_start,
+                lambda index, result, batch_start=batch_start: events.put((batch_start + index, result)),
+                compaction
+            ): batch_start
+            for batch_start, batch_end in batches
+        }
+        
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, timeout=_EVENT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            drain_events()
+            for future in done:
+                batch_start = futures[future]
+                results_by_start[batch_start] = future.result()
+                on_batch_done(batch_start, results_by_start[batch_start])
+    
+    results = []
+    for batch_start, _ in batches:
+        results.extend(results_by_start[batch_start])
+    
+    return results
 
 
 def batch_categorize_with_progress(
     transcripts: List[str],
     client_names: List[str],
-    progress_callback: Optional[Callable] = None
+    progress_callback: Optional[Callable] = None,
+    max_workers: int = MAX_CONCURRENT_BATCHES,
+    result_callback: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    job_id: Optional[str] = None,
+    run_stats: Optional[Dict[str, int]] = None
 ) -> List[Dict[str, Any]]:
     """
     Categoriza múltiples transcripciones en grupos con actualización de progreso.
     
+    Primero consulta el checkpoint del trabajo (si hay `job_id`), el caché
+    persistente y el índice de casi-duplicados (NEAR_DUPLICATE_ENABLED);
+    solo las transcripciones sin resultado se envían a Gemini, y las que se
+    repiten dentro de la carga (idénticas tras normalizar) se envían una
+    sola vez y su resultado se copia a cada índice. Mantiene hasta `max_workers`
+    grupos en vuelo al mismo tiempo; el ritmo de llamadas lo regula el
+    rate limiter (requests y tokens por minuto) y el controlador de
+    concurrencia adaptativo, que pausa los despachos ante errores 429.
+    
     Args:
         transcripts: Lista de transcripciones
         client_names: Lista de nombres de clientes
-        progress_callback: Función opcional para actualizar progreso
-        
+        progress_callback: Función opcional para actualizar progreso.
+            Se invoca desde el hilo principal con (procesadas, total)
+        max_workers: Cantidad máxima de grupos procesándose en paralelo
+        result_callback: Función opcional invocada desde el hilo principal
+            con (índice, categorización) una vez por transcripción, apenas
+            su resultado está disponible (antes de que termine su grupo)
+        job_id: Trabajo de categorización (src.core.database.jobs) en el que
+            se guarda un checkpoint al terminar cada grupo
+        run_stats: Dict opcional que se completa con el origen de los
+            resultados: total, cache_hits, checkpoint_hits,
+            near_duplicate_hits, coalesced_items y model_items
+            
     Returns:
-        Lista de diccionarios con categorías
+        Lista de diccionarios con categorías, en el mismo orden de entrada
     """
     total = len(transcripts)
-    results = []
-    failed_count = 0
-    
-    for batch_start in range(0, total, BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, total)
-        batch_results = process_batch(
-            transcripts[batch_start:batch_end],
-            client_names[batch_start:batch_end],
-            batch_start
-        )
-        
-        results.extend(batch_results)
-        
-        failed_count += sum(1 for r in batch_results if not r.get("_categorization_success", True))
-        
+    cache_keys = [build_cache_key(t, n) for t, n in zip(transcripts, client_names)]
+    results = get_cached_categorizations(cache_keys)
+    stats = run_stats if run_stats is not None else {}
+    stats.update({"total": total, "cache_hits": sum(1 for result in results if result is not None)})
+    
+    stats["checkpoint_hits"] = 0
+    if job_id:
+        for i, result in load_job_checkpoint(job_id).items():
+            # Un checkpoint de una versión anterior del prompt no se reutiliza
+            if i < total and results[i] is None and is_current_version(result):
+                results[i] = result
+                stats["checkpoint_hits"] += 1
+    
+    stats["near_duplicate_hits"] = 0
+    if NEAR_DUPLICATE_ENABLED:
+        missing = [i for i, result in enumerate(results) if result is None]
+        for position, (result, _) in find_near_duplicates([transcripts[i] for i in missing]).items():
+            results[missing[position]] = result
+            stats["near_duplicate_hits"] += 1
+    
+    if job_id:
+        save_job_checkpoint(job_id, [(i, result) for i, result in enumerate(results) if result is not None])
+    
+    unresolved = [i for i, result in enumerate(results) if result is None]
+    pending, repeats = _coalesce_identical(unresolved, transcripts)
+    stats["coalesced_items"] = len(unresolved) - len(pending)
+    stats["model_items"] = len(pending)
+    _log_reuse(stats)
+    completed = total - len(unresolved)
+    reported = set()
+    
+    if result_callback:
+        for i, result in enumerate(results):
+            if result is not None:
+                result_callback(i, result)
+    
+    if progress_callback and completed > 0:
+        progress_callback(completed, total)
+    
+    def report(position: int, result: Dict[str, Any]) -> None:
+        nonlocal completed
+        if position in reported:
+            return
+        reported.add(position)
+        for i, item_result in _fan_out(pending[position], result, repeats):
+            completed += 1
+            if result_callback:
+                result_callback(i, item_result)
+    
+    def on_result(position: int, result: Dict[str, Any]) -> None:
+        report(position, result)
         if progress_callback:
-            progress_callback(batch_end, total)
+            progress_callback(completed, total)
+    
+    def on_batch_done(batch_start: int, batch_results: List[Dict[str, Any]]) -> None:
+        batch_indices = pending[batch_start:batch_start + len(batch_results)]
+        if NEAR_DUPLICATE_ENABLED:
+            index_categorizations([transcripts[i] for i in batch_indices], batch_results)
+        entries = [
+            entry
+            for i, result in zip(batch_indices, batch_results)
+            for entry in _fan_out(i, result, repeats)
+        ]
+        store_categorizations([(cache_keys[i], result) for i, result in entries])
+        if job_id:
+            save_job_checkpoint(job_id, entries)
+        # Las transcripciones sin resultado en streaming (defaults) se reportan al cerrar el grupo
+        for offset, result in enumerate(batch_results):
+            report(batch_start + offset, result)
+        if progress_callback:
+            progress_callback(completed, total)
+    
+    compaction = start_compaction_run(transcripts)
+    context_cache_before = get_context_cache().get_stats()
+    cascade_before = get_cascade_tracker().get_stats()
+    try:
+        pending_results = _run_batches(
+            [transcripts[i] for i in pending],
+            [client_names[i] for i in pending],
+            on_result,
+            on_batch_done,
+            max_workers,
+            compaction
+        )
+    finally:
+        compaction_stats = compaction.finish()
+    _log_context_cache_savings(context_cache_before, get_context_cache().get_stats())
+    _log_compaction_savings(compaction_stats)
+    _log_cascade(cascade_before, get_cascade_tracker().get_stats())
+    
+    for representative, result in zip(pending, pending_results):
+        for i, item_result in _fan_out(representative, result, repeats):
+            results[i] = item_result
+    
+    return results
+
+
+def _coalesce_identical(indices: List[int], transcripts: List[str]) -> Tuple[List[int], Dict[int, List[int]]]:
+    """
+    Agrupa las transcripciones idénticas (tras normalizar) para categorizarlas una vez.
+    
+    Args:
+        indices: Índices sin resultado, en orden
+        transcripts: Todas las transcripciones de la ejecución
         
-        if batch_end < total:
-            time.sleep(RATE_LIMIT_DELAY)
+    Returns:
+        Tupla (representantes en orden de primera aparición,
+        {representante: índices repetidos que reciben su resultado})
+    """
+    groups: Dict[str, List[int]] = {}
+    for i in indices:
+        groups.setdefault(normalize_transcript(transcripts[i]), []).append(i)
     
-    return results
\ No newline at end of file
+    representatives = [group[0] for group in groups.values()]
+    repeats = {group[0]: group[1:] for group in groups.values() if len(group) > 1}
+    return representatives, repeats
+
+
+def _fan_out(
+    representative: int,
+    result: Dict[str, Any],
+    repeats: Dict[int, List[int]]
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Retorna (índice, resultado) del representante y una copia por cada repetición."""
+    return [(representative, result)] + [
+        (i, copy.deepcopy(result)) for i in repeats.get(representative, [])
+    ]
@@ -5,12 +5,18 @@ Gestión del caché de categorizaciones.
 import streamlit as st
 
 from .single import categorize_single_transcript
+from .persistent_cache import clear_persistent_cache
 
 
-def clear_categorization_cache() -> None:
+def clear_categorization_cache(persistent: bool = True) -> None:
     """
     Limpia el caché de categorizaciones.
     Útil cuando se quiere forzar una re-categorización.
+    
+    Args:
+        persistent: Si también debe vaciar el caché persistente en SQLite
     """
     categorize_single_transcript.clear()
+    if persistent:
+        clear_persistent_cache()
     st.success("✅ Caché limpio")
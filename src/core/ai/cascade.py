@@ -0,0 +1,162 @@
+"""
+Cascada de modelos: primero el económico, luego el fuerte.
+
+Con CASCADE_ENABLED cada batch se envía primero a GEMINI_FAST_MODEL, que
+además reporta su "confianza" por transcripción. Se escalan a
+GEMINI_MODEL (con los reintentos y bisección habituales) solo las
+transcripciones cuyo resultado:
+- no llegó o no cumple el schema (invalid / error)
+- trae confianza menor a CASCADE_MIN_CONFIDENCE (low_confidence)
+- contradice a la pre-extracción local (disagreement)
+
+CascadeTracker cuenta llamadas, transcripciones, resueltas y latencia por
+nivel, y los motivos de escalamiento, para ajustar los umbrales según
+costo y precisión.
+"""
+
+import threading
+from collections import Counter, deque
+from typing import Dict, Any, Optional
+
+from .client_pool import summarize_latencies
+from .config import get_gemini_fast_model_name, get_gemini_model_name
+from .local_extractor import find_local_disagreements
+from .response_schema import CONFIDENCE_FIELD
+from .defaults import CASCADE_LOCAL_MIN_CONFIDENCE, CASCADE_MIN_CONFIDENCE
+
+
+TIER_FAST = "fast"
+TIER_STRONG = "strong"
+
+ESCALATION_ERROR = "error"
+ESCALATION_INVALID = "invalid"
+ESCALATION_LOW_CONFIDENCE = "low_confidence"
+ESCALATION_DISAGREEMENT = "disagreement"
+
+_LATENCY_WINDOW = 10_000
+
+
+def get_tier_model_name(tier: str) -> str:
+    """
+    Retorna el modelo de un nivel de la cascada.
+    
+    Args:
+        tier: TIER_FAST o TIER_STRONG
+        
+    Returns:
+        Nombre del modelo de Gemini
+    """
+    return get_gemini_fast_model_name() if tier == TIER_FAST else get_gemini_model_name()
+
+
+def get_escalation_reason(
+    result: Optional[Dict[str, Any]],
+    transcript: str,
+    min_confidence: float = CASCADE_MIN_CONFIDENCE,
+    local_min_confidence: float = CASCADE_LOCAL_MIN_CONFIDENCE
+) -> Optional[str]:
+    """
+    Decide si un resultado del modelo económico debe escalarse.
+    
+    Quita "confianza" del resultado: no forma parte de la categorización.
+    
+    Args:
+        result: Categorización válida del modelo económico (None si no llegó)
+        transcript: Texto de la transcripción
+        min_confidence: Confianza mínima reportada para aceptar el resultado
+        local_min_confidence: Confianza mínima del extractor local para
+            considerar una contradicción
+            
+    Returns:
+        Motivo de escalamiento o None si el resultado se acepta
+    """
+    if result is None:
+        return ESCALATION_INVALID
+    
+    confidence = result.pop(CONFIDENCE_FIELD, None)
+    if not isinstance(confidence, (int, float)) or confidence < min_confidence:
+        return ESCALATION_LOW_CONFIDENCE
+    
+    if find_local_disagreements(result, transcript, local_min_confidence):
+        return ESCALATION_DISAGREEMENT
+    
+    return None
+
+
+class CascadeTracker:
+    """Métricas por nivel de la cascada, compartidas entre threads."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {
+            tier: {"calls": 0, "items": 0, "resolved": 0, "latencies": deque(maxlen=_LATENCY_WINDOW)}
+            for tier in (TIER_FAST, TIER_STRONG)
+        }
+        self._escalations: Counter = Counter()
+    
+    def record_call(self, tier: str, items: int, elapsed: float) -> None:
+        """
+        Registra una llamada completada de un nivel.
+        
+        Args:
+            tier: Nivel de la cascada
+            items: Transcripciones enviadas
+            elapsed: Duración de la llamada en segundos
+        """
+        with self._lock:
+            stats = self._tiers[tier]
+            stats["calls"] += 1
+            stats["items"] += items
+            stats["latencies"].append(elapsed)
+    
+    def record_resolved(self, tier: str, count: int) -> None:
+        """Suma transcripciones que quedaron categorizadas en el nivel."""
+        with self._lock:
+            self._tiers[tier]["resolved"] += count
+    
+    def record_escalations(self, reasons: Counter) -> None:
+        """Suma transcripciones escaladas por motivo."""
+        with self._lock:
+            self._escalations.update(reasons)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas acumuladas.
+        
+        Returns:
+            Dict con tiers ({nivel: model, calls, items, resolved, latency})
+            y escalations ({motivo: cantidad})
+        """
+        with self._lock:
+            return {
+                "tiers": {
+                    tier: {
+                        "model": get_tier_model_name(tier),
+                        "calls": stats["calls"],
+                        "items": stats["items"],
+                        "resolved": stats["resolved"],
+                        "latency": summarize_latencies(list(stats["latencies"])),
+                    }
+                    for tier, stats in self._tiers.items()
+                },
+                "escalations": dict(self._escalations),
+            }
+
+
+_tracker: Optional[CascadeTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_cascade_tracker() -> CascadeTracker:
+    """
+    Retorna el registro de métricas de la cascada del proceso.
+    
+    Returns:
+        Instancia única de CascadeTracker
+    """
+    global _tracker
+    
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = CascadeTracker()
+        return _tracker
@@ -1,24 +1,40 @@
 """
 Llamadas a la API de Google Gemini.
+
+Las respuestas se obtienen del proveedor activo (providers.py), que puede
+ser la API real, grabaciones o un simulador.
 """
 
 import json
 import re
-from typing import Dict, Any, List
-
-import google.generativeai as genai
+from typing import Dict, Any, List, Optional, Callable
 
-from .config import get_gemini_model_name
+from .json_stream import JsonArrayStreamParser
+from .providers import get_provider
 from .defaults import SINGLE_TIMEOUT, BATCH_TIMEOUT
 
 
-def call_gemini_api(prompt: str, timeout: int = SINGLE_TIMEOUT) -> Dict[str, Any]:
+JSON_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "temperature": 0.1,
+}
+
+# Comas finales antes de } o ]: el único defecto que se repara
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def call_gemini_api(
+    prompt: str,
+    timeout: int = SINGLE_TIMEOUT,
+    response_schema: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Realiza una llamada a la API de Gemini para una sola categorización.
     
     Args:
         prompt: Prompt construido
         timeout: Timeout en segundos
+        response_schema: Schema de salida opcional (ver response_schema.py)
         
     Returns:
         Dict con el resultado parseado
@@ -26,16 +42,8 @@ def call_gemini_api(prompt: str, timeout: int = SINGLE_TIMEOUT) -> Dict[str, Any
     Raises:
         Exception: Si hay error en la llamada a la API
     """
-    model = genai.GenerativeModel(
-        model_name=get_gemini_model_name(),
-        generation_config={
-            "response_mime_type": "application/json",
-            "temperature": 0.1,
-        }
-    )
-    
-    response = model.generate_content(prompt, request_options={"timeout": timeout})
-    return parse_json_response(response.text)
+    response_text = get_provider().generate(prompt, _generation_config(response_schema), timeout)
+    return parse_json_response(response_text)
 
 
 def call_gemini_batch_api(prompt: str, expected_size: int, timeout: int = BATCH_TIMEOUT) -> List[Dict[str, Any]]:
@@ -54,16 +62,7 @@ def call_gemini_batch_api(prompt: str, expected_size: int, timeout: int = BATCH_
         ValueError: Si el número de resultados no coincide
         Exception: Si hay error en la llamada a la API
     """
-    model = genai.GenerativeModel(
-        model_name=get_gemini_model_name(),
-        generation_config={
-            "response_mime_type": "application/json",
-            "temperature": 0.1,
-        }
-    )
-    
-    response = model.generate_content(prompt, request_options={"timeout": timeout})
-    batch_results = json.loads(response.text.strip())
+    batch_results = call_gemini_batch_api_raw(prompt, timeout)
     
     if len(batch_results) != expected_size:
         raise ValueError(f"Se esperaban {expected_size} resultados pero se recibieron {len(batch_results)}")
@@ -71,6 +70,96 @@ def call_gemini_batch_api(prompt: str, expected_size: int, timeout: int = BATCH_
     return batch_results
 
 
+def call_gemini_batch_api_raw(
+    prompt: str,
+    timeout: int = BATCH_TIMEOUT,
+    response_schema: Optional[Dict[str, Any]] = None,
+    cached_prefix: Optional[str] = None,
+    model_name: Optional[str] = None
+) -> List[Any]:
+    """
+    Realiza una llamada de batch sin exigir la cantidad de resultados.
+    
+    Permite rescatar los objetos válidos de una respuesta incompleta.
+    
+    Args:
+        prompt: Prompt construido
+        timeout: Timeout en segundos
+        response_schema: Schema de salida opcional (array, ver response_schema.py)
+        cached_prefix: Instrucciones estáticas que el proveedor puede servir
+            desde el caché de contexto (ver context_cache.py)
+        model_name: Modelo a usar (por defecto GEMINI_MODEL)
+        
+    Returns:
+        Lista con los elementos parseados (un objeto suelto se envuelve en lista)
+        
+    Raises:
+        json.JSONDecodeError: Si la respuesta no es JSON válido
+        Exception: Si hay error en la llamada a la API
+    """
+    response_text = get_provider().generate(
+        prompt, _generation_config(response_schema), timeout, cached_prefix, model_name
+    )
+    batch_results = json.loads(response_text.strip())
+    
+    if isinstance(batch_results, dict):
+        return [batch_results]
+    
+    return batch_results
+
+
+def stream_gemini_batch_api(
+    prompt: str,
+    on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+    timeout: int = BATCH_TIMEOUT,
+    response_schema: Optional[Dict[str, Any]] = None,
+    cached_prefix: Optional[str] = None,
+    model_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Realiza una llamada de batch en streaming y entrega cada objeto al cerrarse.
+    
+    El primer resultado queda disponible apenas el modelo termina de
+    escribirlo, sin esperar al resto del array. Si el stream se corta, los
+    objetos ya entregados se conservan (on_item ya fue invocado con ellos).
+    
+    Args:
+        prompt: Prompt construido
+        on_item: Callback opcional invocado con cada objeto parseado
+        timeout: Timeout en segundos
+        response_schema: Schema de salida opcional (array, ver response_schema.py)
+        cached_prefix: Instrucciones estáticas que el proveedor puede servir
+            desde el caché de contexto (ver context_cache.py)
+        model_name: Modelo a usar (por defecto GEMINI_MODEL)
+        
+    Returns:
+        Lista de objetos parseados en orden de llegada
+        
+    Raises:
+        ValueError: Si la respuesta termina con un objeto incompleto
+        Exception: Si hay error en la llamada a la API
+    """
+    parser = JsonArrayStreamParser()
+    items = []
+    
+    for chunk_text in get_provider().stream(
+        prompt, _generation_config(response_schema), timeout, cached_prefix, model_name
+    ):
+        for object_text in parser.feed(chunk_text):
+            try:
+                item = _loads_with_repair(object_text)
+            except json.JSONDecodeError:
+                continue
+            items.append(item)
+            if on_item:
+                on_item(item)
+    
+    if parser.has_pending:
+        raise ValueError(f"Respuesta truncada después de {len(items)} objetos")
+    
+    return items
+
+
 def parse_json_response(json_text: str) -> Dict[str, Any]:
     """
     Parsea la respuesta JSON de Gemini con limpieza automática.
@@ -85,14 +174,7 @@ def parse_json_response(json_text: str) -> Dict[str, Any]:
         json.JSONDecodeError: Si el JSON es inválido después de limpieza
         ValueError: Si la respuesta es una lista en lugar de un diccionario
     """
-    json_text = json_text.strip()
-    
-    try:
-        result = json.loads(json_text)
-    except json.JSONDecodeError:
-        json_text = re.sub(r',\s*}', '}', json_text)
-        json_text = re.sub(r',\s*]', ']', json_text)
-        result = json.loads(json_text)
+    result = _loads_with_repair(json_text)
     
     if isinstance(result, list):
         if len(result) > 0:
@@ -104,3 +186,31 @@ def parse_json_response(json_text: str) -> Dict[str, Any]:
         raise ValueError(f"Se esperaba un diccionario pero se recibió: {type(result)}")
     
     return result
+
+
+def _generation_config(response_schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agrega el response_schema a la configuración JSON base si corresponde."""
+    if response_schema is None:
+        return JSON_GENERATION_CONFIG
+    return {**JSON_GENERATION_CONFIG, "response_schema": response_schema}
+
+
+def _loads_with_repair(json_text: str) -> Any:
+    """
+    Parsea JSON eliminando comas finales si el primer intento falla.
+    
+    Args:
+        json_text: Texto JSON
+        
+    Returns:
+        Valor parseado
+        
+    Raises:
+        json.JSONDecodeError: Si el JSON es inválido después de limpieza
+    """
+    json_text = json_text.strip()
+    
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", json_text))
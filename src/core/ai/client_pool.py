@@ -0,0 +1,194 @@
+"""
+Pool de modelos de Gemini reutilizables entre llamadas y threads.
+
+Cada combinación (modelo, generation_config, caché de contexto) construye su
+GenerativeModel una sola vez. Todas las llamadas comparten así el mismo
+cliente gRPC del SDK, que mantiene la conexión abierta entre requests.
+El pool también registra la latencia de cada llamada para distinguir el
+costo de preparación (construir el modelo, primera conexión) del tiempo
+de generación.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.generativeai import caching
+
+
+_LATENCY_WINDOW = 500
+
+
+class GeminiClientPool:
+    """
+    Registro thread-safe de GenerativeModel por (modelo, generation_config).
+    
+    Las métricas se agrupan en tres fases:
+    - setup: construcción del GenerativeModel (solo la primera vez)
+    - cold: primera llamada de cada modelo (incluye abrir la conexión)
+    - warm: llamadas siguientes sobre la conexión ya abierta
+    """
+    
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], genai.GenerativeModel] = {}
+        self._warm_keys = set()
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {
+            phase: deque(maxlen=_LATENCY_WINDOW) for phase in ("setup", "cold", "warm")
+        }
+        self._calls = 0
+        self._errors = 0
+    
+    def get_model(
+        self,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        cached_content: Optional[caching.CachedContent] = None
+    ) -> genai.GenerativeModel:
+        """
+        Retorna el modelo para (model_name, generation_config), creándolo si no existe.
+        
+        Args:
+            model_name: Nombre del modelo de Gemini
+            generation_config: Configuración de generación
+            cached_content: Caché de contexto opcional (ver context_cache.py)
+            
+        Returns:
+            Instancia compartida de GenerativeModel
+        """
+        key = _model_key(model_name, generation_config, cached_content)
+        
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                if cached_content is not None:
+                    model = genai.GenerativeModel.from_cached_content(
+                        cached_content=cached_content,
+                        generation_config=generation_config
+                    )
+                else:
+                    model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+                self._latencies["setup"].append(time.perf_counter() - start)
+                self._models[key] = model
+            return model
+    
+    def generate(
+        self,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        prompt: str,
+        timeout: int,
+        cached_content: Optional[caching.CachedContent] = None,
+        **kwargs
+    ):
+        """
+        Ejecuta generate_content con el modelo compartido y registra la latencia.
+        
+        Args:
+            model_name: Nombre del modelo de Gemini
+            generation_config: Configuración de generación
+            prompt: Prompt a enviar
+            timeout: Timeout en segundos
+            cached_content: Caché de contexto opcional con el prefijo del prompt
+            **kwargs: Argumentos adicionales para generate_content (ej: stream)
+            
+        Returns:
+            Respuesta del SDK
+        """
+        key = _model_key(model_name, generation_config, cached_content)
+        model = self.get_model(model_name, generation_config, cached_content)
+        
+        with self._lock:
+            phase = "warm" if key in self._warm_keys else "cold"
+            self._warm_keys.add(key)
+            self._calls += 1
+        
+        start = time.perf_counter()
+        try:
+            return model.generate_content(prompt, request_options={"timeout": timeout}, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._latencies[phase].append(elapsed)
+    
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Resume las latencias registradas.
+        
+        Returns:
+            Dict con:
+            - calls / errors / models: Totales del pool
+            - setup / cold / warm: Dict con count, mean, p50 y p95 (segundos)
+            - connection_overhead: Diferencia media cold - warm (segundos)
+        """
+        with self._lock:
+            samples = {phase: list(values) for phase, values in self._latencies.items()}
+            stats: Dict[str, Any] = {
+                "calls": self._calls,
+                "errors": self._errors,
+                "models": len(self._models)
+            }
+        
+        for phase, values in samples.items():
+            stats[phase] = summarize_latencies(values)
+        
+        if stats["cold"]["count"] and stats["warm"]["count"]:
+            stats["connection_overhead"] = max(0.0, stats["cold"]["mean"] - stats["warm"]["mean"])
+        else:
+            stats["connection_overhead"] = None
+        
+        return stats
+
+
+def _model_key(
+    model_name: str,
+    generation_config: Dict[str, Any],
+    cached_content: Optional[caching.CachedContent] = None
+) -> Tuple[str, str, str]:
+    """Clave hashable para una combinación de modelo, configuración y caché de contexto."""
+    return (
+        model_name,
+        json.dumps(generation_config, sort_keys=True, default=str),
+        cached_content.name if cached_content is not None else ""
+    )
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, Any]:
+    """Calcula count, mean, p50 y p95 de una lista de latencias."""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0}
+    
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[int(0.50 * (len(ordered) - 1))],
+        "p95": ordered[int(0.95 * (len(ordered) - 1))]
+    }
+
+
+_client_pool: Optional[GeminiClientPool] = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> GeminiClientPool:
+    """
+    Retorna el pool de modelos compartido del proceso.
+    
+    Returns:
+        Instancia única de GeminiClientPool
+    """
+    global _client_pool
+    
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = GeminiClientPool()
+        return _client_pool
@@ -0,0 +1,293 @@
+"""
+Compactación de transcripciones antes de construir los prompts.
+
+Las transcripciones llegan a los prompts tal cual, con muletillas,
+saludos repetidos y espacios de sobra. compact_transcript:
+- normaliza los espacios y elimina muletillas ("eh", "mmm") y palabras
+  repetidas seguidas
+- descarta las oraciones repetidas dentro de la transcripción y las
+  frases de cortesía aprendidas del corpus de la ejecución
+  (start_compaction_run)
+- con COMPACTION_CUES_ONLY conserva solo las primeras oraciones y las
+  que tienen señales de volumen, preocupaciones o fuente, con sus vecinas
+  
+Solo cambia el texto que se envía al modelo: la transcripción original
+se guarda sin cambios, y la pre-extracción, el caché y los
+casi-duplicados siguen usando el texto original.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional
+
+from .near_duplicates import normalize_transcript
+from .tokens import estimate_tokens
+from .defaults import (
+    BOILERPLATE_MAX_WORDS,
+    BOILERPLATE_MIN_DOCUMENTS,
+    BOILERPLATE_MIN_RATIO,
+    COMPACTION_CONTEXT_SENTENCES,
+    COMPACTION_CUES_ONLY,
+    COMPACTION_ENABLED,
+    COMPACTION_LEAD_SENTENCES
+)
+
+
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_SPACE_BEFORE_PUNCTUATION = re.compile(r" +([,.;:!?…])")
+_LINE_BREAKS = re.compile(r"\s*\n\s*")
+_FILLERS = re.compile(r"(?<!\w)(?:e+h+m*|e+m+|m{2,}|a+h+|u+h+|u+m+)(?!\w)[,.…]*\s*", re.IGNORECASE)
+_REPEATED_WORD = re.compile(r"\b([^\W\d]+)(?:\s+\1\b)+", re.IGNORECASE)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+# Señales de los campos que el modelo extrae del texto: cifras (volumen),
+# preocupaciones y fuente. Una oración con alguna nunca es "de cortesía".
+_CUE_PATTERN = re.compile(
+    r"\d|"
+    r"integra|crm|ticket|sistema|tono|marca|personaliz|confidencial|privacidad|compliance|"
+    r"idioma|multiling|ingl[eé]s|volumen|satura|colaps|urgen|tiempo real|t[eé]cnic|"
+    r"pico|temporada|promoci|duplica|triplica|consulta|mensaje|interacci|"
+    r"whatsapp|instagram|correo|email|canal|reporte|anal[ií]tic|"
+    r"conoc|recomend|referi|evento|conferencia|feria|linkedin|webinar|podcast|google|busca|b[uú]squeda|colega",
+    re.IGNORECASE
+)
+
+_totals = {"transcripts": 0, "raw_tokens": 0, "compact_tokens": 0, "boilerplate_phrases": 0}
+_lock = threading.Lock()
+
+
+class CompactionRun:
+    """
+    Compactación de una ejecución de batch_categorize_with_progress.
+    
+    Guarda las frases de cortesía aprendidas de la carga y la reducción de
+    tokens de esa ejecución. Cada transcripción distinta se compacta y se
+    cuenta una sola vez, aunque se reenvíe por reintentos, bisección o la
+    cascada; dos ejecuciones en paralelo no comparten frases ni contadores.
+    """
+    
+    def __init__(self, boilerplate: FrozenSet[str] = frozenset()):
+        self.boilerplate = boilerplate
+        self._compacted: Dict[str, str] = {}
+        self._stats = {"transcripts": 0, "raw_tokens": 0, "compact_tokens": 0}
+        self._lock = threading.Lock()
+    
+    def compact(self, transcripts: Iterable[str]) -> List[str]:
+        """
+        Compacta las transcripciones de un prompt con las frases de la ejecución.
+        
+        Args:
+            transcripts: Textos originales
+            
+        Returns:
+            Lista de textos para el prompt, en el mismo orden
+        """
+        compacted = []
+        for transcript in transcripts:
+            with self._lock:
+                text = self._compacted.get(transcript)
+            if text is None:
+                text = compact_transcript(transcript, boilerplate=self.boilerplate)
+                with self._lock:
+                    if transcript not in self._compacted:
+                        self._compacted[transcript] = text
+                        self._stats["transcripts"] += 1
+                        self._stats["raw_tokens"] += estimate_tokens(transcript)
+                        self._stats["compact_tokens"] += estimate_tokens(text)
+            compacted.append(text)
+        return compacted
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna la reducción de tokens de la ejecución.
+        
+        Returns:
+            Dict con transcripts, raw_tokens, compact_tokens, reduction (0-1)
+            y boilerplate_phrases
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        return _with_reduction(stats, len(self.boilerplate))
+    
+    def finish(self) -> Dict[str, Any]:
+        """
+        Suma la ejecución a los totales del proceso (get_compaction_stats).
+        
+        Returns:
+            Estadísticas de la ejecución (ver get_stats)
+        """
+        stats = self.get_stats()
+        with _lock:
+            for key in ("transcripts", "raw_tokens", "compact_tokens"):
+                _totals[key] += stats[key]
+            _totals["boilerplate_phrases"] = stats["boilerplate_phrases"]
+        return stats
+
+
+def compact_transcript(
+    transcript: str,
+    cues_only: bool = COMPACTION_CUES_ONLY,
+    boilerplate: FrozenSet[str] = frozenset()
+) -> str:
+    """
+    Compacta una transcripción para el prompt.
+    
+    Args:
+        transcript: Texto original
+        cues_only: Si True conserva solo las oraciones con señales (y sus vecinas)
+        boilerplate: Frases normalizadas a descartar (ver learn_boilerplate)
+        
+    Returns:
+        Texto compactado
+    """
+    sentences = []
+    seen = set()
+    for sentence in _split_sentences(transcript):
+        key = normalize_transcript(sentence)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        if key in boilerplate and not _CUE_PATTERN.search(sentence):
+            continue
+        sentences.append(sentence.strip())
+    
+    if cues_only:
+        sentences = _keep_cue_sentences(sentences)
+    
+    return " ".join(sentences)
+
+
+def compact_transcripts(transcripts: Iterable[str], run: Optional[CompactionRun] = None) -> List[str]:
+    """
+    Compacta las transcripciones de un prompt y registra la reducción de tokens.
+    
+    Con `run` se usan sus frases de cortesía y la reducción se cuenta en
+    la ejecución; sin `run` (categorización individual) solo se limpian
+    muletillas y repeticiones y se suma directo a los totales del proceso.
+    Con COMPACTION_ENABLED en False las retorna sin cambios.
+    
+    Args:
+        transcripts: Textos originales
+        run: Ejecución en curso (ver start_compaction_run)
+        
+    Returns:
+        Lista de textos para el prompt, en el mismo orden
+    """
+    transcripts = list(transcripts)
+    if not COMPACTION_ENABLED:
+        return transcripts
+    
+    if run is not None:
+        return run.compact(transcripts)
+    
+    compacted = [compact_transcript(t) for t in transcripts]
+    
+    with _lock:
+        _totals["transcripts"] += len(transcripts)
+        _totals["raw_tokens"] += sum(estimate_tokens(t) for t in transcripts)
+        _totals["compact_tokens"] += sum(estimate_tokens(t) for t in compacted)
+    
+    return compacted
+
+
+def learn_boilerplate(
+    transcripts: List[str],
+    min_documents: int = BOILERPLATE_MIN_DOCUMENTS,
+    min_ratio: float = BOILERPLATE_MIN_RATIO,
+    max_words: int = BOILERPLATE_MAX_WORDS
+) -> FrozenSet[str]:
+    """
+    Aprende del corpus las frases de cortesía que se repiten entre transcripciones.
+    
+    Una oración corta (hasta `max_words` palabras) y sin señales que
+    aparece en al menos `min_ratio` de las transcripciones (y en no menos
+    de `min_documents`) se considera de cortesía: saludos, despedidas,
+    fórmulas de la llamada.
+    
+    Args:
+        transcripts: Corpus de transcripciones
+        min_documents: Mínimo absoluto de transcripciones en que debe aparecer
+        min_ratio: Fracción mínima de transcripciones en que debe aparecer
+        max_words: Largo máximo de una frase de cortesía
+        
+    Returns:
+        Conjunto de oraciones normalizadas (ver normalize_transcript)
+    """
+    document_frequency: Counter = Counter()
+    
+    for transcript in transcripts:
+        keys = set()
+        for sentence in _split_sentences(transcript):
+            key = normalize_transcript(sentence)
+            if key and len(key.split()) <= max_words and not _CUE_PATTERN.search(sentence):
+                keys.add(key)
+        document_frequency.update(keys)
+    
+    threshold = max(min_documents, math.ceil(min_ratio * len(transcripts)))
+    return frozenset(key for key, count in document_frequency.items() if count >= threshold)
+
+
+def start_compaction_run(transcripts: List[str]) -> CompactionRun:
+    """
+    Prepara la compactación de una ejecución con las frases de cortesía de `transcripts`.
+    
+    Un corpus con menos de BOILERPLATE_MIN_DOCUMENTS transcripciones no
+    alcanza para aprender: la ejecución solo limpia muletillas y repeticiones.
+    
+    Args:
+        transcripts: Corpus de la carga actual
+        
+    Returns:
+        CompactionRun para pasar a compact_transcripts
+    """
+    if not COMPACTION_ENABLED or len(transcripts) < BOILERPLATE_MIN_DOCUMENTS:
+        return CompactionRun()
+    
+    return CompactionRun(learn_boilerplate(transcripts))
+
+
+def get_compaction_stats() -> Dict[str, Any]:
+    """
+    Retorna la reducción de tokens acumulada en el proceso.
+    
+    Returns:
+        Dict con transcripts, raw_tokens, compact_tokens, reduction (0-1)
+        y boilerplate_phrases (de la última ejecución terminada)
+    """
+    with _lock:
+        stats = dict(_totals)
+    
+    return _with_reduction(stats, stats.pop("boilerplate_phrases"))
+
+
+def _with_reduction(stats: Dict[str, Any], boilerplate_phrases: int) -> Dict[str, Any]:
+    """Agrega reduction y boilerplate_phrases a un dict de contadores."""
+    stats["boilerplate_phrases"] = boilerplate_phrases
+    stats["reduction"] = 1 - stats["compact_tokens"] / stats["raw_tokens"] if stats["raw_tokens"] else 0.0
+    return stats
+
+
+def _split_sentences(transcript: str) -> List[str]:
+    """Limpia espacios, muletillas y palabras repetidas, y divide el texto en oraciones."""
+    text = _SPACES.sub(" ", transcript or "")
+    text = _FILLERS.sub("", text)
+    text = _REPEATED_WORD.sub(r"\1", text)
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+    text = _LINE_BREAKS.sub("\n", text).strip()
+    return _SENTENCE_BREAK.split(text)
+
+
+def _keep_cue_sentences(sentences: List[str]) -> List[str]:
+    """Conserva las primeras oraciones y las que tienen señales, con sus vecinas."""
+    keep = set(range(min(COMPACTION_LEAD_SENTENCES, len(sentences))))
+    
+    for i, sentence in enumerate(sentences):
+        if _CUE_PATTERN.search(sentence):
+            keep.update(range(
+                max(0, i - COMPACTION_CONTEXT_SENTENCES),
+                min(len(sentences), i + COMPACTION_CONTEXT_SENTENCES + 1)
+            ))
+    
+    return [sentence for i, sentence in enumerate(sentences) if i in keep]
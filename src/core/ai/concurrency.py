@@ -0,0 +1,266 @@
+"""
+Control adaptativo de concurrencia (AIMD) con circuit breaker ante 429.
+
+Complementa al rate limiter: este fija el ritmo de llamadas según la cuota
+configurada, el controlador reacciona a lo que responde la API.
+- Cada llamada exitosa sube el límite de llamadas en vuelo (+1 por cada
+  `límite` éxitos, crecimiento aditivo)
+- Un error de rate limit/cuota lo reduce a la mitad y abre el circuito:
+  no se despacha nada durante un cooldown que se duplica con cada 429
+  consecutivo
+- Pasado el cooldown el circuito queda semiabierto y deja pasar una sola
+  llamada de prueba; si tiene éxito se cierra
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from google.api_core.exceptions import TooManyRequests
+
+from .defaults import (
+    ADAPTIVE_DECREASE_FACTOR,
+    ADAPTIVE_MAX_CONCURRENCY,
+    ADAPTIVE_MIN_CONCURRENCY,
+    CIRCUIT_BREAKER_BASE_COOLDOWN,
+    CIRCUIT_BREAKER_MAX_COOLDOWN,
+    MAX_CONCURRENT_BATCHES
+)
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_ERROR = "error"
+
+# Solo frases de un 429: "rate" a secas también aparece en "generate" o "moderate"
+_RATE_LIMIT_MESSAGE = re.compile(
+    r"\b429\b|resource (?:has been )?exhausted|quota|rate limit|too many requests",
+    re.IGNORECASE
+)
+
+
+class AdaptiveConcurrencyController:
+    """
+    Limita las llamadas en vuelo con un límite que se ajusta por AIMD.
+    
+    Es thread-safe y se comparte entre todos los grupos del proceso, igual
+    que el rate limiter.
+    
+    Args:
+        initial_limit: Llamadas en vuelo permitidas al empezar
+        min_limit: Límite inferior tras reducciones
+        max_limit: Límite superior tras incrementos
+        decrease_factor: Factor multiplicativo ante un 429
+        base_cooldown: Segundos de circuito abierto tras el primer 429
+        max_cooldown: Tope del cooldown exponencial
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int = MAX_CONCURRENT_BATCHES,
+        min_limit: int = ADAPTIVE_MIN_CONCURRENCY,
+        max_limit: int = ADAPTIVE_MAX_CONCURRENCY,
+        decrease_factor: float = ADAPTIVE_DECREASE_FACTOR,
+        base_cooldown: float = CIRCUIT_BREAKER_BASE_COOLDOWN,
+        max_cooldown: float = CIRCUIT_BREAKER_MAX_COOLDOWN
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._state = CIRCUIT_CLOSED
+        self._open_until = 0.0
+        self._opened_at = 0.0
+        self._consecutive_rate_limits = 0
+        self._condition = threading.Condition()
+        
+        self._stats = {
+            "dispatched": 0,
+            "succeeded": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "circuit_opens": 0,
+            "held_dispatches": 0,
+            "held_seconds": 0.0,
+        }
+    
+    @property
+    def limit(self) -> int:
+        """Llamadas en vuelo permitidas actualmente."""
+        return int(self._limit)
+    
+    def acquire(self) -> float:
+        """
+        Bloquea hasta que haya un lugar libre y el circuito permita despachar.
+        
+        Returns:
+            Marca de tiempo (monotonic) del despacho, a entregar en release()
+        """
+        start = time.monotonic()
+        held = False
+        
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._state == CIRCUIT_OPEN and now >= self._open_until:
+                    self._state = CIRCUIT_HALF_OPEN
+                
+                if self._state == CIRCUIT_OPEN:
+                    wait = self._open_until - now
+                elif self._state == CIRCUIT_HALF_OPEN:
+                    wait = None if self._in_flight > 0 else 0.0
+                else:
+                    wait = None if self._in_flight >= self.limit else 0.0
+                
+                if wait == 0.0:
+                    break
+                
+                held = True
+                self._condition.wait(wait)
+            
+            self._in_flight += 1
+            self._stats["dispatched"] += 1
+            if held:
+                self._stats["held_dispatches"] += 1
+                self._stats["held_seconds"] += now - start
+        
+        return now
+    
+    def release(self, dispatched_at: float, outcome: str) -> None:
+        """
+        Libera el lugar de una llamada y ajusta el límite según su resultado.
+        
+        Los 429 de llamadas despachadas antes de la última apertura del
+        circuito ya fueron contabilizados por esa apertura y no la prolongan.
+        
+        Args:
+            dispatched_at: Valor retornado por acquire()
+            outcome: OUTCOME_SUCCESS, OUTCOME_RATE_LIMITED u OUTCOME_ERROR
+        """
+        with self._condition:
+            self._in_flight -= 1
+            
+            if outcome == OUTCOME_SUCCESS:
+                self._stats["succeeded"] += 1
+                self._consecutive_rate_limits = 0
+                self._limit = min(self.max_limit, self._limit + 1 / max(self._limit, 1))
+                if self._state == CIRCUIT_HALF_OPEN:
+                    self._state = CIRCUIT_CLOSED
+            elif outcome == OUTCOME_RATE_LIMITED:
+                self._stats["rate_limited"] += 1
+                if dispatched_at >= self._opened_at:
+                    self._open_circuit()
+            else:
+                self._stats["errors"] += 1
+            
+            self._condition.notify_all()
+    
+    def _open_circuit(self) -> None:
+        """Reduce el límite y pausa los despachos con cooldown exponencial."""
+        self._consecutive_rate_limits += 1
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        
+        cooldown = min(
+            self.max_cooldown,
+            self.base_cooldown * 2 ** (self._consecutive_rate_limits - 1)
+        )
+        now = time.monotonic()
+        self._state = CIRCUIT_OPEN
+        self._opened_at = now
+        self._open_until = now + cooldown
+        self._stats["circuit_opens"] += 1
+        
+        print(
+            f"🚦 Límite de API: concurrencia reducida a {self.limit}, "
+            f"despachos en pausa por {cooldown:.0f}s"
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna el estado actual del controlador.
+        
+        Returns:
+            Dict con limit, in_flight, state, backoff_remaining (segundos
+            hasta que el circuito deje pasar una llamada de prueba) y los
+            contadores dispatched, succeeded, rate_limited, errors,
+            circuit_opens, held_dispatches y held_seconds
+        """
+        with self._condition:
+            backoff_remaining = (
+                max(0.0, self._open_until - time.monotonic()) if self._state == CIRCUIT_OPEN else 0.0
+            )
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "state": self._state,
+                "backoff_remaining": backoff_remaining,
+                **self._stats,
+            }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Indica si el error corresponde a un límite de API (429/cuota).
+    
+    Se clasifica por tipo (ResourceExhausted es subclase de
+    TooManyRequests) y, para errores envueltos o de otros proveedores,
+    por las frases de un 429 en el mensaje.
+    
+    Args:
+        error: Excepción de la llamada
+        
+    Returns:
+        True si hay que tratarlo como rate limit (reducir concurrencia y reencolar)
+    """
+    if isinstance(error, TooManyRequests):
+        return True
+    return bool(_RATE_LIMIT_MESSAGE.search(str(error)))
+
+
+_controller: Optional[AdaptiveConcurrencyController] = None
+_controller_lock = threading.Lock()
+
+
+def get_concurrency_controller() -> AdaptiveConcurrencyController:
+    """
+    Retorna el controlador de concurrencia compartido del proceso.
+    
+    Returns:
+        Instancia única de AdaptiveConcurrencyController
+    """
+    global _controller
+    
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdaptiveConcurrencyController()
+        return _controller
+
+
+def configure_concurrency_controller(
+    initial_limit: int,
+    max_limit: int = ADAPTIVE_MAX_CONCURRENCY
+) -> AdaptiveConcurrencyController:
+    """
+    Reemplaza el controlador del proceso con otros límites.
+    
+    Args:
+        initial_limit: Llamadas en vuelo permitidas al empezar
+        max_limit: Límite superior tras incrementos
+        
+    Returns:
+        Nuevo AdaptiveConcurrencyController compartido
+    """
+    global _controller
+    
+    with _controller_lock:
+        _controller = AdaptiveConcurrencyController(initial_limit=initial_limit, max_limit=max_limit)
+        return _controller
@@ -12,6 +12,13 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.0-flash"
 
+# Modelo económico de la cascada (ver cascade.py): categoriza primero y
+# GEMINI_MODEL solo recibe las transcripciones escaladas
+GEMINI_FAST_MODEL = "gemini-2.0-flash-lite"
+
+# Proveedor de respuestas: gemini | record | replay | synthetic (ver providers.py)
+AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini")
+
 
 def configure_gemini() -> None:
     """
@@ -31,3 +38,8 @@ def configure_gemini() -> None:
 def get_gemini_model_name() -> str:
     """Retorna el nombre del modelo de Gemini configurado."""
     return GEMINI_MODEL
+
+
+def get_gemini_fast_model_name() -> str:
+    """Retorna el nombre del modelo económico de la cascada."""
+    return GEMINI_FAST_MODEL
@@ -0,0 +1,200 @@
+"""
+Caché de contexto explícito de Gemini para el prefijo de instrucciones.
+
+Todos los prompts de batch comparten el mismo bloque de instrucciones y
+solo cambian las transcripciones. Con CONTEXT_CACHE_ENABLED ese prefijo
+se sube una vez como CachedContent (system_instruction) con un TTL y cada
+llamada envía solo las transcripciones.
+
+- Las entradas se identifican por hash de (modelo, prefijo): si el texto
+  de las instrucciones cambia se crea un caché nuevo automáticamente
+- Antes de vencer, el TTL se extiende en lugar de recrear el caché
+- Gemini exige un mínimo de tokens para cachear; por debajo de
+  CONTEXT_CACHE_MIN_TOKENS, o si la creación falla, el prefijo se envía
+  dentro del prompt como siempre
+"""
+
+import datetime
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from google.generativeai import caching
+
+from .defaults import (
+    CONTEXT_CACHE_ENABLED,
+    CONTEXT_CACHE_MAX_ENTRIES,
+    CONTEXT_CACHE_MIN_TOKENS,
+    CONTEXT_CACHE_REFRESH_MARGIN,
+    CONTEXT_CACHE_TTL
+)
+from .tokens import estimate_tokens
+
+
+class ContextCacheManager:
+    """
+    Registro thread-safe de CachedContent por prefijo, con métricas de ahorro.
+    
+    Args:
+        enabled: Si es False nunca se crean cachés (solo se contabiliza)
+        ttl: Segundos de vida de cada caché
+        refresh_margin: Segundos antes del vencimiento en que se extiende el TTL
+        min_tokens: Tokens estimados mínimos del prefijo para intentar cachearlo
+        max_entries: Cachés vivos como máximo (se eliminan los menos usados)
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = CONTEXT_CACHE_ENABLED,
+        ttl: int = CONTEXT_CACHE_TTL,
+        refresh_margin: int = CONTEXT_CACHE_REFRESH_MARGIN,
+        min_tokens: int = CONTEXT_CACHE_MIN_TOKENS,
+        max_entries: int = CONTEXT_CACHE_MAX_ENTRIES
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._failed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "cached_calls": 0,
+            "inline_calls": 0,
+            "cached_tokens": 0,
+            "inline_prefix_tokens": 0,
+            "caches_created": 0,
+            "refreshes": 0,
+            "failures": 0,
+        }
+    
+    def get_cached_content(self, model_name: str, prefix: str) -> Optional[caching.CachedContent]:
+        """
+        Retorna el caché vigente para `prefix`, creándolo o extendiéndolo si hace falta.
+        
+        Args:
+            model_name: Modelo de Gemini (el caché es por modelo)
+            prefix: Texto estático de instrucciones
+            
+        Returns:
+            CachedContent listo para usar, o None si el prefijo debe enviarse inline
+        """
+        if not self.enabled or estimate_tokens(prefix) < self.min_tokens:
+            return None
+        
+        key = hashlib.sha256(f"{model_name}\n{prefix}".encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        
+        # La creación ocurre bajo el lock: los hilos que piden el mismo
+        # prefijo esperan al primero en lugar de crear cachés duplicados
+        with self._lock:
+            if now < self._failed.get(key, 0.0):
+                return None
+            
+            entry = self._entries.get(key)
+            try:
+                if entry is None:
+                    entry = self._create(key, model_name, prefix, now)
+                elif entry["expires_at"] - now < self.refresh_margin:
+                    entry["cache"].update(ttl=datetime.timedelta(seconds=self.ttl))
+                    entry["expires_at"] = now + self.ttl
+                    self._stats["refreshes"] += 1
+            except Exception as e:
+                self._entries.pop(key, None)
+                self._failed[key] = now + self.ttl
+                self._stats["failures"] += 1
+                print(f"⚠️ No se pudo cachear el prefijo de instrucciones: {str(e)[:100]}")
+                return None
+            
+            self._entries.move_to_end(key)
+            return entry["cache"]
+    
+    def record_call(self, prefix: str, used_cache: bool, cached_tokens: Optional[int] = None) -> None:
+        """
+        Contabiliza una llamada con prefijo de instrucciones.
+        
+        Args:
+            prefix: Prefijo de la llamada
+            used_cache: True si el prefijo se sirvió desde el caché
+            cached_tokens: Tokens cacheados reportados por la API (usage_metadata);
+                si falta se usa la estimación del prefijo
+        """
+        prefix_tokens = estimate_tokens(prefix)
+        with self._lock:
+            if used_cache:
+                self._stats["cached_calls"] += 1
+                self._stats["cached_tokens"] += cached_tokens or prefix_tokens
+            else:
+                self._stats["inline_calls"] += 1
+                self._stats["inline_prefix_tokens"] += prefix_tokens
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores acumulados del proceso.
+        
+        Returns:
+            Dict con cached_calls, inline_calls, cached_tokens (no reenviados),
+            inline_prefix_tokens, caches_created, refreshes, failures y
+            active_caches
+        """
+        with self._lock:
+            return {**self._stats, "active_caches": len(self._entries)}
+    
+    def clear(self) -> None:
+        """Elimina todos los cachés creados por este proceso."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._failed.clear()
+        
+        for entry in entries:
+            _delete_quietly(entry["cache"])
+    
+    def _create(self, key: str, model_name: str, prefix: str, now: float) -> Dict[str, Any]:
+        """Crea un CachedContent y desaloja el menos usado si se supera max_entries."""
+        cache = caching.CachedContent.create(
+            model=model_name,
+            display_name=f"vambe-instrucciones-{key[:12]}",
+            system_instruction=prefix,
+            ttl=datetime.timedelta(seconds=self.ttl)
+        )
+        entry = {"cache": cache, "expires_at": now + self.ttl}
+        self._entries[key] = entry
+        self._stats["caches_created"] += 1
+        
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            _delete_quietly(evicted["cache"])
+        
+        return entry
+
+
+def _delete_quietly(cache: caching.CachedContent) -> None:
+    """Elimina un caché remoto ignorando errores (el TTL lo limpia igual)."""
+    try:
+        cache.delete()
+    except Exception:
+        pass
+
+
+_context_cache: Optional[ContextCacheManager] = None
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache() -> ContextCacheManager:
+    """
+    Retorna el administrador de caché de contexto del proceso.
+    
+    Returns:
+        Instancia única de ContextCacheManager
+    """
+    global _context_cache
+    
+    with _context_cache_lock:
+        if _context_cache is None:
+            _context_cache = ContextCacheManager()
+        return _context_cache
@@ -5,12 +5,52 @@ Valores por defecto y constantes del categorizador.
 from typing import Dict, Any
 
 
-BATCH_SIZE = 5
+MAX_BATCH_ITEMS = 10
+BATCH_TOKEN_BUDGET = 8000
 RETRY_ATTEMPTS = 3
-RATE_LIMIT_DELAY = 2.0
+SPLIT_AFTER_FAILURES = 2
+MAX_CONCURRENT_BATCHES = 4
+REQUESTS_PER_MINUTE = 15
+TOKENS_PER_MINUTE = 1_000_000
 SINGLE_TIMEOUT = 90
 BATCH_TIMEOUT = 120
+LONG_TRANSCRIPT_TOKENS = 6000
+CHUNK_TOKENS = 2500
+CHUNK_OVERLAP_TOKENS = 250
+MAX_CONCURRENT_CHUNKS = 4
+STREAM_BATCH_RESPONSES = True
+NATIVE_RESPONSE_SCHEMA = True
+CONTEXT_CACHE_ENABLED = False
+CONTEXT_CACHE_TTL = 3600
+CONTEXT_CACHE_REFRESH_MARGIN = 300
+CONTEXT_CACHE_MIN_TOKENS = 4096
+CONTEXT_CACHE_MAX_ENTRIES = 8
+NEAR_DUPLICATE_ENABLED = True
+NEAR_DUPLICATE_THRESHOLD = 0.85
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+SHINGLE_SIZE = 3
 CACHE_TTL = 3600
+PERSISTENT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+PRE_EXTRACTION_ENABLED = True
+PRE_EXTRACTION_MIN_CONFIDENCE = 0.85
+COMPACTION_ENABLED = True
+COMPACTION_CUES_ONLY = False
+COMPACTION_LEAD_SENTENCES = 3
+COMPACTION_CONTEXT_SENTENCES = 1
+BOILERPLATE_MIN_DOCUMENTS = 5
+BOILERPLATE_MIN_RATIO = 0.2
+BOILERPLATE_MAX_WORDS = 12
+ADAPTIVE_MIN_CONCURRENCY = 1
+ADAPTIVE_MAX_CONCURRENCY = 8
+ADAPTIVE_DECREASE_FACTOR = 0.5
+CIRCUIT_BREAKER_BASE_COOLDOWN = 5
+CIRCUIT_BREAKER_MAX_COOLDOWN = 120
+RATE_LIMIT_MAX_REQUEUES = 5
+CASCADE_ENABLED = False
+CASCADE_MIN_CONFIDENCE = 0.7
+CASCADE_LOCAL_MIN_CONFIDENCE = 0.5
+STALE_RECATEGORIZATION_BUDGET = 200
 
 
 def get_default_categorization() -> Dict[str, Any]:
@@ -0,0 +1,72 @@
+"""
+Parser incremental de arrays JSON para respuestas en streaming.
+
+Recibe fragmentos de texto tal como llegan de la API y entrega cada
+objeto de primer nivel apenas se cierra, sin esperar al final del array.
+"""
+
+from typing import List
+
+
+class JsonArrayStreamParser:
+    """
+    Extrae los objetos `{...}` de primer nivel de un array JSON fragmentado.
+    
+    Respeta strings y escapes (dentro y fuera de los objetos), y admite
+    objetos/arrays anidados. Los elementos que no son objetos se ignoran. Si la respuesta es un objeto
+    suelto (sin array), también se entrega.
+    """
+    
+    def __init__(self):
+        self._current: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, text: str) -> List[str]:
+        """
+        Procesa un fragmento y retorna los objetos completados en él.
+        
+        Args:
+            text: Fragmento de la respuesta
+            
+        Returns:
+            Lista de textos JSON de cada objeto cerrado (puede ser vacía)
+        """
+        completed = []
+        
+        for char in text:
+            if self._depth > 0:
+                self._current.append(char)
+            
+            # Los strings se siguen también entre objetos: un "{" dentro de
+            # un elemento string del array no abre un objeto
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._current = [char]
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append("".join(self._current))
+                    self._current = []
+        
+        return completed
+    
+    @property
+    def has_pending(self) -> bool:
+        """True si quedó un objeto abierto sin cerrar (respuesta truncada)."""
+        return self._depth > 0
@@ -0,0 +1,275 @@
+"""
+Pre-extracción determinística de campos mecánicos de la categorización.
+
+Calcula volumen_numerico (normalizado a interacciones por semana),
+volumen_nivel y es_pico_estacional con expresiones regulares compiladas,
+antes de construir el prompt. El volumen solo es confiable cuando la
+cifra acompaña a un sustantivo de interacción (mensajes, consultas,
+conversaciones, ...). Cada campo lleva un puntaje de confianza:
+los que superan PRE_EXTRACTION_MIN_CONFIDENCE se envían a Gemini como
+"campos ya resueltos" y el modelo no necesita generarlos.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from .defaults import PRE_EXTRACTION_ENABLED, PRE_EXTRACTION_MIN_CONFIDENCE
+
+
+# Miles agrupados ("1.500", "12,000") o un entero con decimales opcionales ("2,5")
+_NUMBER = r"\d{1,3}(?:[.,]\d{3})+(?![.,]?\d)|\d+(?:[.,]\d+)?"
+_PERIOD_FACTORS = (
+    (r"diari[oa]s?|diariamente|a diario|al d[ií]a|por d[ií]a|cada d[ií]a", 7.0),
+    (r"semanal(?:es|mente)?|a la semana|por semana|cada semana", 1.0),
+    (r"mensual(?:es|mente)?|al mes|por mes|cada mes", 0.25),
+)
+# Solo estas cifras son volumen de atención ("30 agentes por día" o
+# "7 días a la semana" no lo son)
+_INTERACTION_NOUNS = (
+    r"mensajes?|consultas?|conversaciones?|chats?|llamadas?|tickets?|interacciones?"
+    r"|correos?|e-?mails?|mails?|preguntas?|solicitudes?|reclamos?|whatsapps?"
+)
+
+_COUNT = (
+    rf"(?P<low>{_NUMBER})(?P<low_mil>\s*mil\b)?"
+    rf"(?:\s*(?:-|a|y)\s*(?P<high>{_NUMBER})(?P<high_mil>\s*mil\b)?)?"
+)
+_PERIOD = r"(?P<period>" + "|".join(f"(?:{pattern})" for pattern, _ in _PERIOD_FACTORS) + r")\b"
+
+_VOLUME_PATTERN = re.compile(
+    _COUNT
+    + rf"\s+(?:de\s+)?(?:[a-záéíóúñ]+\s+)?(?P<noun>{_INTERACTION_NOUNS})\b"
+    + r"(?:\s+[a-záéíóúñ]+){0,4}?\s+"
+    + _PERIOD,
+    re.IGNORECASE
+)
+# Cifra + periodo sin sustantivo de interacción: puede ser volumen
+# ("80 diarias") o no ("30 agentes por día"), así que decide el modelo
+_LOOSE_VOLUME_PATTERN = re.compile(
+    _COUNT + r"\s+(?:[a-záéíóúñ]+\s+){0,4}?" + _PERIOD,
+    re.IGNORECASE
+)
+# Cualquier cifra ligada a un sustantivo de interacción, con o sin periodo
+_NOUN_COUNT_PATTERN = re.compile(
+    rf"(?:{_NUMBER})(?:\s*mil\b)?\s+(?:de\s+)?(?:[a-záéíóúñ]+\s+)?(?:{_INTERACTION_NOUNS})\b",
+    re.IGNORECASE
+)
+# "llamadas" también nombra reuniones internas ("3 llamadas a la semana con el directorio")
+_AMBIGUOUS_NOUN = re.compile(r"llamadas?", re.IGNORECASE)
+# Fin de oración o de cláusula; el punto entre dígitos es separador de miles o decimal
+_CLAUSE_BREAK = re.compile(r"[;!?\n]|\.(?!\d)")
+_PERIOD_PATTERNS = [(re.compile(pattern, re.IGNORECASE), factor) for pattern, factor in _PERIOD_FACTORS]
+
+_PEAK_PATTERN = re.compile(
+    # Cada alternativa es una palabra completa: "duplicados" o "promocionar" no son picos
+    r"\b(?:picos?|temporada alta|promoci[oó]n(?:es)?|(?:du|tri)plic(?:a|an|ar|arse|aron|[oó]))\b",
+    re.IGNORECASE
+)
+
+_VOLUME_LEVELS = (
+    (100, "Bajo (<100)"),
+    (251, "Medio (100-250)"),
+    (501, "Alto (251-500)"),
+)
+
+
+def extract_local_fields(transcript: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Extrae localmente los campos mecánicos de una transcripción.
+    
+    Args:
+        transcript: Texto de la transcripción
+        
+    Returns:
+        Dict {campo: {"value": valor, "confidence": 0.0-1.0}} para
+        volumen_numerico, volumen_nivel y es_pico_estacional
+    """
+    text = transcript or ""
+    weekly, volume_confidence = _extract_weekly_volume(text)
+    is_peak = bool(_PEAK_PATTERN.search(text))
+    
+    return {
+        "volumen_numerico": {"value": weekly, "confidence": volume_confidence},
+        "volumen_nivel": {"value": classify_weekly_volume(weekly), "confidence": volume_confidence},
+        # La instrucción es literal (palabras clave), pero la ausencia puede
+        # expresarse con otras palabras: solo el positivo es concluyente
+        "es_pico_estacional": {"value": is_peak, "confidence": 0.95 if is_peak else 0.6},
+    }
+
+
+def get_confident_fields(
+    extraction: Dict[str, Dict[str, Any]],
+    min_confidence: float = PRE_EXTRACTION_MIN_CONFIDENCE
+) -> Dict[str, Any]:
+    """
+    Filtra los campos extraídos con confianza suficiente para no pedirlos al modelo.
+    
+    Args:
+        extraction: Resultado de extract_local_fields
+        min_confidence: Confianza mínima para aceptar un campo
+        
+    Returns:
+        Dict {campo: valor} con los campos aceptados
+    """
+    return {
+        field: data["value"]
+        for field, data in extraction.items()
+        if data["confidence"] >= min_confidence
+    }
+
+
+def get_prompt_hints(transcript: str) -> Dict[str, Any]:
+    """
+    Retorna los campos que se envían como resueltos en el prompt.
+    
+    Args:
+        transcript: Texto de la transcripción
+        
+    Returns:
+        Dict {campo: valor} (vacío si PRE_EXTRACTION_ENABLED es False)
+    """
+    if not PRE_EXTRACTION_ENABLED:
+        return {}
+    return get_confident_fields(extract_local_fields(transcript))
+
+
+def find_local_disagreements(
+    result: Dict[str, Any],
+    transcript: str,
+    min_confidence: float
+) -> List[str]:
+    """
+    Compara una categorización del modelo con la pre-extracción local.
+    
+    Solo cuentan los campos que el extractor encontró con al menos
+    `min_confidence`; la ausencia de palabras de estacionalidad no es
+    concluyente y el volumen se compara por nivel (la cifra exacta puede
+    variar con el redondeo).
+    
+    Args:
+        result: Categorización devuelta por el modelo
+        transcript: Texto de la transcripción
+        min_confidence: Confianza mínima del extractor para comparar
+        
+    Returns:
+        Campos en los que el modelo contradice al extractor
+    """
+    extraction = extract_local_fields(transcript)
+    disagreements = []
+    
+    volume = extraction["volumen_nivel"]
+    if extraction["volumen_numerico"]["value"] is not None and volume["confidence"] >= min_confidence:
+        if result.get("volumen_nivel") != volume["value"]:
+            disagreements.append("volumen_nivel")
+    
+    peak = extraction["es_pico_estacional"]
+    if peak["value"] and peak["confidence"] >= min_confidence and not result.get("es_pico_estacional"):
+        disagreements.append("es_pico_estacional")
+    
+    return disagreements
+
+
+def classify_weekly_volume(weekly: Optional[int]) -> str:
+    """
+    Clasifica un volumen semanal en los niveles de CATEGORIZATION_SCHEMA.
+    
+    Args:
+        weekly: Interacciones por semana (None si se desconoce)
+        
+    Returns:
+        Nivel de volumen
+    """
+    if weekly is None:
+        return "Desconocido"
+    
+    for upper_bound, level in _VOLUME_LEVELS:
+        if weekly < upper_bound:
+            return level
+    
+    return "Muy Alto (>500)"
+
+
+def _extract_weekly_volume(text: str) -> Tuple[Optional[int], float]:
+    """
+    Busca menciones "<número> <interacciones> ... <periodo>" y las normaliza
+    a volumen semanal.
+    
+    Args:
+        text: Texto de la transcripción
+        
+    Returns:
+        Tupla (volumen semanal o None, confianza)
+    """
+    matches = list(_VOLUME_PATTERN.finditer(text))
+    candidates = [_weekly_from_match(match) for match in matches]
+    
+    if not candidates:
+        loose = [_weekly_from_match(match) for match in _LOOSE_VOLUME_PATTERN.finditer(text)]
+        # Sin mención explícita el modelo podría inferir el volumen del contexto
+        return (loose[0][0], 0.5) if loose else (None, 0.5)
+    
+    values = {weekly for weekly, _ in candidates}
+    is_range = any(ranged for _, ranged in candidates)
+    
+    if any(_is_ambiguous_match(match, text) for match in matches):
+        # Otra cifra de interacciones en la misma cláusula ("200 mensajes y
+        # 50 consultas diarias") o un sustantivo que no siempre es atención
+        return candidates[0][0], 0.5
+    
+    if len(values) == 1:
+        return candidates[0][0], 0.7 if is_range else 0.95
+    
+    # Varias cifras distintas (ej: volumen actual y proyectado): se usa la
+    # primera, pero el modelo decide
+    return candidates[0][0], 0.5
+
+
+def _is_ambiguous_match(match: re.Match, text: str) -> bool:
+    """
+    Indica si una mención de _VOLUME_PATTERN no alcanza para resolver el volumen.
+    
+    Args:
+        match: Coincidencia de _VOLUME_PATTERN
+        text: Texto de la transcripción
+        
+    Returns:
+        True si el sustantivo es ambiguo o hay otra cifra de interacciones
+        en la misma cláusula
+    """
+    if _AMBIGUOUS_NOUN.fullmatch(match.group("noun")):
+        return True
+    
+    clause_start = max((m.end() for m in _CLAUSE_BREAK.finditer(text, 0, match.start())), default=0)
+    clause_end = next(_CLAUSE_BREAK.finditer(text, match.end()), None)
+    clause_end = clause_end.start() if clause_end else len(text)
+    
+    return any(
+        not match.start() <= count.start() < match.end()
+        for count in _NOUN_COUNT_PATTERN.finditer(text, clause_start, clause_end)
+    )
+
+
+def _weekly_from_match(match: re.Match) -> Tuple[int, bool]:
+    """
+    Convierte una mención de volumen en interacciones por semana.
+    
+    Args:
+        match: Coincidencia de _VOLUME_PATTERN o _LOOSE_VOLUME_PATTERN
+        
+    Returns:
+        Tupla (volumen semanal, si la mención era un rango)
+    """
+    low = _parse_number(match.group("low"), match.group("low_mil"))
+    high = _parse_number(match.group("high"), match.group("high_mil")) if match.group("high") else None
+    value = (low + high) / 2 if high is not None else low
+    factor = next(f for pattern, f in _PERIOD_PATTERNS if pattern.fullmatch(match.group("period")))
+    return int(round(value * factor)), high is not None
+
+
+def _parse_number(digits: str, thousands: Optional[str]) -> float:
+    """Convierte "1.500" / "1,500" / "2,5" / "1,5" + " mil" en número."""
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", digits):
+        value = float(re.sub(r"[.,]", "", digits))
+    else:
+        value = float(digits.replace(",", "."))
+    return value * 1000 if thousands else value
@@ -0,0 +1,335 @@
+"""
+Categorización map-reduce de transcripciones muy largas.
+
+Una reunión de descubrimiento larga puede agotar BATCH_TIMEOUT aun
+viajando sola, y entonces recibe la categorización por defecto. Las
+transcripciones que superan LONG_TRANSCRIPT_TOKENS se dividen en
+fragmentos solapados (map): cada fragmento se categoriza por separado y
+en paralelo, y los resultados parciales se combinan con reglas
+determinísticas (reduce) en un único objeto de CATEGORIZATION_SCHEMA.
+"""
+
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from .client import call_gemini_api
+from .compaction import CompactionRun, compact_transcripts
+from .concurrency import (
+    OUTCOME_ERROR,
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_SUCCESS,
+    get_concurrency_controller,
+    is_rate_limit_error
+)
+from .local_extractor import classify_weekly_volume, get_prompt_hints
+from .prompts import build_chunk_extraction_prompt
+from .rate_limiter import get_rate_limiter
+from .response_schema import get_response_schema
+from .tokens import CHARS_PER_TOKEN, estimate_call_tokens, estimate_tokens
+from .validation import is_valid_categorization
+from .versioning import mark_categorized
+from .defaults import (
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_TOKENS,
+    LONG_TRANSCRIPT_TOKENS,
+    MAX_CONCURRENT_CHUNKS,
+    NATIVE_RESPONSE_SCHEMA,
+    RATE_LIMIT_MAX_REQUEUES,
+    RETRY_ATTEMPTS,
+    SINGLE_TIMEOUT
+)
+
+
+_SENTENCE_END = re.compile(r"[.!?…]\s|\n")
+
+_IMPACT_RANK = {"Alto": 0, "Medio": 1, "Bajo": 2}
+_MAX_CONCERNS = 3
+
+
+def is_long_transcript(transcript: str, threshold: int = LONG_TRANSCRIPT_TOKENS) -> bool:
+    """
+    Indica si una transcripción debe categorizarse por fragmentos.
+    
+    Args:
+        transcript: Texto de la transcripción
+        threshold: Tokens estimados a partir de los cuales se fragmenta
+        
+    Returns:
+        True si supera el umbral
+    """
+    return estimate_tokens(transcript) > threshold
+
+
+def split_transcript(
+    transcript: str,
+    chunk_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+) -> List[str]:
+    """
+    Divide una transcripción en fragmentos solapados.
+    
+    Los cortes caen en un fin de oración o salto de línea dentro de la
+    segunda mitad del fragmento (o en un espacio, si no hay ninguno), para
+    no partir frases. Cada fragmento repite el final del anterior
+    (hasta la mitad de su tamaño), así una mención que cruza un corte
+    aparece completa en alguno de los dos.
+    
+    Args:
+        transcript: Texto de la transcripción
+        chunk_tokens: Tamaño máximo estimado de cada fragmento
+        overlap_tokens: Tokens estimados que se repiten entre fragmentos
+        
+    Returns:
+        Lista de fragmentos en orden (uno solo si el texto es corto)
+    """
+    text = (transcript or "").strip()
+    chunk_chars = max(1, chunk_tokens * CHARS_PER_TOKEN)
+    overlap_chars = min(overlap_tokens * CHARS_PER_TOKEN, chunk_chars // 2)
+    
+    if len(text) <= chunk_chars:
+        return [text]
+    
+    chunks = []
+    start = 0
+    
+    while True:
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            end = _find_cut(text, start + chunk_chars // 2, end)
+        chunks.append(text[start:end].strip())
+        
+        if end >= len(text):
+            return chunks
+        
+        next_start = max(end - overlap_chars, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+
+def merge_partial_categorizations(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combina las categorizaciones de los fragmentos en una sola.
+    
+    Reglas (en orden de fragmento, el primero gana los empates):
+    - sector_principal: el más frecuente distinto de "Otros"; su
+      sector_secundario es el primero no nulo de los fragmentos que lo eligieron
+    - volumen_numerico: la primera cifra mencionada; volumen_nivel se
+      deriva de ella o, sin cifra, es el primer nivel conocido
+    - es_pico_estacional: True si algún fragmento lo detecta
+    - fuente_primaria / fuente_detalle: la primera fuente distinta de "Otro"
+    - preocupaciones: una por tipo con su mayor impacto, ordenadas por
+      impacto y primera aparición (máximo 3)
+    - urgencia_nivel: "Alta" si algún fragmento la marca, si no "Baja" si
+      alguno la marca, si no "Media"
+    - potencial_upsell: unión en orden de aparición
+    
+    Args:
+        partials: Categorizaciones válidas de los fragmentos, en orden
+        
+    Returns:
+        Dict con las categorías combinadas (sin _categorization_success)
+    """
+    first = partials[0]
+    
+    sectors = Counter(p["sector_principal"] for p in partials if p["sector_principal"] != "Otros")
+    sector = max(sectors, key=sectors.get) if sectors else "Otros"
+    secondary = next(
+        (p.get("sector_secundario") for p in partials
+         if p["sector_principal"] == sector and p.get("sector_secundario")),
+        None
+    )
+    
+    volume = next((p["volumen_numerico"] for p in partials if p.get("volumen_numerico") is not None), None)
+    if volume is not None:
+        volume_level = classify_weekly_volume(volume)
+    else:
+        volume_level = next(
+            (p["volumen_nivel"] for p in partials if p["volumen_nivel"] != "Desconocido"), "Desconocido"
+        )
+    
+    source = next((p for p in partials if p["fuente_primaria"] != "Otro"), first)
+    
+    urgencies = {p["urgencia_nivel"] for p in partials}
+    urgency = "Alta" if "Alta" in urgencies else "Baja" if "Baja" in urgencies else "Media"
+    
+    upsell: List[str] = []
+    for p in partials:
+        upsell.extend(item for item in p["potencial_upsell"] if item not in upsell)
+    
+    return {
+        "sector_principal": sector,
+        "sector_secundario": secondary,
+        "volumen_numerico": volume,
+        "volumen_nivel": volume_level,
+        "es_pico_estacional": any(p.get("es_pico_estacional") for p in partials),
+        "fuente_primaria": source["fuente_primaria"],
+        "fuente_detalle": source.get("fuente_detalle") or first.get("fuente_detalle") or "No disponible",
+        "preocupaciones": _merge_concerns(partials),
+        "urgencia_nivel": urgency,
+        "potencial_upsell": upsell,
+    }
+
+
+def categorize_long_transcript(
+    transcript: str,
+    client_name: str = "",
+    max_workers: int = MAX_CONCURRENT_CHUNKS,
+    compaction: Optional[CompactionRun] = None
+) -> Dict[str, Any]:
+    """
+    Categoriza una transcripción larga por fragmentos (map-reduce).
+    
+    Los fragmentos se envían en paralelo; cada llamada pasa por el
+    controlador de concurrencia y el rate limiter compartidos, igual que
+    los batches. El texto se compacta antes de dividirlo; los campos
+    pre-extraídos se calculan sobre el texto original completo y
+    reemplazan a los combinados. Si algún fragmento falla se
+    combinan los demás; imprime la duración de cada etapa.
+    
+    Args:
+        transcript: Texto de la transcripción
+        client_name: Nombre del cliente
+        max_workers: Fragmentos en paralelo
+        compaction: Compactación de la ejecución en batch (None fuera de un batch)
+        
+    Returns:
+        Dict con las categorías según CATEGORIZATION_SCHEMA
+        
+    Raises:
+        ValueError: Si ningún fragmento devolvió una categorización válida
+    """
+    timings: Dict[str, float] = {}
+    
+    stage_start = time.perf_counter()
+    chunks = split_transcript(compact_transcripts([transcript], compaction)[0])
+    hints = get_prompt_hints(transcript)
+    timings["split"] = time.perf_counter() - stage_start
+    
+    stage_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        extractions = list(executor.map(
+            lambda numbered: _extract_chunk(numbered[1], client_name, numbered[0], len(chunks), hints),
+            enumerate(chunks, 1)
+        ))
+    timings["map"] = time.perf_counter() - stage_start
+    
+    partials = [partial for partial, _, _ in extractions if partial is not None]
+    if not partials:
+        errors = [error for _, _, error in extractions if error]
+        raise ValueError(f"Ningún fragmento se pudo categorizar: {errors[-1] if errors else 'sin respuesta'}")
+    
+    stage_start = time.perf_counter()
+    result = merge_partial_categorizations(partials)
+    result.update(hints)
+    timings["reduce"] = time.perf_counter() - stage_start
+    
+    _log_stages(client_name, len(chunks), len(partials), timings, [seconds for _, seconds, _ in extractions])
+    
+    if not is_valid_categorization(result):
+        raise ValueError("La combinación de fragmentos no cumple el schema")
+    
+    return mark_categorized(result)
+
+
+def _find_cut(text: str, lower: int, upper: int) -> int:
+    """Retorna la posición de corte preferida en text[lower:upper]."""
+    cut = None
+    for match in _SENTENCE_END.finditer(text, lower, upper):
+        cut = match.end()
+    if cut is not None:
+        return cut
+    
+    space = text.rfind(" ", lower, upper)
+    return space if space > lower else upper
+
+
+def _merge_concerns(partials: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Deduplica las preocupaciones por tipo y conserva las de mayor impacto."""
+    by_type: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    
+    for p in partials:
+        for concern in p["preocupaciones"]:
+            if not isinstance(concern, dict) or "tipo" not in concern:
+                continue
+            order, current = by_type.get(concern["tipo"], (len(by_type), None))
+            if current is None or _IMPACT_RANK.get(concern.get("impacto"), 3) < _IMPACT_RANK.get(current.get("impacto"), 3):
+                by_type[concern["tipo"]] = (order, concern)
+    
+    ranked = sorted(by_type.values(), key=lambda entry: (_IMPACT_RANK.get(entry[1].get("impacto"), 3), entry[0]))
+    return [concern for _, concern in ranked[:_MAX_CONCERNS]]
+
+
+def _extract_chunk(
+    chunk: str,
+    client_name: str,
+    chunk_number: int,
+    chunk_count: int,
+    hints: Dict[str, Any]
+) -> Tuple[Optional[Dict[str, Any]], float, str]:
+    """
+    Categoriza un fragmento con reintentos.
+    
+    Como en los batches, los errores de rate limit no cuentan como fallo:
+    el fragmento se reenvía cuando el controlador vuelve a despachar.
+    
+    Returns:
+        Tupla (categorización parcial o None, segundos totales, último error)
+    """
+    prompt = build_chunk_extraction_prompt(chunk, client_name, chunk_number, chunk_count, hints, NATIVE_RESPONSE_SCHEMA)
+    response_schema = get_response_schema(hints) if NATIVE_RESPONSE_SCHEMA else None
+    controller = get_concurrency_controller()
+    
+    start = time.perf_counter()
+    failures = 0
+    requeues = 0
+    last_error = ""
+    
+    while failures < RETRY_ATTEMPTS and requeues <= RATE_LIMIT_MAX_REQUEUES:
+        if failures > 0:
+            time.sleep(2 ** failures)  # Exponential backoff
+        
+        dispatched_at = controller.acquire()
+        outcome = OUTCOME_ERROR
+        try:
+            get_rate_limiter().acquire(estimate_call_tokens(prompt))
+            partial = call_gemini_api(prompt, SINGLE_TIMEOUT, response_schema)
+            outcome = OUTCOME_SUCCESS
+        except Exception as e:
+            last_error = str(e)
+            if is_rate_limit_error(e):
+                outcome = OUTCOME_RATE_LIMITED
+                requeues += 1
+            else:
+                failures += 1
+            continue
+        finally:
+            controller.release(dispatched_at, outcome)
+        
+        partial.update(hints)
+        if is_valid_categorization(partial):
+            return partial, time.perf_counter() - start, ""
+        
+        failures += 1
+        last_error = "La respuesta no cumple el schema"
+    
+    return None, time.perf_counter() - start, last_error
+
+
+def _log_stages(
+    client_name: str,
+    chunk_count: int,
+    extracted: int,
+    timings: Dict[str, float],
+    chunk_seconds: List[float]
+) -> None:
+    """Imprime la duración de cada etapa del map-reduce."""
+    print(
+        f"🧩 {client_name or 'Transcripción larga'}: {extracted}/{chunk_count} fragmentos · "
+        f"división {timings['split'] * 1000:.1f} ms · "
+        f"extracción {timings['map']:.1f} s (fragmento más lento {max(chunk_seconds):.1f} s, "
+        f"suma {sum(chunk_seconds):.1f} s) · "
+        f"combinación {timings['reduce'] * 1000:.1f} ms"
+    )
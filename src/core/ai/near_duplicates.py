@@ -0,0 +1,183 @@
+"""
+Detección de transcripciones casi duplicadas con MinHash/LSH.
+
+Los equipos de ventas vuelven a subir exportaciones editadas en las que
+la transcripción solo cambia en espacios, mayúsculas o una frase final.
+La caché persistente (clave exacta) no las reconoce; este módulo compara
+firmas MinHash de shingles de palabras y reutiliza la categorización de
+una transcripción ya indexada si la similitud de Jaccard estimada supera
+NEAR_DUPLICATE_THRESHOLD. Solo se reutilizan categorizaciones de la
+versión vigente (ver versioning).
+"""
+
+import hashlib
+import re
+import unicodedata
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.database.fingerprints import find_fingerprint_candidates, store_fingerprints
+from .versioning import VERSION_FIELD, get_current_versions
+from .defaults import LSH_BANDS, MINHASH_PERMUTATIONS, NEAR_DUPLICATE_THRESHOLD, SHINGLE_SIZE
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Familia multiply-shift: h(x) = ((a·x + b) mod 2^64) >> 32, con a impar
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+
+
+def normalize_transcript(transcript: str) -> str:
+    """
+    Normaliza una transcripción para compararla: minúsculas, sin signos
+    de puntuación y con espacios colapsados.
+    
+    Args:
+        transcript: Texto original
+        
+    Returns:
+        Texto normalizado (palabras separadas por un espacio)
+    """
+    text = unicodedata.normalize("NFKC", transcript or "").lower()
+    return " ".join(_WORD_PATTERN.findall(text))
+
+
+def transcript_hash(normalized: str) -> str:
+    """
+    Hash SHA-256 de una transcripción normalizada.
+    
+    Args:
+        normalized: Salida de normalize_transcript
+        
+    Returns:
+        Hash hexadecimal
+    """
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def compute_signature(normalized: str) -> np.ndarray:
+    """
+    Calcula la firma MinHash de los shingles de SHINGLE_SIZE palabras.
+    
+    Args:
+        normalized: Salida de normalize_transcript
+        
+    Returns:
+        Array uint32 de MINHASH_PERMUTATIONS valores
+    """
+    words = normalized.split(" ")
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    # (shingles × permutaciones); el desborde de uint64 es el módulo 2^64 de la familia
+    with np.errstate(over="ignore"):
+        permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """
+    Divide la firma en LSH_BANDS bandas y retorna el bucket de cada una.
+    
+    Args:
+        signature: Firma MinHash
+        
+    Returns:
+        Lista de enteros de 64 bits con signo (aptos para SQLite)
+    """
+    return [
+        int.from_bytes(
+            hashlib.blake2b(signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND].tobytes(), digest_size=8).digest(),
+            "big",
+            signed=True
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def estimate_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """
+    Estima la similitud de Jaccard como la fracción de posiciones iguales.
+    
+    Args:
+        signature_a: Firma MinHash
+        signature_b: Firma MinHash
+        
+    Returns:
+        Similitud entre 0 y 1
+    """
+    return float(np.mean(signature_a == signature_b))
+
+
+def find_near_duplicates(
+    transcripts: List[str],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD
+) -> Dict[int, Tuple[Dict[str, Any], float]]:
+    """
+    Busca en el índice una categorización reutilizable para cada transcripción.
+    
+    Args:
+        transcripts: Transcripciones sin categorizar
+        threshold: Similitud de Jaccard mínima para reutilizar
+        
+    Returns:
+        Dict {posición: (categorización, similitud)} solo para las que superan el umbral
+    """
+    if not transcripts:
+        return {}
+    
+    signatures = [compute_signature(normalize_transcript(t)) for t in transcripts]
+    candidates = find_fingerprint_candidates(
+        [band_buckets(signature) for signature in signatures],
+        get_current_versions()
+    )
+    
+    matches = {}
+    for position, position_candidates in candidates.items():
+        best: Optional[Tuple[Dict[str, Any], float]] = None
+        for stored_signature, result in position_candidates:
+            similarity = estimate_similarity(signatures[position], np.frombuffer(stored_signature, dtype=np.uint32))
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (result, similarity)
+        if best is not None:
+            matches[position] = best
+    
+    return matches
+
+
+def index_categorizations(transcripts: List[str], results: List[Dict[str, Any]]) -> int:
+    """
+    Agrega al índice las transcripciones categorizadas con éxito.
+    
+    Args:
+        transcripts: Transcripciones
+        results: Categorizaciones alineadas con transcripts
+        
+    Returns:
+        Cantidad de firmas nuevas
+    """
+    # Con la cascada un grupo mezcla resultados de los dos modelos: cada
+    # firma se guarda con la versión de su resultado
+    entries_by_version: Dict[str, List[Tuple[str, bytes, List[int], Dict[str, Any]]]] = {}
+    for transcript, result in zip(transcripts, results):
+        if not result.get("_categorization_success", False):
+            continue
+        normalized = normalize_transcript(transcript)
+        signature = compute_signature(normalized)
+        entries_by_version.setdefault(result.get(VERSION_FIELD), []).append(
+            (transcript_hash(normalized), signature.tobytes(), band_buckets(signature), result)
+        )
+    
+    return sum(store_fingerprints(entries, version) for version, entries in entries_by_version.items())
@@ -0,0 +1,226 @@
+"""
+Caché persistente de categorizaciones en SQLite.
+
+Las entradas se direccionan por contenido: la clave es un hash de la
+transcripción, el nombre del cliente y la versión de categorización
+(instrucciones, schema y modelo). Se guarda en un archivo propio
+(CACHE_DB_PATH), por lo que sobrevive a reinicios del proceso y a
+delete_database().
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.core.database.config import CACHE_DB_PATH
+from src.core.database.connection import get_connection, transaction
+from .defaults import PERSISTENT_CACHE_MAX_BYTES
+from .versioning import get_current_versions
+
+
+_SQL_CHUNK_SIZE = 500
+
+_prepared = False
+_prepare_lock = threading.Lock()
+
+
+def init_cache_database() -> None:
+    """Crea las tablas del caché si no existen (una vez por proceso)."""
+    global _prepared
+    
+    if _prepared and CACHE_DB_PATH.exists():
+        return
+    
+    with _prepare_lock, transaction(CACHE_DB_PATH) as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS categorization_cache (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cache_last_accessed
+            ON categorization_cache (last_accessed)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO cache_stats (name, value) VALUES ('hits', 0), ('misses', 0)")
+    
+    _prepared = True
+
+
+def build_cache_key(transcript: str, client_name: str) -> str:
+    """
+    Construye la clave de caché para una transcripción.
+    
+    Args:
+        transcript: Texto de la transcripción
+        client_name: Nombre del cliente
+        
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = json.dumps(
+        [transcript, client_name, list(get_current_versions())],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_categorizations(cache_keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Busca categorizaciones en el caché y actualiza los contadores hit/miss.
+    
+    Args:
+        cache_keys: Claves generadas con build_cache_key
+        
+    Returns:
+        Lista alineada con cache_keys: el resultado cacheado o None
+    """
+    if not cache_keys:
+        return []
+    
+    init_cache_database()
+    
+    with transaction(CACHE_DB_PATH) as conn:
+        cursor = conn.cursor()
+        
+        found: Dict[str, Dict[str, Any]] = {}
+        unique_keys = list(dict.fromkeys(cache_keys))
+        for i in range(0, len(unique_keys), _SQL_CHUNK_SIZE):
+            chunk = unique_keys[i:i + _SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT cache_key, result FROM categorization_cache WHERE cache_key IN ({placeholders})",
+                chunk
+            )
+            for cache_key, result in cursor.fetchall():
+                found[cache_key] = json.loads(result)
+        
+        now = time.time()
+        cursor.executemany(
+            "UPDATE categorization_cache SET last_accessed = ? WHERE cache_key = ?",
+            [(now, cache_key) for cache_key in found]
+        )
+        
+        hits = sum(1 for cache_key in cache_keys if cache_key in found)
+        _increment_stats(cursor, hits=hits, misses=len(cache_keys) - hits)
+    
+    return [dict(found[cache_key]) if cache_key in found else None for cache_key in cache_keys]
+
+
+def store_categorizations(entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    Guarda categorizaciones exitosas en el caché y aplica la política de evicción.
+    
+    Args:
+        entries: Lista de tuplas (cache_key, resultado)
+    """
+    rows = []
+    now = time.time()
+    for cache_key, result in entries:
+        if not result.get("_categorization_success", False):
+            continue
+        serialized = json.dumps(result, ensure_ascii=False)
+        rows.append((cache_key, serialized, len(serialized.encode("utf-8")), now, now))
+    
+    if not rows:
+        return
+    
+    init_cache_database()
+    
+    with transaction(CACHE_DB_PATH) as conn:
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT OR REPLACE INTO categorization_cache
+                (cache_key, result, size_bytes, created_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        
+        _evict_to_size(cursor, PERSISTENT_CACHE_MAX_BYTES)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Retorna estadísticas del caché persistente.
+    
+    Returns:
+        Dict con entries, size_bytes, hits, misses y hit_rate
+    """
+    init_cache_database()
+    
+    cursor = get_connection(CACHE_DB_PATH).cursor()
+    
+    cursor.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM categorization_cache")
+    entries, size_bytes = cursor.fetchone()
+    cursor.execute("SELECT name, value FROM cache_stats")
+    stats = dict(cursor.fetchall())
+    
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    lookups = hits + misses
+    
+    return {
+        "entries": entries,
+        "size_bytes": size_bytes,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0
+    }
+
+
+def clear_persistent_cache() -> None:
+    """Elimina todas las entradas del caché persistente y reinicia los contadores."""
+    init_cache_database()
+    
+    with transaction(CACHE_DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM categorization_cache")
+        cursor.execute("UPDATE cache_stats SET value = 0")
+
+
+def _increment_stats(cursor: sqlite3.Cursor, hits: int, misses: int) -> None:
+    """Suma hits/misses a los contadores persistentes."""
+    cursor.executemany(
+        "UPDATE cache_stats SET value = value + ? WHERE name = ?",
+        [(hits, "hits"), (misses, "misses")]
+    )
+
+
+def _evict_to_size(cursor: sqlite3.Cursor, max_bytes: int) -> None:
+    """
+    Elimina las entradas menos usadas recientemente hasta quedar bajo max_bytes.
+    
+    Args:
+        cursor: Cursor abierto sobre la DB de caché
+        max_bytes: Tamaño máximo permitido para los resultados almacenados
+    """
+    cursor.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM categorization_cache")
+    excess = cursor.fetchone()[0] - max_bytes
+    
+    if excess <= 0:
+        return
+    
+    cursor.execute("SELECT cache_key, size_bytes FROM categorization_cache ORDER BY last_accessed ASC")
+    
+    to_delete = []
+    for cache_key, size_bytes in cursor.fetchall():
+        if excess <= 0:
+            break
+        to_delete.append((cache_key,))
+        excess -= size_bytes
+    
+    cursor.executemany("DELETE FROM categorization_cache WHERE cache_key = ?", to_delete)
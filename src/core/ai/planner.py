@@ -0,0 +1,98 @@
+"""
+Planificación de batches según el tamaño estimado de cada transcripción.
+
+En lugar de grupos fijos, empaqueta transcripciones contiguas hasta
+alcanzar un presupuesto de tokens o un máximo de elementos por batch.
+Las transcripciones cortas viajan juntas y las muy largas van solas,
+evitando llamadas que superen BATCH_TIMEOUT. Las que superan
+LONG_TRANSCRIPT_TOKENS siempre forman su propio batch, que se categoriza
+por fragmentos (ver long_transcripts.py).
+"""
+
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+from .tokens import estimate_tokens, OUTPUT_TOKENS_PER_ITEM
+from .defaults import BATCH_TOKEN_BUDGET, LONG_TRANSCRIPT_TOKENS, MAX_BATCH_ITEMS
+
+
+def plan_batches(
+    transcripts: List[str],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_items: int = MAX_BATCH_ITEMS,
+    long_threshold: int = LONG_TRANSCRIPT_TOKENS
+) -> List[Tuple[int, int]]:
+    """
+    Agrupa transcripciones contiguas respetando un presupuesto de tokens.
+    
+    El costo de cada transcripción es su tamaño estimado más los tokens de
+    respuesta esperados. Una transcripción que por sí sola supera el
+    presupuesto, o que supera `long_threshold`, forma su propio batch.
+    
+    Args:
+        transcripts: Transcripciones en el orden en que se procesarán
+        token_budget: Máximo de tokens estimados por batch
+        max_items: Máximo de transcripciones por batch
+        long_threshold: Tokens a partir de los cuales una transcripción va sola
+        
+    Returns:
+        Lista de tuplas (inicio, fin) que cubren todo el rango en orden
+    """
+    batches = []
+    batch_start = 0
+    batch_tokens = 0
+    
+    for i, transcript in enumerate(transcripts):
+        tokens = estimate_tokens(transcript)
+        cost = tokens + OUTPUT_TOKENS_PER_ITEM
+        batch_items = i - batch_start
+        is_long = tokens > long_threshold
+        
+        if batch_items > 0 and (batch_items >= max_items or batch_tokens + cost > token_budget or is_long):
+            batches.append((batch_start, i))
+            batch_start = i
+            batch_tokens = 0
+        
+        # Nada se suma a una transcripción larga: el presupuesto queda agotado
+        batch_tokens += token_budget if is_long else cost
+    
+    if batch_start < len(transcripts):
+        batches.append((batch_start, len(transcripts)))
+    
+    return batches
+
+
+def describe_batch_plan(batches: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Resume la distribución de tamaños de un plan de batches.
+    
+    Args:
+        batches: Plan generado por plan_batches
+        
+    Returns:
+        Dict con:
+        - batches: Cantidad de batches
+        - items: Total de transcripciones
+        - min_size / max_size / avg_size: Tamaños de batch
+        - size_distribution: Dict {tamaño: cantidad de batches}
+    """
+    sizes = [batch_end - batch_start for batch_start, batch_end in batches]
+    
+    if not sizes:
+        return {
+            "batches": 0,
+            "items": 0,
+            "min_size": 0,
+            "max_size": 0,
+            "avg_size": 0.0,
+            "size_distribution": {}
+        }
+    
+    return {
+        "batches": len(sizes),
+        "items": sum(sizes),
+        "min_size": min(sizes),
+        "max_size": max(sizes),
+        "avg_size": round(sum(sizes) / len(sizes), 2),
+        "size_distribution": dict(sorted(Counter(sizes).items()))
+    }
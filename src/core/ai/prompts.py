@@ -2,20 +2,94 @@
 Construcción de prompts para la categorización con Gemini.
 """
 
-from typing import List
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
 
 
-def build_single_categorization_prompt(transcript: str, client_name: str) -> str:
+_INSTRUCTION_SECTIONS: List[Tuple[str, str]] = [
+    ("sector_principal", """Identifica el sector principal de entre: ["Tecnología / Software / SaaS", "Retail / E-commerce", "Salud", "Consultoría", "Educación / EdTech", "Alimentación / Restaurantes / Catering", "Logística / Transporte", "Turismo / Hospitalidad", "Eventos", "Moda sostenible", "Otros"]. Elige el más cercano o usa "Otros"."""),
+    ("sector_secundario", """Especifica el subsector (ej: "Fintech", "EdTech", "SaaS", "Clínica dental", etc.). Si no hay información, usa null."""),
+    ("volumen_numerico", """Extrae el número de interacciones mencionadas y NORMALÍZALO A INTERACCIONES POR SEMANA:
+        - Si dice "80 diarias" → 80 × 7 = 560 semanales
+        - Si dice "500 semanales" → 500 semanales
+        - Si dice "2000 mensuales" → 2000 ÷ 4 = 500 semanales
+        - Si no hay número concreto, usa null"""),
+    ("volumen_nivel", """Clasifica el volumen SEMANAL:
+        - "Bajo (<100)" si < 100 por semana
+        - "Medio (100-250)" si 100-250 por semana
+        - "Alto (251-500)" si 251-500 por semana
+        - "Muy Alto (>500)" si > 500 por semana
+        - "Desconocido" si no hay información"""),
+    ("es_pico_estacional", """TRUE si menciona: "picos", "temporada alta", "promociones", "duplicarse", "triplicarse". FALSE en caso contrario."""),
+    ("fuente_primaria", """De dónde conoció Vambe: ["Evento/Conferencia", "Recomendación", "Búsqueda Online", "LinkedIn/Publicación", "Webinar/Podcast", "Otro"]"""),
+    ("fuente_detalle", """Texto específico que describe la fuente."""),
+    ("preocupaciones", """Array de MÁXIMO 3 preocupaciones ordenadas por importancia. Para cada una:
+        - **tipo**: ["Integración con sistemas", "Personalización/Tono de marca", "Confidencialidad/Compliance", "Multilingüe/Internacional", "Volumen extremo", "Consultas técnicas complejas", "Urgencia en tiempo real", "Otra"]
+        - **impacto**: ["Alto", "Medio", "Bajo"]
+        - **ejemplo_frase**: Copia textual de 10-30 palabras"""),
+    ("urgencia_nivel", """["Alta", "Media", "Baja"]"""),
+    ("potencial_upsell", """Array de add-ons valorados: ["Integración con CRM/Tickets existente", "Soporte multicanal (WhatsApp, IG, Email, etc.)", "Escalamiento automático en temporada alta / picos", "Respuestas personalizadas con tono de marca", "Reportes y analíticos de atención al cliente"]""")
+]
+
+
+# Con response_schema nativo los enums y tipos viajan en el schema: solo
+# quedan las reglas que el schema no puede expresar
+_SCHEMA_INSTRUCTION_SECTIONS: List[Tuple[str, str]] = [
+    ("sector_principal", """El más cercano; "Otros" si ninguno aplica."""),
+    ("sector_secundario", """Subsector (ej: "Fintech", "Clínica dental"); null si no hay información."""),
+    ("volumen_numerico", """Normalizado a interacciones POR SEMANA (diarias × 7, mensuales ÷ 4); null si no hay número concreto."""),
+    ("volumen_nivel", """Según el volumen SEMANAL; "Desconocido" si no hay información."""),
+    ("preocupaciones", """Máximo 3, ordenadas por importancia; ejemplo_frase es copia textual de 10-30 palabras."""),
+]
+
+
+# Solo en la cascada de modelos (ver cascade.py)
+_CONFIDENCE_SECTION: Tuple[str, str] = (
+    "confianza",
+    """Número de 0 a 1: qué tan seguro estás de la categorización. Baja si la transcripción es ambigua, incompleta o no encaja en las categorías."""
+)
+
+
+RESOLVED_FIELDS_INSTRUCTION = (
+    'Si una transcripción trae "Campos ya resueltos", NO incluyas esos campos en su objeto.'
+)
+
+
+def build_single_categorization_prompt(
+    transcript: str,
+    client_name: str,
+    hints: Optional[Dict[str, Any]] = None,
+    native_schema: bool = False
+) -> str:
     """
     Construye el prompt para categorización individual.
     
     Args:
         transcript: Texto de la transcripción
         client_name: Nombre del cliente
+        hints: Campos ya resueltos por el pre-extractor local (opcional)
+        native_schema: Si la llamada usa response_schema (prompt reducido)
         
     Returns:
         Prompt formateado para Gemini
     """
+    instructions = get_categorization_instructions(set(hints or ()), native_schema)
+    
+    if native_schema:
+        # Los campos resueltos ya no están en el schema: no hace falta nombrarlos
+        return f"""
+Eres un analista experto de ventas B2B. Extrae la información estructurada de esta reunión comercial.
+
+**Cliente:** {client_name}
+
+**Transcripción:**
+{transcript}
+{instructions}
+"""
+    
+    resolved = ""
+    if hints:
+        resolved = f"\n{format_resolved_fields(hints)}\n{RESOLVED_FIELDS_INSTRUCTION}\n"
+    
     return f"""
 Eres un analista experto de ventas B2B. Tu tarea es analizar la siguiente transcripción de una reunión comercial y extraer información estructurada clave.
 
@@ -23,99 +97,280 @@ Eres un analista experto de ventas B2B. Tu tarea es analizar la siguiente transc
 
 **Transcripción:**
 {transcript}
-
-{get_categorization_instructions()}
+{resolved}
+{instructions}
 
 **IMPORTANTE:** Devuelve SOLO el JSON estructurado, sin texto adicional antes o después.
 """
 
 
+def build_chunk_extraction_prompt(
+    chunk: str,
+    client_name: str,
+    chunk_number: int,
+    chunk_count: int,
+    hints: Optional[Dict[str, Any]] = None,
+    native_schema: bool = False
+) -> str:
+    """
+    Construye el prompt de extracción parcial de un fragmento de una transcripción larga.
+    
+    El modelo solo debe reportar lo que aparece en el fragmento; los
+    valores neutros (null, "Desconocido", "Otro", listas vacías) indican
+    ausencia y se descartan al combinar los fragmentos.
+    
+    Args:
+        chunk: Texto del fragmento
+        client_name: Nombre del cliente
+        chunk_number: Número del fragmento (desde 1)
+        chunk_count: Total de fragmentos de la transcripción
+        hints: Campos resueltos localmente sobre la transcripción completa
+        native_schema: Si la llamada usa response_schema (prompt reducido)
+        
+    Returns:
+        Prompt formateado para Gemini
+    """
+    instructions = get_categorization_instructions(set(hints or ()), native_schema)
+    closing = "" if native_schema else "\n**IMPORTANTE:** Devuelve SOLO el JSON estructurado, sin texto adicional antes o después.\n"
+    
+    return f"""
+Eres un analista experto de ventas B2B. Este es el fragmento {chunk_number} de {chunk_count} de una reunión comercial larga; los fragmentos se solapan levemente.
+Extrae SOLO la información que aparece en este fragmento. Para lo que no se menciona usa null, "Desconocido", "Otros"/"Otro", "Media" o listas vacías.
+
+**Cliente:** {client_name}
+
+**Fragmento {chunk_number}/{chunk_count}:**
+{chunk}
+{instructions}
+{closing}"""
+
+
 def build_batch_categorization_prompt(
     batch_transcripts: List[str],
     batch_names: List[str],
     batch_start: int,
-    batch_size: int
+    batch_size: int,
+    transcript_ids: Optional[List[int]] = None,
+    hints: Optional[List[Dict[str, Any]]] = None,
+    native_schema: bool = False,
+    include_instructions: bool = True,
+    with_confidence: bool = False
 ) -> str:
     """
     Construye el prompt para categorización en batch.
     
+    Cada objeto de la respuesta debe incluir "transcripcion_id" para poder
+    asociarlo a su transcripción aunque la respuesta venga incompleta.
+    
     Args:
         batch_transcripts: Lista de transcripciones del grupo
         batch_names: Lista de nombres de clientes del grupo
         batch_start: Índice de inicio del grupo
         batch_size: Tamaño del grupo
+        transcript_ids: Números de cada transcripción (por defecto batch_start + 1, ...)
+        hints: Campos ya resueltos por el pre-extractor local, uno por transcripción
+        native_schema: Si la llamada usa response_schema (prompt reducido; el
+            formato del array y los enums los impone el schema)
+        include_instructions: Si es False se omite el bloque de instrucciones,
+            que viaja aparte (ver build_batch_instruction_prefix)
+        with_confidence: Si True se pide "confianza" en cada objeto
         
     Returns:
         Prompt formateado para Gemini
     """
+    if transcript_ids is None:
+        transcript_ids = [batch_start + i for i in range(1, batch_size + 1)]
+    if hints is None:
+        hints = [{}] * batch_size
+    
+    skip_fields = get_shared_resolved_fields(hints)
+    
+    if native_schema:
+        return _build_schema_batch_prompt(
+            batch_transcripts, batch_names, transcript_ids, hints, skip_fields, include_instructions, with_confidence
+        )
+    
+    instructions = (
+        get_categorization_instructions(skip_fields, with_confidence=with_confidence) if include_instructions else ""
+    )
     prompt = f"""
         Eres un analista experto de ventas B2B. Analiza las siguientes {batch_size} transcripciones de reuniones comerciales y devuelve un array JSON con exactamente {batch_size} objetos, uno por cada transcripción.
 
-        {get_categorization_instructions()}
+        {instructions}
 
         **TRANSCRIPCIONES A ANALIZAR:**
 
         """
     
-    for i, (transcript, name) in enumerate(zip(batch_transcripts, batch_names), 1):
+    for transcript_id, transcript, name, transcript_hints in zip(transcript_ids, batch_transcripts, batch_names, hints):
         prompt += f"""
             ---
-            **TRANSCRIPCIÓN #{batch_start + i}**
+            **TRANSCRIPCIÓN #{transcript_id}**
             **Cliente:** {name}
             **Texto:**
             {transcript}
 
+            """
+        pending_hints = [field for field in transcript_hints if field not in skip_fields]
+        if pending_hints:
+            prompt += f"""{format_resolved_fields(pending_hints)}
+
             """
     
     prompt += f"""
         ---
 
         **IMPORTANTE:** Devuelve SOLO un array JSON con exactamente {batch_size} objetos, sin texto adicional antes o después.
-        Formato: [{{"sector_principal": "...", "sector_secundario": "...", ...}}, {{"sector_principal": "...", ...}}, ...]
+        Cada objeto debe incluir "transcripcion_id" con el número de la transcripción que analiza.
+        Formato: [{{"transcripcion_id": {transcript_ids[0]}, "sector_principal": "...", "sector_secundario": "...", ...}}, {{"transcripcion_id": ..., "sector_principal": "...", ...}}, ...]
+        """
+    
+    if skip_fields:
+        prompt += f"""NO incluyas en ningún objeto los campos: {', '.join(sorted(skip_fields))}.
+        """
+    if any(set(h) - skip_fields for h in hints):
+        prompt += f"""{RESOLVED_FIELDS_INSTRUCTION}
         """
     
     return prompt
 
 
-def get_categorization_instructions() -> str:
+def _build_schema_batch_prompt(
+    batch_transcripts: List[str],
+    batch_names: List[str],
+    transcript_ids: List[int],
+    hints: List[Dict[str, Any]],
+    skip_fields: Set[str],
+    include_instructions: bool = True,
+    with_confidence: bool = False
+) -> str:
     """
-    Retorna las instrucciones comunes de categorización.
+    Construye el prompt de batch reducido para el modo response_schema.
     
+    Args:
+        batch_transcripts: Transcripciones del grupo
+        batch_names: Nombres de clientes del grupo
+        transcript_ids: Números de cada transcripción
+        hints: Campos resueltos localmente por transcripción
+        skip_fields: Campos resueltos en todas las transcripciones (fuera del schema)
+        include_instructions: Si es False se omiten las reglas
+        with_confidence: Si True se pide "confianza" en cada objeto
+        
     Returns:
-        Texto con instrucciones detalladas para el modelo
+        Prompt formateado para Gemini
     """
-    return """
-        **INSTRUCCIONES CRÍTICAS:**
-
-        1. **sector_principal**: Identifica el sector principal de entre: ["Tecnología / Software / SaaS", "Retail / E-commerce", "Salud", "Consultoría", "Educación / EdTech", "Alimentación / Restaurantes / Catering", "Logística / Transporte", "Turismo / Hospitalidad", "Eventos", "Moda sostenible", "Otros"]. Elige el más cercano o usa "Otros".
+    blocks = []
+    for transcript_id, transcript, name, transcript_hints in zip(transcript_ids, batch_transcripts, batch_names, hints):
+        block = f"---\n**TRANSCRIPCIÓN #{transcript_id}**\n**Cliente:** {name}\n{transcript}"
+        pending_hints = [field for field in transcript_hints if field not in skip_fields]
+        if pending_hints:
+            block += f"\n{format_resolved_fields(pending_hints)}"
+        blocks.append(block)
+    
+    resolved = ""
+    if any(set(h) - skip_fields for h in hints):
+        resolved = " Los campos marcados como ya resueltos pueden ir con cualquier valor válido: se reemplazan localmente."
+    
+    instructions = (
+        get_categorization_instructions(skip_fields, native_schema=True, with_confidence=with_confidence)
+        if include_instructions else ""
+    )
+    
+    return f"""Eres un analista experto de ventas B2B. Devuelve un objeto por cada una de las {len(transcript_ids)} transcripciones, con transcripcion_id igual a su número.{resolved}
+{instructions}
+{chr(10).join(blocks)}
+"""
 
-        2. **sector_secundario**: Especifica el subsector (ej: "Fintech", "EdTech", "SaaS", "Clínica dental", etc.). Si no hay información, usa null.
 
-        3. **volumen_numerico**: Extrae el número de interacciones mencionadas y NORMALÍZALO A INTERACCIONES POR SEMANA:
-        - Si dice "80 diarias" → 80 × 7 = 560 semanales
-        - Si dice "500 semanales" → 500 semanales
-        - Si dice "2000 mensuales" → 2000 ÷ 4 = 500 semanales
-        - Si no hay número concreto, usa null
+def build_batch_instruction_prefix(
+    skip_fields: Set[str],
+    native_schema: bool = False,
+    with_confidence: bool = False
+) -> str:
+    """
+    Construye el bloque estático de instrucciones compartido por todos los batches.
+    
+    Es idéntico entre llamadas con los mismos campos omitidos, por lo que
+    puede subirse una sola vez como caché de contexto. Se combina con
+    build_batch_categorization_prompt(..., include_instructions=False).
+    
+    Args:
+        skip_fields: Campos resueltos en todas las transcripciones del batch
+        native_schema: Si la llamada usa response_schema
+        with_confidence: Si True se pide "confianza" en cada objeto
+        
+    Returns:
+        Texto de las instrucciones
+    """
+    return f"""Eres un analista experto de ventas B2B que categoriza transcripciones de reuniones comerciales.
+{get_categorization_instructions(skip_fields, native_schema, with_confidence)}
+"""
 
-        4. **volumen_nivel**: Clasifica el volumen SEMANAL:
-        - "Bajo (<100)" si < 100 por semana
-        - "Medio (100-250)" si 100-250 por semana
-        - "Alto (251-500)" si 251-500 por semana
-        - "Muy Alto (>500)" si > 500 por semana
-        - "Desconocido" si no hay información
 
-        5. **es_pico_estacional**: TRUE si menciona: "picos", "temporada alta", "promociones", "duplicarse", "triplicarse". FALSE en caso contrario.
+def get_shared_resolved_fields(hints: Optional[List[Dict[str, Any]]]) -> Set[str]:
+    """
+    Retorna los campos resueltos localmente en todas las transcripciones de un prompt.
+    
+    Sus instrucciones (y su entrada en el response_schema) sobran.
+    
+    Args:
+        hints: Campos pre-extraídos por transcripción
+        
+    Returns:
+        Conjunto de nombres de campo
+    """
+    return set.intersection(*(set(h) for h in hints)) if hints else set()
 
-        6. **fuente_primaria**: De dónde conoció Vambe: ["Evento/Conferencia", "Recomendación", "Búsqueda Online", "LinkedIn/Publicación", "Webinar/Podcast", "Otro"]
 
-        7. **fuente_detalle**: Texto específico que describe la fuente.
+def format_resolved_fields(hints: Iterable[str]) -> str:
+    """
+    Formatea los campos pre-extraídos para incluirlos junto a una transcripción.
+    
+    Solo se listan los nombres: el modelo no necesita los valores porque
+    no los genera, y así cada transcripción suma pocos tokens.
+    
+    Args:
+        hints: Nombres de los campos resueltos localmente
+        
+    Returns:
+        Línea con los nombres de los campos resueltos
+    """
+    return f"**Campos ya resueltos:** {', '.join(hints)}"
 
-        8. **preocupaciones**: Array de MÁXIMO 3 preocupaciones ordenadas por importancia. Para cada una:
-        - **tipo**: ["Integración con sistemas", "Personalización/Tono de marca", "Confidencialidad/Compliance", "Multilingüe/Internacional", "Volumen extremo", "Consultas técnicas complejas", "Urgencia en tiempo real", "Otra"]
-        - **impacto**: ["Alto", "Medio", "Bajo"]
-        - **ejemplo_frase**: Copia textual de 10-30 palabras
 
-        9. **urgencia_nivel**: ["Alta", "Media", "Baja"]
+def get_categorization_instructions(
+    skip_fields: Optional[Set[str]] = None,
+    native_schema: bool = False,
+    with_confidence: bool = False
+) -> str:
+    """
+    Retorna las instrucciones comunes de categorización.
+    
+    Args:
+        skip_fields: Campos cuya instrucción se omite porque ya vienen
+            resueltos en todas las transcripciones del prompt
+        native_schema: Si True, solo las reglas que el response_schema no
+            expresa (sin listas de valores permitidos)
+        with_confidence: Si True agrega la instrucción de "confianza"
+        
+    Returns:
+        Texto con instrucciones detalladas para el modelo
+    """
+    sections = [
+        (field, text) for field, text in (_SCHEMA_INSTRUCTION_SECTIONS if native_schema else _INSTRUCTION_SECTIONS)
+        if not skip_fields or field not in skip_fields
+    ]
+    if with_confidence:
+        sections.append(_CONFIDENCE_SECTION)
+    
+    if native_schema:
+        return "**Reglas:**\n" + "\n".join(f"- {field}: {text}" for field, text in sections)
+    
+    numbered = "\n\n        ".join(
+        f"{number}. **{field}**: {text}" for number, (field, text) in enumerate(sections, 1)
+    )
+    return f"""
+        **INSTRUCCIONES CRÍTICAS:**
 
-        10. **potencial_upsell**: Array de add-ons valorados: ["Integración con CRM/Tickets existente", "Soporte multicanal (WhatsApp, IG, Email, etc.)", "Escalamiento automático en temporada alta / picos", "Respuestas personalizadas con tono de marca", "Reportes y analíticos de atención al cliente"]
+        {numbered}
     """
@@ -0,0 +1,558 @@
+"""
+Proveedores de respuestas para las llamadas de categorización.
+
+client.py no habla directamente con Gemini sino con el proveedor activo:
+- GeminiProvider: API real (a través del pool de modelos)
+- RecordingProvider: delega en otro proveedor y guarda cada respuesta
+- ReplayProvider: responde con las grabaciones, sin red ni API key
+- SyntheticProvider: genera respuestas válidas con latencia, errores 429
+  y JSON malformado configurables
+  
+El proveedor se elige con la variable de entorno AI_PROVIDER
+(gemini | record | replay | synthetic) o con set_provider().
+
+Las llamadas pueden separar un prefijo estático (cached_prefix). Solo
+GeminiProvider lo aprovecha, con el caché de contexto de la API; el resto
+lo recibe concatenado al prompt.
+"""
+
+import abc
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from src.core.database.config import RECORDINGS_DB_PATH
+from .client_pool import get_client_pool, summarize_latencies
+from .config import AI_PROVIDER, get_gemini_model_name
+from .context_cache import get_context_cache
+from .response_schema import CONFIDENCE_FIELD
+from .defaults import get_default_categorization
+
+
+_LATENCY_WINDOW = 100_000
+
+
+class ResponseProvider(abc.ABC):
+    """
+    Interfaz común de los proveedores.
+    
+    Las subclases implementan _generate y opcionalmente _stream; esta clase
+    registra llamadas, errores y latencias para los benchmarks. Las que
+    declaran supports_cached_prefix reciben el prefijo por separado.
+    """
+    
+    name = "base"
+    supports_cached_prefix = False
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._calls = 0
+        self._errors = 0
+    
+    def generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> str:
+        """
+        Retorna el texto completo de la respuesta.
+        
+        Args:
+            prompt: Prompt a enviar (parte variable si hay cached_prefix)
+            generation_config: Configuración de generación
+            timeout: Timeout en segundos
+            cached_prefix: Prefijo estático de instrucciones, cacheable
+            model_name: Modelo a usar (por defecto GEMINI_MODEL)
+            
+        Returns:
+            Texto de la respuesta
+        """
+        prompt, kwargs = self._split_prefix(prompt, cached_prefix)
+        start = time.perf_counter()
+        try:
+            return self._generate(prompt, generation_config, timeout, model_name=model_name, **kwargs)
+        except Exception:
+            self._record_error()
+            raise
+        finally:
+            self._record_latency(time.perf_counter() - start)
+    
+    def stream(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Retorna la respuesta como fragmentos de texto en orden de llegada.
+        
+        Args:
+            prompt: Prompt a enviar (parte variable si hay cached_prefix)
+            generation_config: Configuración de generación
+            timeout: Timeout en segundos
+            cached_prefix: Prefijo estático de instrucciones, cacheable
+            model_name: Modelo a usar (por defecto GEMINI_MODEL)
+            
+        Yields:
+            Fragmentos de texto
+        """
+        prompt, kwargs = self._split_prefix(prompt, cached_prefix)
+        start = time.perf_counter()
+        try:
+            yield from self._stream(prompt, generation_config, timeout, model_name=model_name, **kwargs)
+        except Exception:
+            self._record_error()
+            raise
+        finally:
+            self._record_latency(time.perf_counter() - start)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna llamadas, errores y latencias (count, mean, p50, p95) del proveedor.
+        
+        Returns:
+            Dict con calls, errors y latency
+        """
+        with self._lock:
+            return {
+                "provider": self.name,
+                "calls": self._calls,
+                "errors": self._errors,
+                "latency": summarize_latencies(list(self._latencies))
+            }
+    
+    def reset_stats(self) -> None:
+        """Reinicia los contadores."""
+        with self._lock:
+            self._latencies.clear()
+            self._calls = 0
+            self._errors = 0
+    
+    def _split_prefix(self, prompt: str, cached_prefix: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """Entrega el prefijo aparte si el proveedor lo soporta; si no, lo antepone al prompt."""
+        if cached_prefix is None:
+            return prompt, {}
+        if self.supports_cached_prefix:
+            return prompt, {"cached_prefix": cached_prefix}
+        return cached_prefix + prompt, {}
+    
+    @abc.abstractmethod
+    def _generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        model_name: Optional[str] = None
+    ) -> str:
+        """Retorna el texto completo de la respuesta del modelo."""
+    
+    def _stream(self, prompt: str, generation_config: Dict[str, Any], timeout: int, **kwargs) -> Iterator[str]:
+        # Por defecto la respuesta llega en un solo fragmento
+        yield self._generate(prompt, generation_config, timeout, **kwargs)
+    
+    def _record_latency(self, elapsed: float) -> None:
+        with self._lock:
+            self._calls += 1
+            self._latencies.append(elapsed)
+    
+    def _record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+
+class GeminiProvider(ResponseProvider):
+    """
+    Llamadas reales a Gemini usando los modelos compartidos del pool.
+    
+    El cached_prefix se sirve desde el caché de contexto cuando está
+    habilitado y disponible; si no, se envía dentro del prompt.
+    """
+    
+    name = "gemini"
+    supports_cached_prefix = True
+    
+    def _generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> str:
+        response, cache = self._call(prompt, generation_config, timeout, cached_prefix, model_name)
+        _record_prefix_usage(cached_prefix, cache, response)
+        return response.text
+    
+    def _stream(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> Iterator[str]:
+        response, cache = self._call(prompt, generation_config, timeout, cached_prefix, model_name, stream=True)
+        for chunk in response:
+            yield chunk.text
+        _record_prefix_usage(cached_prefix, cache, response)
+    
+    def _call(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str],
+        model_name: Optional[str] = None,
+        **kwargs
+    ):
+        """Resuelve el caché de contexto del prefijo y llama al modelo del pool."""
+        model_name = model_name or get_gemini_model_name()
+        cache = None
+        if cached_prefix is not None:
+            cache = get_context_cache().get_cached_content(model_name, cached_prefix)
+            if cache is None:
+                prompt = cached_prefix + prompt
+        
+        response = get_client_pool().generate(
+            model_name,
+            generation_config,
+            prompt,
+            timeout,
+            cached_content=cache,
+            **kwargs
+        )
+        return response, cache
+
+
+def _record_prefix_usage(cached_prefix: Optional[str], cache, response) -> None:
+    """Contabiliza el prefijo de la llamada con los tokens cacheados que reporta la API."""
+    if cached_prefix is None:
+        return
+    
+    usage = getattr(response, "usage_metadata", None)
+    get_context_cache().record_call(
+        cached_prefix,
+        used_cache=cache is not None,
+        cached_tokens=getattr(usage, "cached_content_token_count", None)
+    )
+
+
+class RecordingStore:
+    """
+    Grabaciones de respuestas en SQLite, direccionadas por hash del request.
+    
+    Args:
+        db_path: Archivo SQLite de las grabaciones
+    """
+    
+    def __init__(self, db_path=RECORDINGS_DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(exist_ok=True)
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS recorded_responses (
+                request_hash TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+    
+    @staticmethod
+    def request_hash(prompt: str, generation_config: Dict[str, Any], model_name: Optional[str] = None) -> str:
+        """Hash SHA-256 del modelo, la configuración y el prompt."""
+        payload = json.dumps(
+            [model_name or get_gemini_model_name(), generation_config, prompt],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, request_hash: str) -> Optional[str]:
+        """Retorna la respuesta grabada o None."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            "SELECT response FROM recorded_responses WHERE request_hash = ?",
+            (request_hash,)
+        ).fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def put(self, request_hash: str, response: str, model_name: Optional[str] = None) -> None:
+        """Guarda (o reemplaza) una respuesta."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("""
+            INSERT OR REPLACE INTO recorded_responses (request_hash, model, response, recorded_at)
+            VALUES (?, ?, ?, ?)
+        """, (request_hash, model_name or get_gemini_model_name(), response, time.time()))
+        conn.commit()
+        conn.close()
+
+
+class RecordingProvider(ResponseProvider):
+    """
+    Delega en otro proveedor y graba cada respuesta completa.
+    
+    Args:
+        inner: Proveedor real (normalmente GeminiProvider)
+        store: Almacén de grabaciones
+    """
+    
+    name = "record"
+    supports_cached_prefix = True
+    
+    def __init__(self, inner: ResponseProvider, store: Optional[RecordingStore] = None):
+        super().__init__()
+        self.inner = inner
+        self.store = store or RecordingStore()
+    
+    # El hash usa prefijo + prompt: coincide con el prompt completo que recibe ReplayProvider
+    
+    def _generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> str:
+        text = self.inner.generate(prompt, generation_config, timeout, cached_prefix, model_name)
+        self.store.put(
+            RecordingStore.request_hash((cached_prefix or "") + prompt, generation_config, model_name),
+            text,
+            model_name
+        )
+        return text
+    
+    def _stream(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        cached_prefix: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> Iterator[str]:
+        chunks = []
+        for chunk in self.inner.stream(prompt, generation_config, timeout, cached_prefix, model_name):
+            chunks.append(chunk)
+            yield chunk
+        # Solo se graban respuestas completas
+        self.store.put(
+            RecordingStore.request_hash((cached_prefix or "") + prompt, generation_config, model_name),
+            "".join(chunks),
+            model_name
+        )
+
+
+class ReplayProvider(ResponseProvider):
+    """
+    Responde con las grabaciones de RecordingProvider.
+    
+    Args:
+        store: Almacén de grabaciones
+        fallback: Proveedor opcional para prompts sin grabación; sin él se
+            lanza LookupError
+        chunk_size: Caracteres por fragmento al reproducir en streaming
+    """
+    
+    name = "replay"
+    
+    def __init__(
+        self,
+        store: Optional[RecordingStore] = None,
+        fallback: Optional[ResponseProvider] = None,
+        chunk_size: int = 256
+    ):
+        super().__init__()
+        self.store = store or RecordingStore()
+        self.fallback = fallback
+        self.chunk_size = chunk_size
+    
+    def _generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        model_name: Optional[str] = None
+    ) -> str:
+        text = self.store.get(RecordingStore.request_hash(prompt, generation_config, model_name))
+        if text is not None:
+            return text
+        if self.fallback is not None:
+            return self.fallback.generate(prompt, generation_config, timeout, model_name=model_name)
+        raise LookupError("No hay una respuesta grabada para este prompt")
+    
+    def _stream(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        model_name: Optional[str] = None
+    ) -> Iterator[str]:
+        text = self._generate(prompt, generation_config, timeout, model_name)
+        for i in range(0, len(text), self.chunk_size):
+            yield text[i:i + self.chunk_size]
+
+
+_TRANSCRIPT_ID_PATTERN = re.compile(r"TRANSCRIPCIÓN #(\d+)")
+
+
+class SyntheticProvider(ResponseProvider):
+    """
+    Genera categorizaciones sintéticas válidas para medir el pipeline sin API.
+    
+    Args:
+        latency: Latencia base por llamada (segundos)
+        latency_per_item: Latencia adicional por transcripción del prompt
+        jitter: Variación relativa de la latencia (0.2 = ±20%)
+        rate_limit_rate: Probabilidad de responder con un error 429
+        malformed_rate: Probabilidad de devolver JSON truncado
+        low_confidence_rate: Probabilidad de reportar confianza baja, cuando
+            el response_schema pide CONFIDENCE_FIELD (ver cascade.py)
+        seed: Semilla para reproducibilidad
+    """
+    
+    name = "synthetic"
+    
+    def __init__(
+        self,
+        latency: float = 0.5,
+        latency_per_item: float = 0.1,
+        jitter: float = 0.2,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        low_confidence_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        super().__init__()
+        self.latency = latency
+        self.latency_per_item = latency_per_item
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.low_confidence_rate = low_confidence_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+    
+    def _generate(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        timeout: int,
+        model_name: Optional[str] = None
+    ) -> str:
+        transcript_ids = [int(match) for match in _TRANSCRIPT_ID_PATTERN.findall(prompt)]
+        with_confidence = CONFIDENCE_FIELD in json.dumps(generation_config.get("response_schema", {}))
+        
+        with self._random_lock:
+            jitter = 1 + self._random.uniform(-self.jitter, self.jitter)
+            rate_limited = self._random.random() < self.rate_limit_rate
+            malformed = self._random.random() < self.malformed_rate
+            confidences = [
+                0.3 if self._random.random() < self.low_confidence_rate else 0.9
+                for _ in transcript_ids or [None]
+            ]
+        
+        time.sleep(max(0.0, (self.latency + self.latency_per_item * max(1, len(transcript_ids))) * jitter))
+        
+        if rate_limited:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota). [synthetic]")
+        
+        objects = [self._categorization(tid) for tid in transcript_ids or [None]]
+        if with_confidence:
+            for obj, confidence in zip(objects, confidences):
+                obj[CONFIDENCE_FIELD] = confidence
+        text = json.dumps(objects if transcript_ids else objects[0], ensure_ascii=False)
+        
+        if malformed:
+            # Respuesta cortada a mitad de un objeto
+            text = text[:int(len(text) * 0.6)]
+        
+        return text
+    
+    def _categorization(self, transcript_id: Optional[int]) -> Dict[str, Any]:
+        result = get_default_categorization()
+        result.pop("_categorization_success")
+        result.update({
+            "sector_principal": "Tecnología / Software / SaaS",
+            "volumen_numerico": 350,
+            "volumen_nivel": "Alto (251-500)",
+            "fuente_primaria": "Recomendación",
+            "fuente_detalle": "Respuesta sintética",
+            "urgencia_nivel": "Media",
+        })
+        if transcript_id is not None:
+            result["transcripcion_id"] = transcript_id
+        return result
+
+
+_provider: Optional[ResponseProvider] = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(name: str) -> ResponseProvider:
+    """
+    Construye un proveedor por nombre.
+    
+    Args:
+        name: gemini | record | replay | synthetic
+        
+    Returns:
+        Instancia del proveedor
+        
+    Raises:
+        ValueError: Si el nombre no es válido
+    """
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "record":
+        return RecordingProvider(GeminiProvider())
+    if name == "replay":
+        return ReplayProvider()
+    if name == "synthetic":
+        return SyntheticProvider()
+    raise ValueError(f"Proveedor desconocido: {name}")
+
+
+def get_provider() -> ResponseProvider:
+    """
+    Retorna el proveedor activo del proceso (AI_PROVIDER por defecto).
+    
+    Returns:
+        Instancia compartida de ResponseProvider
+    """
+    global _provider
+    
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider(AI_PROVIDER)
+        return _provider
+
+
+def set_provider(provider: ResponseProvider) -> None:
+    """
+    Reemplaza el proveedor activo del proceso.
+    
+    Args:
+        provider: Nuevo proveedor
+    """
+    global _provider
+    
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,144 @@
+"""
+Rate limiter tipo token bucket para las llamadas a Gemini.
+
+Controla dos presupuestos a la vez: requests por minuto y tokens por minuto.
+Es thread-safe, por lo que una sola instancia se comparte entre todos los
+workers del procesamiento concurrente.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .defaults import REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE
+
+
+class TokenBucket:
+    """
+    Bucket que se rellena de forma continua hasta su capacidad.
+    
+    Args:
+        capacity: Cantidad máxima acumulable
+        refill_per_second: Unidades que se recuperan por segundo
+    """
+    
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.available = float(capacity)
+        self._last_refill = time.monotonic()
+    
+    def refill(self) -> None:
+        """Recupera las unidades acumuladas desde el último refill."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+        self._last_refill = now
+    
+    def wait_time(self, amount: float) -> float:
+        """
+        Calcula cuántos segundos faltan para poder consumir `amount`.
+        
+        Args:
+            amount: Unidades a consumir
+            
+        Returns:
+            Segundos de espera (0 si ya hay disponibilidad)
+        """
+        amount = min(amount, self.capacity)
+        missing = amount - self.available
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_per_second
+    
+    def consume(self, amount: float) -> None:
+        """Descuenta `amount` unidades del bucket."""
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Limita requests y tokens por minuto usando dos token buckets.
+    
+    Args:
+        requests_per_minute: Máximo de llamadas a la API por minuto
+        tokens_per_minute: Máximo de tokens estimados por minuto
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._lock = threading.Lock()
+    
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Bloquea hasta que haya cupo para una llamada con `estimated_tokens`.
+        
+        Args:
+            estimated_tokens: Tokens estimados de la llamada (prompt + respuesta)
+            
+        Returns:
+            Segundos totales esperados
+        """
+        waited = 0.0
+        
+        while True:
+            with self._lock:
+                self._requests.refill()
+                self._tokens.refill()
+                
+                wait = max(
+                    self._requests.wait_time(1),
+                    self._tokens.wait_time(estimated_tokens)
+                )
+                
+                if wait <= 0:
+                    self._requests.consume(1)
+                    self._tokens.consume(estimated_tokens)
+                    return waited
+            
+            time.sleep(wait)
+            waited += wait
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Retorna el rate limiter compartido del proceso.
+    
+    La cuota de Gemini es por API key, por lo que todas las sesiones de
+    Streamlit del mismo proceso comparten el mismo limitador.
+    
+    Returns:
+        Instancia única de RateLimiter
+    """
+    global _rate_limiter
+    
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+        return _rate_limiter
+
+
+def configure_rate_limiter(requests_per_minute: int, tokens_per_minute: int) -> RateLimiter:
+    """
+    Reemplaza el rate limiter del proceso con otros límites.
+    
+    Útil cuando varios procesos comparten la misma API key: cada uno
+    debe quedarse con una fracción de la cuota.
+    
+    Args:
+        requests_per_minute: Máximo de llamadas a la API por minuto
+        tokens_per_minute: Máximo de tokens estimados por minuto
+        
+    Returns:
+        Nuevo RateLimiter compartido
+    """
+    global _rate_limiter
+    
+    with _rate_limiter_lock:
+        _rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        return _rate_limiter
@@ -0,0 +1,101 @@
+"""
+CATEGORIZATION_SCHEMA en el formato de response_schema de Gemini.
+
+Con NATIVE_RESPONSE_SCHEMA el modelo queda restringido al schema (enums,
+tipos, campos requeridos), por lo que el prompt ya no necesita repetir
+las listas de valores permitidos. Gemini acepta un subconjunto de OpenAPI:
+los tipos unión con null pasan a "nullable" y "maxItems" a "max_items".
+"""
+
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Iterable
+
+from src.core.config.schema import CATEGORIZATION_SCHEMA
+
+
+TRANSCRIPT_ID_FIELD = "transcripcion_id"
+CONFIDENCE_FIELD = "confianza"
+
+_SUPPORTED_KEYS = {"description", "enum", "required"}
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte un JSON Schema al subconjunto que acepta Gemini.
+    
+    Args:
+        schema: JSON Schema (objeto, array o escalar)
+        
+    Returns:
+        Dict utilizable como response_schema
+    """
+    converted = {key: value for key, value in schema.items() if key in _SUPPORTED_KEYS}
+    
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        types = [t for t in schema_type if t != "null"]
+        converted["nullable"] = len(types) < len(schema_type)
+        schema_type = types[0]
+    converted["type"] = schema_type
+    
+    if "maxItems" in schema:
+        converted["max_items"] = schema["maxItems"]
+    if "items" in schema:
+        converted["items"] = to_gemini_schema(schema["items"])
+    if "properties" in schema:
+        converted["properties"] = {
+            field: to_gemini_schema(spec) for field, spec in schema["properties"].items()
+        }
+    
+    return converted
+
+
+def get_response_schema(
+    skip_fields: Iterable[str] = (),
+    batch: bool = False,
+    with_confidence: bool = False
+) -> Dict[str, Any]:
+    """
+    Retorna el response_schema de una llamada de categorización.
+    
+    Args:
+        skip_fields: Campos resueltos localmente que el modelo no debe generar
+        batch: Si True, retorna un array de objetos con "transcripcion_id"
+        with_confidence: Si True, cada objeto incluye "confianza" (0-1),
+            que usa la cascada de modelos para decidir si escalar
+            
+    Returns:
+        Dict utilizable como response_schema (compartido, no modificar)
+    """
+    return _build_response_schema(frozenset(skip_fields), batch, with_confidence)
+
+
+@lru_cache(maxsize=None)
+def _build_response_schema(skip_fields: FrozenSet[str], batch: bool, with_confidence: bool) -> Dict[str, Any]:
+    """Construye el schema una sola vez por combinación de campos omitidos."""
+    item = to_gemini_schema(CATEGORIZATION_SCHEMA)
+    item["properties"] = {
+        field: spec for field, spec in item["properties"].items() if field not in skip_fields
+    }
+    item["required"] = [field for field in item["required"] if field not in skip_fields]
+    
+    if with_confidence:
+        item["properties"][CONFIDENCE_FIELD] = {
+            "type": "number",
+            "description": "Seguridad de 0 a 1 sobre esta categorización"
+        }
+        item["required"].append(CONFIDENCE_FIELD)
+    
+    if not batch:
+        return item
+    
+    item["properties"] = {
+        TRANSCRIPT_ID_FIELD: {
+            "type": "integer",
+            "description": "Número de la TRANSCRIPCIÓN # que analiza este objeto"
+        },
+        **item["properties"],
+    }
+    item["required"] = [TRANSCRIPT_ID_FIELD, *item["required"]]
+    
+    return {"type": "array", "items": item}
@@ -7,8 +7,14 @@ from typing import Dict, Any
 import streamlit as st
 
 from .client import call_gemini_api
+from .compaction import compact_transcripts
+from .local_extractor import get_prompt_hints
+from .persistent_cache import build_cache_key, get_cached_categorizations, store_categorizations
 from .prompts import build_single_categorization_prompt
-from .defaults import get_default_categorization, CACHE_TTL
+from .response_schema import get_response_schema
+from .validation import is_valid_categorization
+from .versioning import mark_categorized
+from .defaults import get_default_categorization, CACHE_TTL, NATIVE_RESPONSE_SCHEMA
 
 
 @st.cache_data(ttl=CACHE_TTL, show_spinner=False)
@@ -16,7 +22,10 @@ def categorize_single_transcript(transcript: str, client_name: str = "") -> Dict
     """
     Categoriza una transcripción usando Gemini con structured output (JSON Schema).
     
-    Los resultados se cachean automáticamente para evitar llamadas repetidas.
+    Los resultados se cachean automáticamente para evitar llamadas repetidas:
+    en memoria (st.cache_data) y en el caché persistente de SQLite. Una
+    respuesta que no cumple el schema retorna la categorización por
+    defecto y no se guarda en el caché persistente.
     
     Args:
         transcript: Texto de la transcripción a categorizar
@@ -29,10 +38,28 @@ def categorize_single_transcript(transcript: str, client_name: str = "") -> Dict
         Esta función es principalmente para uso individual. Para procesar múltiples
         transcripciones, usar batch_categorize_transcripts() que es más eficiente.
     """
+    cache_key = build_cache_key(transcript, client_name)
+    cached = get_cached_categorizations([cache_key])[0]
+    if cached is not None:
+        return cached
+    
     try:
-        prompt = build_single_categorization_prompt(transcript, client_name)
-        result = call_gemini_api(prompt)
-        result["_categorization_success"] = True
+        hints = get_prompt_hints(transcript)
+        prompt = build_single_categorization_prompt(
+            compact_transcripts([transcript])[0], client_name, hints, NATIVE_RESPONSE_SCHEMA
+        )
+        result = call_gemini_api(
+            prompt,
+            response_schema=get_response_schema(hints) if NATIVE_RESPONSE_SCHEMA else None
+        )
+        result.update(hints)
+        # Igual que en batch: una respuesta fuera del schema no se marca ni se cachea
+        if not is_valid_categorization(result):
+            st.warning(f"⚠️ La categorización de {client_name} no cumple el schema")
+            return get_default_categorization()
+        
+        mark_categorized(result)
+        store_categorizations([(cache_key, result)])
         return result
     
     except Exception as e:
@@ -0,0 +1,35 @@
+"""
+Estimación aproximada de tokens sin llamar a la API.
+"""
+
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_PER_ITEM = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima la cantidad de tokens de un texto (~4 caracteres por token).
+    
+    Args:
+        text: Texto a estimar
+        
+    Returns:
+        Número aproximado de tokens
+    """
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_call_tokens(prompt: str, expected_items: int = 1) -> int:
+    """
+    Estima los tokens totales de una llamada (prompt + respuesta JSON).
+    
+    Args:
+        prompt: Prompt que se enviará
+        expected_items: Cantidad de objetos JSON esperados en la respuesta
+        
+    Returns:
+        Número aproximado de tokens consumidos por la llamada
+    """
+    return estimate_tokens(prompt) + expected_items * OUTPUT_TOKENS_PER_ITEM
@@ -0,0 +1,43 @@
+"""
+Validación de categorizaciones contra CATEGORIZATION_SCHEMA.
+"""
+
+from typing import Any
+
+from src.core.config.schema import CATEGORIZATION_SCHEMA
+
+
+# Las reglas se derivan del schema una sola vez al importar el módulo
+_PROPERTIES = CATEGORIZATION_SCHEMA["properties"]
+_REQUIRED_FIELDS = frozenset(CATEGORIZATION_SCHEMA["required"])
+_ENUM_FIELDS = tuple(
+    (field, frozenset(spec["enum"]))
+    for field, spec in _PROPERTIES.items()
+    if "enum" in spec
+)
+_ARRAY_FIELDS = tuple(field for field, spec in _PROPERTIES.items() if spec.get("type") == "array")
+
+
+def is_valid_categorization(result: Any) -> bool:
+    """
+    Verifica que un objeto devuelto por Gemini cumpla el schema mínimo.
+    
+    Revisa campos requeridos, valores enumerados y que los arrays sean listas.
+    
+    Args:
+        result: Objeto parseado de la respuesta
+        
+    Returns:
+        True si el objeto es utilizable como categorización
+    """
+    if not isinstance(result, dict):
+        return False
+    
+    if not _REQUIRED_FIELDS.issubset(result.keys()):
+        return False
+    
+    for field, allowed in _ENUM_FIELDS:
+        if result.get(field) not in allowed:
+            return False
+    
+    return all(isinstance(result.get(field), list) for field in _ARRAY_FIELDS)
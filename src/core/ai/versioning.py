@@ -0,0 +1,122 @@
+"""
+Versión de categorización: hash de instrucciones, schema, modelo y
+configuración de pre-extracción y compactación.
+
+Cada categorización exitosa lleva en "_categorization_version" la versión
+del modelo que la produjo (con la cascada, el económico o el fuerte) y se
+guarda en clients.categorization_version. Al editar
+get_categorization_instructions(), CATEGORIZATION_SCHEMA, el modelo o esa
+configuración, la versión cambia: el caché persistente y el índice de
+casi-duplicados dejan de reutilizar resultados anteriores, y las filas
+guardadas quedan desactualizadas para la re-categorización incremental.
+Sin CASCADE_ENABLED los resultados del modelo económico tampoco son
+vigentes.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+from src.core.config.schema import CATEGORIZATION_SCHEMA
+from .config import get_gemini_fast_model_name, get_gemini_model_name
+from .prompts import get_categorization_instructions
+from .defaults import (
+    BOILERPLATE_MAX_WORDS,
+    BOILERPLATE_MIN_DOCUMENTS,
+    BOILERPLATE_MIN_RATIO,
+    CASCADE_ENABLED,
+    COMPACTION_CONTEXT_SENTENCES,
+    COMPACTION_CUES_ONLY,
+    COMPACTION_ENABLED,
+    COMPACTION_LEAD_SENTENCES,
+    NATIVE_RESPONSE_SCHEMA,
+    PRE_EXTRACTION_ENABLED,
+    PRE_EXTRACTION_MIN_CONFIDENCE
+)
+
+
+VERSION_FIELD = "_categorization_version"
+
+
+def get_categorization_version(model_name: Optional[str] = None) -> str:
+    """
+    Retorna la versión de categorización de un modelo en el proceso.
+    
+    Args:
+        model_name: Modelo que produce la categorización (None: GEMINI_MODEL)
+        
+    Returns:
+        Hash SHA-256 hexadecimal (16 caracteres) de las instrucciones, el
+        schema, el modelo y la configuración de pre-extracción y compactación
+    """
+    return _hash_version(model_name or get_gemini_model_name())
+
+
+def get_current_versions() -> Tuple[str, ...]:
+    """
+    Retorna las versiones cuyos resultados se consideran vigentes.
+    
+    Con CASCADE_ENABLED también valen los resultados del modelo económico;
+    sin cascada, solo los de GEMINI_MODEL.
+    
+    Returns:
+        Tupla de versiones, la de GEMINI_MODEL primero
+    """
+    versions = [get_categorization_version()]
+    if CASCADE_ENABLED:
+        fast_version = get_categorization_version(get_gemini_fast_model_name())
+        if fast_version not in versions:
+            versions.append(fast_version)
+    return tuple(versions)
+
+
+def mark_categorized(result: Dict[str, Any], model_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Marca una categorización como exitosa y con la versión del modelo que la produjo (in-place).
+    
+    Args:
+        result: Categorización validada
+        model_name: Modelo que la produjo (None: GEMINI_MODEL)
+        
+    Returns:
+        El mismo diccionario
+    """
+    result["_categorization_success"] = True
+    result[VERSION_FIELD] = get_categorization_version(model_name)
+    return result
+
+
+def is_current_version(result: Dict[str, Any]) -> bool:
+    """
+    Verifica si una categorización se produjo con una versión vigente.
+    
+    Args:
+        result: Categorización guardada (checkpoint, índice, ...)
+        
+    Returns:
+        True si su versión está en get_current_versions()
+    """
+    return result.get(VERSION_FIELD) in get_current_versions()
+
+
+@lru_cache(maxsize=4)
+def _hash_version(model_name: str) -> str:
+    """Calcula la versión para un modelo (ver get_categorization_version)."""
+    payload = json.dumps(
+        [
+            get_categorization_instructions(native_schema=NATIVE_RESPONSE_SCHEMA),
+            CATEGORIZATION_SCHEMA,
+            model_name,
+            # Cambian los campos que el modelo no genera y el texto que recibe
+            [PRE_EXTRACTION_ENABLED, PRE_EXTRACTION_MIN_CONFIDENCE],
+            [
+                COMPACTION_ENABLED, COMPACTION_CUES_ONLY, COMPACTION_LEAD_SENTENCES,
+                COMPACTION_CONTEXT_SENTENCES, BOILERPLATE_MIN_DOCUMENTS, BOILERPLATE_MIN_RATIO,
+                BOILERPLATE_MAX_WORDS
+            ],
+        ],
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,126 @@
+"""
+Worker de categorización que consume la cola de SQLite.
+
+Corre fuera del proceso de Streamlit (ver worker.py en la raíz). Reclama
+grupos de transcripciones de la cola, los categoriza con el pipeline de
+batches (caché, rate limiter, concurrencia) y guarda los resultados como
+checkpoint del trabajo, de donde los lee la UI.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from src.core.database.jobs import save_job_checkpoint
+from src.core.database.work_queue import (
+    claim_items,
+    complete_items,
+    extend_leases,
+    register_worker_heartbeat,
+    unregister_worker
+)
+from src.core.database.config import QUEUE_POLL_INTERVAL, WORKER_HEARTBEAT_TIMEOUT
+from .batch import batch_categorize_with_progress
+from .defaults import MAX_CONCURRENT_BATCHES
+
+
+def process_next_claim(worker_id: str, claim_size: int, max_workers: int = MAX_CONCURRENT_BATCHES) -> int:
+    """
+    Reclama un grupo de la cola y lo categoriza.
+    
+    Args:
+        worker_id: Identificador del worker
+        claim_size: Cantidad máxima de transcripciones a reclamar
+        max_workers: Batches en paralelo dentro de este worker
+        
+    Returns:
+        Cantidad de transcripciones procesadas (0 si la cola estaba vacía)
+    """
+    job_id, items = claim_items(worker_id, claim_size)
+    if not items:
+        return 0
+    
+    indices = [index for index, _, _ in items]
+    results = batch_categorize_with_progress(
+        [transcript for _, _, transcript in items],
+        [name or "" for _, name, _ in items],
+        max_workers=max_workers
+    )
+    
+    save_job_checkpoint(job_id, list(zip(indices, results)))
+    closed = complete_items(
+        job_id,
+        worker_id,
+        succeeded=[index for index, result in zip(indices, results) if result.get("_categorization_success")],
+        failed=[index for index, result in zip(indices, results) if not result.get("_categorization_success")]
+    )
+    if closed < len(items):
+        print(
+            f"⚠️ [{worker_id}] {len(items) - closed} items ya no estaban a nombre de este worker "
+            "(cancelados o reclamados por otro)"
+        )
+    
+    return len(items)
+
+
+def run_worker(
+    worker_id: str,
+    claim_size: int,
+    max_workers: int = MAX_CONCURRENT_BATCHES,
+    poll_interval: float = QUEUE_POLL_INTERVAL,
+    exit_when_idle: bool = False,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> int:
+    """
+    Procesa la cola hasta que se detenga el worker.
+    
+    Args:
+        worker_id: Identificador del worker
+        claim_size: Transcripciones por reclamo
+        max_workers: Batches en paralelo dentro de este worker
+        poll_interval: Segundos de espera cuando la cola está vacía
+        exit_when_idle: Si True, termina en cuanto la cola queda vacía
+        should_stop: Función opcional que indica si hay que terminar
+        
+    Returns:
+        Total de transcripciones procesadas
+    """
+    total = 0
+    register_worker_heartbeat(worker_id)
+    
+    # Un grupo puede tardar más que WORKER_HEARTBEAT_TIMEOUT o que el lease:
+    # el heartbeat corre aparte para que la UI no dé al worker por muerto
+    # y otro worker no reclame sus items
+    stopped = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(worker_id, stopped), daemon=True)
+    heartbeat.start()
+    
+    try:
+        while not (should_stop and should_stop()):
+            processed = process_next_claim(worker_id, claim_size, max_workers)
+            register_worker_heartbeat(worker_id, processed)
+            total += processed
+            
+            if processed:
+                print(f"✅ [{worker_id}] {processed} transcripciones categorizadas ({total} en total)")
+                continue
+            
+            if exit_when_idle:
+                break
+            time.sleep(poll_interval)
+    finally:
+        stopped.set()
+        heartbeat.join()
+        unregister_worker(worker_id)
+    
+    return total
+
+
+def _heartbeat_loop(worker_id: str, stopped: threading.Event) -> None:
+    """
+    Registra heartbeats periódicos y renueva los leases de los items en
+    proceso hasta que se active `stopped`.
+    """
+    while not stopped.wait(WORKER_HEARTBEAT_TIMEOUT / 3):
+        register_worker_heartbeat(worker_id)
+        extend_leases(worker_id)
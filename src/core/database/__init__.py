@@ -3,10 +3,16 @@ Módulo de base de datos SQLite para persistir categorizaciones.
 Funciona perfecto en deploy (Render/Railway) sin configuración adicional.
 
 Estructura modular:
-- crud.py: Operaciones básicas (save, load, append, delete)
-- duplicates.py: Verificación de duplicados
+- crud.py: Operaciones básicas (save, load, append, update por id, delete)
+- duplicates.py: Verificación de duplicados (índice único de la clave natural)
 - serialization.py: Conversión DataFrame ↔ DB records
 - schema.py: Definición de tablas
+- jobs.py: Trabajos de categorización reanudables (checkpoint por batch)
+- work_queue.py: Cola de categorización para workers fuera de proceso
+- child_tables.py: Tablas hijas de preocupaciones y upsell (derivadas del JSON)
+- aggregates.py: Agregados de preocupaciones y upsell en SQL
+- analytics_queries.py: Agregados del dashboard con los filtros del sidebar en SQL
+- fingerprints.py: Índice MinHash/LSH de transcripciones categorizadas (casi-duplicados)
 - utils.py: Funciones auxiliares
 - config.py: Configuración y rutas
 """
@@ -16,9 +22,35 @@ from .crud import (
     save_processed_data,
     load_processed_data,
     append_processed_data,
+    load_failed_categorizations,
+    count_failed_categorizations,
+    load_stale_categorizations,
+    count_stale_categorizations,
+    update_categorizations,
     delete_database
 )
 from .duplicates import check_duplicates
+from .jobs import (
+    start_categorization_job,
+    finish_categorization_job,
+    list_categorization_jobs,
+    load_job_checkpoint
+)
+from .work_queue import (
+    enqueue_items,
+    get_queue_counts,
+    cancel_job_items,
+    count_active_workers
+)
+from .fingerprints import count_fingerprints
+from .aggregates import load_concern_aggregates, count_upsell_addons
+from .analytics_queries import (
+    build_filter_clause,
+    query_close_rate,
+    query_monthly_stats,
+    query_group_stats,
+    query_heatmap_stats
+)
 from .utils import db_exists_and_has_data
 from .config import DB_PATH
 
@@ -27,8 +59,29 @@ __all__ = [
     "save_processed_data",
     "load_processed_data",
     "append_processed_data",
+    "load_failed_categorizations",
+    "count_failed_categorizations",
+    "load_stale_categorizations",
+    "count_stale_categorizations",
+    "update_categorizations",
     "delete_database",
     "check_duplicates",
+    "start_categorization_job",
+    "finish_categorization_job",
+    "list_categorization_jobs",
+    "load_job_checkpoint",
+    "enqueue_items",
+    "get_queue_counts",
+    "cancel_job_items",
+    "count_active_workers",
+    "count_fingerprints",
+    "load_concern_aggregates",
+    "count_upsell_addons",
+    "build_filter_clause",
+    "query_close_rate",
+    "query_monthly_stats",
+    "query_group_stats",
+    "query_heatmap_stats",
     "db_exists_and_has_data",
     "DB_PATH"
 ]
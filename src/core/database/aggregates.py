@@ -0,0 +1,99 @@
+"""
+Agregados de preocupaciones y upsell calculados en SQLite.
+
+Las métricas reciben el DataFrame ya filtrado por el sidebar; sus
+client_id se cargan en una tabla temporal y los GROUP BY corren sobre
+client_concerns / client_upsell sin decodificar el JSON de cada fila.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import pandas as pd
+
+from .connection import transaction
+from .schema import init_database
+
+
+@contextmanager
+def _selected_clients(client_ids: List[int]) -> Iterator[sqlite3.Connection]:
+    """
+    Abre una transacción de lectura con los ids en temp.selected_clients.
+    
+    Args:
+        client_ids: Ids de clients a considerar
+        
+    Yields:
+        Conexión con la tabla temporal cargada
+    """
+    init_database()
+    
+    # La conexión se reutiliza, así que la tabla temporal se elimina al terminar
+    with transaction(deferred=True) as conn:
+        conn.execute("CREATE TEMP TABLE selected_clients (id INTEGER PRIMARY KEY)")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO selected_clients (id) VALUES (?)",
+                [(int(client_id),) for client_id in client_ids]
+            )
+            yield conn
+        finally:
+            conn.execute("DROP TABLE temp.selected_clients")
+
+
+def load_concern_aggregates(client_ids: List[int]) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula las estadísticas de cierre por tipo de preocupación.
+    
+    Args:
+        client_ids: Ids de clients a considerar (DataFrame filtrado)
+        
+    Returns:
+        Dict con:
+        - stats: DataFrame (tipo, total, no_closed_count, close_rate) con
+          una fila por tipo
+        - mentions: DataFrame (tipo, closed, nombre) con una fila por
+          preocupación mencionada, en el orden de los leads
+    """
+    with _selected_clients(client_ids) as conn:
+        stats = pd.read_sql_query("""
+            SELECT cc.tipo,
+                   COUNT(*) AS total,
+                   SUM(c.closed = 0) AS no_closed_count,
+                   AVG(c.closed) AS close_rate
+            FROM client_concerns cc
+            JOIN selected_clients s ON s.id = cc.client_id
+            JOIN clients c ON c.id = cc.client_id
+            GROUP BY cc.tipo
+        """, conn)
+        mentions = pd.read_sql_query("""
+            SELECT cc.tipo, c.closed, c.client_name AS nombre
+            FROM client_concerns cc
+            JOIN selected_clients s ON s.id = cc.client_id
+            JOIN clients c ON c.id = cc.client_id
+            ORDER BY cc.client_id, cc.rank
+        """, conn)
+    
+    return {"stats": stats, "mentions": mentions}
+
+
+def count_upsell_addons(client_ids: List[int]) -> Dict[str, int]:
+    """
+    Cuenta las menciones de cada add-on de upsell.
+    
+    Args:
+        client_ids: Ids de clients a considerar (DataFrame filtrado)
+        
+    Returns:
+        Dict {add-on: cantidad de menciones}
+    """
+    with _selected_clients(client_ids) as conn:
+        rows = conn.execute("""
+            SELECT u.addon, COUNT(*)
+            FROM client_upsell u
+            JOIN selected_clients s ON s.id = u.client_id
+            GROUP BY u.addon
+        """).fetchall()
+    
+    return dict(rows)
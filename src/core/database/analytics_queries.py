@@ -0,0 +1,169 @@
+"""
+Agregados del dashboard calculados en SQLite con los filtros del sidebar.
+
+build_filter_clause traduce el dict de render_sidebar a un WHERE
+parametrizado con la misma semántica que filter_dataframe; las consultas
+agrupan en SQLite y retornan DataFrames chicos (una fila por vendedor,
+fuente, mes o celda del heatmap) con las columnas que ya usan los
+gráficos. El índice idx_clients_filters cubre los filtros y `closed`,
+así los GROUP BY sin búsqueda de texto no leen las transcripciones.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from .connection import get_connection
+from .schema import init_database
+
+
+# Filtros de lista: clave del dict de render_sidebar → columna de clients
+_LIST_FILTERS = {
+    "vendedores": "vendedor_asignado",
+    "sectores": "sector_principal",
+    "fuentes": "fuente_primaria",
+    "volumenes": "volumen_nivel",
+    "urgencias": "urgencia_nivel",
+}
+
+# Equivalente a la columna preocupaciones_texto (build_preocupaciones_texto)
+_CONCERNS_TEXT = """
+    (SELECT group_concat(tipo || ' ' || COALESCE(ejemplo_frase, ''), ' ')
+     FROM (SELECT tipo, ejemplo_frase FROM client_concerns
+           WHERE client_id = clients.id ORDER BY rank))
+"""
+
+
+def build_filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    Convierte los filtros del sidebar en condiciones SQL sobre clients.
+    
+    Args:
+        filters: Dict de render_sidebar (vendedores, fecha_inicio, fecha_fin,
+            sectores, fuentes, volumenes, urgencias, search_text); None o
+            valores vacíos no filtran
+            
+    Returns:
+        Tupla (condiciones unidas con AND, parámetros); "1" si no hay filtros
+    """
+    filters = filters or {}
+    conditions = []
+    params: List[Any] = []
+    
+    for key, column in _LIST_FILTERS.items():
+        values = filters.get(key)
+        if values:
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    
+    # fecha_reunion se guarda como str(Timestamp), que se ordena como texto
+    if filters.get("fecha_inicio") and filters.get("fecha_fin"):
+        conditions.append("fecha_reunion >= ? AND fecha_reunion <= ?")
+        params.extend([str(pd.Timestamp(filters["fecha_inicio"])), str(pd.Timestamp(filters["fecha_fin"]))])
+    
+    search_text = filters.get("search_text")
+    if search_text:
+        conditions.append(
+            "(instr(lower_unicode(transcript), ?) > 0"
+            " OR instr(lower_unicode(client_name), ?) > 0"
+            f" OR instr(lower_unicode({_CONCERNS_TEXT}), ?) > 0)"
+        )
+        params.extend([search_text.lower()] * 3)
+    
+    return " AND ".join(conditions) or "1", params
+
+
+def _query(sql: str, filters: Optional[Dict[str, Any]], extra_condition: str = "1") -> pd.DataFrame:
+    """Ejecuta un SELECT sobre clients con los filtros en {where}."""
+    init_database()
+    
+    where, params = build_filter_clause(filters)
+    return pd.read_sql_query(sql.format(where=f"{where} AND {extra_condition}"), get_connection(), params=params)
+
+
+def query_close_rate(filters: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Calcula la tasa de cierre de los leads filtrados.
+    
+    Args:
+        filters: Filtros del sidebar
+        
+    Returns:
+        Promedio de closed (NaN si no hay leads)
+    """
+    init_database()
+    
+    where, params = build_filter_clause(filters)
+    close_rate = get_connection().execute(f"SELECT AVG(closed) FROM clients WHERE {where}", params).fetchone()[0]
+    return float("nan") if close_rate is None else close_rate
+
+
+def query_monthly_stats(filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Agrupa los leads filtrados por mes de reunión.
+    
+    Args:
+        filters: Filtros del sidebar
+        
+    Returns:
+        DataFrame (year_month como pd.Period, closed_sum, total) ordenado por mes
+    """
+    df = _query("""
+        SELECT substr(fecha_reunion, 1, 7) AS year_month,
+               SUM(closed) AS closed_sum,
+               COUNT(*) AS total
+        FROM clients
+        WHERE {where}
+        GROUP BY year_month
+        ORDER BY year_month
+    """, filters, extra_condition="fecha_reunion GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*'")
+    
+    df["year_month"] = pd.PeriodIndex(df["year_month"], freq="M")
+    return df
+
+
+def query_group_stats(column: str, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Agrupa los leads filtrados por una columna de clients.
+    
+    Las filas con la columna en NULL se excluyen, igual que en groupby.
+    
+    Args:
+        column: Columna de agrupación (vendedor_asignado, fuente_primaria, ...)
+        filters: Filtros del sidebar
+        
+    Returns:
+        DataFrame (column, closed_count, total, close_rate) ordenado por column
+    """
+    return _query(f"""
+        SELECT {column},
+               SUM(closed) AS closed_count,
+               COUNT(*) AS total,
+               AVG(closed) AS close_rate
+        FROM clients
+        WHERE {{where}}
+        GROUP BY {column}
+        ORDER BY {column}
+    """, filters, extra_condition=f"{column} IS NOT NULL")
+
+
+def query_heatmap_stats(filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Agrupa los leads filtrados por sector principal y nivel de volumen.
+    
+    Args:
+        filters: Filtros del sidebar
+        
+    Returns:
+        DataFrame (sector_principal, volumen_nivel, close_rate, count) con
+        una fila por combinación presente
+    """
+    return _query("""
+        SELECT sector_principal, volumen_nivel,
+               AVG(closed) AS close_rate,
+               COUNT(*) AS count
+        FROM clients
+        WHERE {where}
+        GROUP BY sector_principal, volumen_nivel
+        ORDER BY sector_principal, volumen_nivel
+    """, filters, extra_condition="sector_principal IS NOT NULL AND volumen_nivel IS NOT NULL")
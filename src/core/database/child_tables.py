@@ -0,0 +1,69 @@
+"""
+Tablas hijas de clients: preocupaciones y add-ons de upsell normalizados.
+
+clients.preocupaciones y clients.potencial_upsell siguen guardando el
+JSON de cada lead (lo usa la vista de detalle); client_concerns y
+client_upsell tienen una fila por elemento para agregarlos con GROUP BY.
+Se derivan del JSON con json_each dentro de la misma transacción que
+escribe clients, así nunca quedan desalineadas.
+"""
+
+import sqlite3
+from typing import List
+
+
+_INSERT_CONCERNS = """
+    INSERT INTO client_concerns (client_id, tipo, impacto, ejemplo_frase, rank)
+    SELECT c.id,
+           COALESCE(json_extract(j.value, '$.tipo'), 'Otra'),
+           json_extract(j.value, '$.impacto'),
+           json_extract(j.value, '$.ejemplo_frase'),
+           j.key
+    FROM clients c, json_each(c.preocupaciones) j
+    WHERE json_valid(c.preocupaciones) AND j.type = 'object' AND {condition}
+"""
+
+_INSERT_UPSELL = """
+    INSERT INTO client_upsell (client_id, addon)
+    SELECT c.id, j.value
+    FROM clients c, json_each(c.potencial_upsell) j
+    WHERE json_valid(c.potencial_upsell) AND j.type = 'text' AND {condition}
+"""
+
+
+def populate_child_tables(cursor: sqlite3.Cursor, after_id: int = 0) -> None:
+    """
+    Genera las filas hijas de los clients con id mayor a `after_id`.
+    
+    Args:
+        cursor: Cursor con la transacción de escritura abierta
+        after_id: Último id que ya tenía filas hijas (0 para todos)
+    """
+    cursor.execute(_INSERT_CONCERNS.format(condition="c.id > ?"), (after_id,))
+    cursor.execute(_INSERT_UPSELL.format(condition="c.id > ?"), (after_id,))
+
+
+def refresh_child_tables(cursor: sqlite3.Cursor, client_ids: List[int]) -> None:
+    """
+    Regenera las filas hijas de clients cuya categorización cambió.
+    
+    Args:
+        cursor: Cursor con la transacción de escritura abierta
+        client_ids: Ids de las filas actualizadas
+    """
+    params = [(client_id,) for client_id in client_ids]
+    cursor.executemany("DELETE FROM client_concerns WHERE client_id = ?", params)
+    cursor.executemany("DELETE FROM client_upsell WHERE client_id = ?", params)
+    cursor.executemany(_INSERT_CONCERNS.format(condition="c.id = ?"), params)
+    cursor.executemany(_INSERT_UPSELL.format(condition="c.id = ?"), params)
+
+
+def clear_child_tables(cursor: sqlite3.Cursor) -> None:
+    """
+    Vacía las tablas hijas (al reemplazar todos los clients).
+    
+    Args:
+        cursor: Cursor con la transacción de escritura abierta
+    """
+    cursor.execute("DELETE FROM client_concerns")
+    cursor.execute("DELETE FROM client_upsell")
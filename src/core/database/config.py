@@ -6,3 +6,17 @@ from pathlib import Path
 
 
 DB_PATH = Path("data_files/vambe_processed.db")
+CACHE_DB_PATH = Path("data_files/vambe_cache.db")
+RECORDINGS_DB_PATH = Path("data_files/vambe_recordings.db")
+SNAPSHOT_PATH = Path("data_files/vambe_snapshot.arrow")
+
+# Cola de categorización para workers fuera de proceso (worker.py)
+QUEUE_LEASE_SECONDS = 600
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_POLL_INTERVAL = 1.0
+WORKER_HEARTBEAT_TIMEOUT = 30
+
+# Conexiones SQLite compartidas por thread (connection.py)
+SQLITE_BUSY_TIMEOUT = 30
+SQLITE_CACHE_SIZE_KB = 16_000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
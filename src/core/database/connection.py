@@ -0,0 +1,117 @@
+"""
+Conexiones SQLite compartidas por thread.
+
+Antes cada función abría y cerraba su propia conexión en modo rollback
+journal, así un escritor bloqueaba a las demás sesiones de Streamlit.
+get_connection mantiene una conexión por thread y por archivo con:
+- journal_mode=WAL: los lectores no bloquean al escritor ni viceversa
+- synchronous=NORMAL: un fsync por checkpoint en lugar de por commit
+- mmap_size y cache_size: lecturas desde memoria en vez de read()
+
+Las conexiones están en modo autocommit; las escrituras de varias
+sentencias van dentro de transaction(), que por defecto toma el lock de
+escritura al empezar (BEGIN IMMEDIATE): en WAL, una transacción que lee
+y después escribe falla con SQLITE_BUSY si otro proceso escribió en el
+medio, sin esperar el busy_timeout. close_connections() invalida
+todas las conexiones del proceso (por ejemplo, antes de borrar la base).
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+from .config import DB_PATH, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE
+
+
+_local = threading.local()
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def get_connection(path: Path = DB_PATH) -> sqlite3.Connection:
+    """
+    Retorna la conexión del thread actual al archivo indicado.
+    
+    La primera llamada de cada thread la abre y aplica los pragmas; las
+    siguientes la reutilizan.
+    
+    Args:
+        path: Archivo SQLite (por defecto la base principal)
+        
+    Returns:
+        Conexión en modo autocommit (isolation_level=None)
+    """
+    connections: Dict[str, Tuple[int, sqlite3.Connection]] = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    # Las rutas son relativas al directorio de trabajo (DB_PATH), que puede cambiar
+    key = os.path.abspath(path)
+    cached = connections.get(key)
+    if cached is not None:
+        generation, conn = cached
+        if generation == _generation:
+            return conn
+        conn.close()
+    
+    path.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # lower() de SQLite solo convierte ASCII; los filtros de texto usan str.lower
+    conn.create_function("lower_unicode", 1, _lower_unicode, deterministic=True)
+    
+    connections[key] = (_generation, conn)
+    return conn
+
+
+def _lower_unicode(value: Any) -> Any:
+    """Minúsculas con las reglas de Python (acentos, ñ)."""
+    return value.lower() if isinstance(value, str) else value
+
+
+@contextmanager
+def transaction(path: Path = DB_PATH, deferred: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Ejecuta un bloque dentro de una transacción de la conexión del thread.
+    
+    Hace COMMIT al salir del bloque y ROLLBACK si se lanza una excepción.
+    
+    Args:
+        path: Archivo SQLite
+        deferred: Si True no toma el lock de escritura (BEGIN), para
+            bloques que solo leen la base o escriben tablas temporales
+            
+    Yields:
+        Conexión con la transacción abierta
+    """
+    conn = get_connection(path)
+    conn.execute("BEGIN" if deferred else "BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def close_connections() -> None:
+    """
+    Cierra la conexión del thread actual e invalida las de los demás threads.
+    
+    Los otros threads reabren su conexión en el próximo get_connection.
+    """
+    global _generation
+    
+    with _generation_lock:
+        _generation += 1
+    
+    for _, conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
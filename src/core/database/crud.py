@@ -4,19 +4,42 @@ Operaciones CRUD básicas para la base de datos SQLite.
 
 import sqlite3
 import pandas as pd
-from typing import Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 from .config import DB_PATH
+from .connection import close_connections, get_connection, transaction
+from .child_tables import clear_child_tables, populate_child_tables, refresh_child_tables
+from .snapshot import bump_generation, delete_snapshot, get_generation, read_snapshot, write_snapshot
 from .schema import init_database
 from .utils import db_exists_and_has_data
-from .serialization import dataframe_to_records, records_to_dataframe
-from .duplicates import check_duplicates
+from .serialization import (
+    CATEGORY_UPDATE_COLUMNS,
+    categorization_to_values,
+    dataframe_to_records,
+    records_to_dataframe
+)
+
+
+_INSERT_CLIENT = """
+    INSERT INTO clients (
+        client_name, correo_electronico, numero_telefono, fecha_reunion,
+        vendedor_asignado, closed, transcript, sector_principal, sector_secundario,
+        volumen_numerico, volumen_nivel, es_pico_estacional,
+        fuente_primaria, fuente_detalle, preocupaciones,
+        urgencia_nivel, potencial_upsell, categorization_success, categorization_version
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (client_name, correo_electronico, fecha_reunion) DO NOTHING
+"""
+
+# Sin versión (anteriores al versionado o fallidas) o con una no vigente
+_STALE_CONDITION = "(categorization_version IS NULL OR categorization_version NOT IN ({placeholders}))"
 
 
 def save_processed_data(df: pd.DataFrame) -> None:
     """
     Guarda el DataFrame procesado (con categorías) en SQLite.
-    Reemplaza todos los datos existentes.
+    Reemplaza todos los datos existentes. Las filas repetidas dentro del
+    DataFrame (misma clave natural) se guardan una sola vez.
     
     Args:
         df: DataFrame con todas las columnas del CSV + categorías
@@ -25,29 +48,24 @@ def save_processed_data(df: pd.DataFrame) -> None:
     
     records = dataframe_to_records(df)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM clients")
-    
-    cursor.executemany("""
-        INSERT INTO clients (
-            client_name, correo_electronico, numero_telefono, fecha_reunion,
-            vendedor_asignado, closed, transcript, sector_principal, sector_secundario,
-            volumen_numerico, volumen_nivel, es_pico_estacional,
-            fuente_primaria, fuente_detalle, preocupaciones,
-            urgencia_nivel, potencial_upsell, categorization_success
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, records)
+    with transaction() as conn:
+        conn.execute("DELETE FROM clients")
+        clear_child_tables(conn.cursor())
+        rows_added = _insert_clients(conn, records)
+        bump_generation(conn)
     
-    conn.commit()
-    conn.close()
+    duplicates_count = len(records) - rows_added
+    if duplicates_count > 0:
+        print(f"⚠️ Se omitieron {duplicates_count} registros duplicados")
 
 
 def load_processed_data() -> Optional[pd.DataFrame]:
     """
     Carga los datos procesados desde SQLite.
     
+    Lee el snapshot Arrow si corresponde a la generación actual de la
+    base; si no, consulta clients y reescribe el snapshot.
+    
     Returns:
         DataFrame con todos los datos en el formato esperado por la app, o None si no existe la DB
     """
@@ -55,33 +73,55 @@ def load_processed_data() -> Optional[pd.DataFrame]:
         return None
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        
-        df_raw = pd.read_sql_query("""
-            SELECT 
-                client_name, correo_electronico, numero_telefono, fecha_reunion,
-                vendedor_asignado, closed, transcript,
-                sector_principal, sector_secundario,
-                volumen_numerico, volumen_nivel, es_pico_estacional,
-                fuente_primaria, fuente_detalle, preocupaciones,
-                urgencia_nivel, potencial_upsell, categorization_success
-            FROM clients
-            ORDER BY id
-        """, conn)
+        init_database()
         
-        conn.close()
-        
-        return records_to_dataframe(df_raw)
+        # Generación y filas en la misma transacción de lectura
+        with transaction(deferred=True) as conn:
+            generation = get_generation(conn)
+            df = read_snapshot(generation)
+            if df is not None:
+                return df
+            
+            df = _load_from_database(conn)
         
+        write_snapshot(df, generation)
+        return df
+    
     except Exception as e:
         print(f"Error cargando datos desde DB: {e}")
         return None
 
 
+def _load_from_database(conn: sqlite3.Connection) -> pd.DataFrame:
+    """
+    Consulta todas las filas de clients.
+    
+    Args:
+        conn: Conexión a la base principal
+        
+    Returns:
+        DataFrame en el formato esperado por la app
+    """
+    df_raw = pd.read_sql_query("""
+        SELECT 
+            id, client_name, correo_electronico, numero_telefono, fecha_reunion,
+            vendedor_asignado, closed, transcript,
+            sector_principal, sector_secundario,
+            volumen_numerico, volumen_nivel, es_pico_estacional,
+            fuente_primaria, fuente_detalle, preocupaciones,
+            urgencia_nivel, potencial_upsell, categorization_success, categorization_version
+        FROM clients
+        ORDER BY id
+    """, conn)
+    
+    return records_to_dataframe(df_raw)
+
+
 def append_processed_data(df_new: pd.DataFrame) -> int:
     """
     Añade nuevos datos procesados a la base de datos existente.
-    Verifica duplicados basándose en: nombre, correo y fecha de reunión.
+    Omite duplicados basándose en: nombre, correo y fecha de reunión (el
+    índice único de la clave natural resuelve cada fila en el INSERT).
     
     Args:
         df_new: DataFrame con nuevos datos procesados
@@ -91,36 +131,163 @@ def append_processed_data(df_new: pd.DataFrame) -> int:
     """
     init_database()
     
-    df_filtrado, duplicates_count = check_duplicates(df_new)
+    records = dataframe_to_records(df_new)
+    if not records:
+        return 0
+    
+    with transaction() as conn:
+        rows_added = _insert_clients(conn, records)
+    
+    duplicates_count = len(records) - rows_added
+    if duplicates_count > 0:
+        print(f"⚠️ Se omitieron {duplicates_count} registros duplicados")
+    
+    return rows_added
+
+
+def _insert_clients(conn: sqlite3.Connection, records: List[Tuple]) -> int:
+    """
+    Inserta registros en clients omitiendo los que ya existen, con sus
+    filas de client_concerns y client_upsell, e invalida el snapshot si
+    se agregó alguna.
+    
+    Args:
+        conn: Conexión con la transacción abierta
+        records: Tuplas de dataframe_to_records
+        
+    Returns:
+        Número de filas insertadas
+    """
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM clients").fetchone()[0]
+    changes_before = conn.total_changes
+    conn.executemany(_INSERT_CLIENT, records)
+    rows_added = conn.total_changes - changes_before
+    
+    if rows_added > 0:
+        populate_child_tables(conn.cursor(), after_id=last_id)
+        bump_generation(conn)
+    return rows_added
+
+
+def load_failed_categorizations() -> List[Tuple[int, str, str]]:
+    """
+    Carga las filas cuya categorización falló (categorization_success = 0).
     
-    if len(df_filtrado) == 0:
-        if duplicates_count > 0:
-            print(f"⚠️ Se omitieron {duplicates_count} registros duplicados")
+    Returns:
+        Lista de (id, client_name, transcript) ordenada por id
+    """
+    if not db_exists_and_has_data():
+        return []
+    
+    rows = get_connection().execute("""
+        SELECT id, client_name, transcript
+        FROM clients
+        WHERE categorization_success = 0
+        ORDER BY id
+    """).fetchall()
+    
+    return rows
+
+
+def count_failed_categorizations() -> int:
+    """
+    Cuenta las filas con categorización fallida.
+    
+    Returns:
+        Cantidad de filas con categorization_success = 0
+    """
+    if not db_exists_and_has_data():
         return 0
     
-    records = dataframe_to_records(df_filtrado)
+    count = get_connection().execute(
+        "SELECT COUNT(*) FROM clients WHERE categorization_success = 0"
+    ).fetchone()[0]
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    return count
+
+
+def load_stale_categorizations(
+    current_versions: Sequence[str],
+    limit: Optional[int] = None
+) -> List[Tuple[int, str, str]]:
+    """
+    Carga las filas categorizadas con otra versión de instrucciones/schema/modelo.
     
-    cursor.executemany("""
-        INSERT INTO clients (
-            client_name, correo_electronico, numero_telefono, fecha_reunion,
-            vendedor_asignado, closed, transcript, sector_principal, sector_secundario,
-            volumen_numerico, volumen_nivel, es_pico_estacional,
-            fuente_primaria, fuente_detalle, preocupaciones,
-            urgencia_nivel, potencial_upsell, categorization_success
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, records)
+    Las filas sin versión (anteriores al versionado o fallidas) también
+    cuentan como desactualizadas. Se priorizan los leads abiertos y, dentro
+    de cada grupo, las reuniones más recientes.
     
-    rows_added = len(records)
-    conn.commit()
-    conn.close()
+    Args:
+        current_versions: Versiones vigentes (get_current_versions)
+        limit: Máximo de filas a retornar (None para todas)
+        
+    Returns:
+        Lista de (id, client_name, transcript) en orden de prioridad
+    """
+    if not db_exists_and_has_data():
+        return []
     
-    if duplicates_count > 0:
-        print(f"⚠️ Se omitieron {duplicates_count} registros duplicados")
+    rows = get_connection().execute(f"""
+        SELECT id, client_name, transcript
+        FROM clients
+        WHERE {_STALE_CONDITION.format(placeholders=', '.join('?' * len(current_versions)))}
+        ORDER BY closed ASC, fecha_reunion DESC, id
+        LIMIT ?
+    """, (*current_versions, -1 if limit is None else limit)).fetchall()
     
-    return rows_added
+    return rows
+
+
+def count_stale_categorizations(current_versions: Sequence[str]) -> int:
+    """
+    Cuenta las filas categorizadas con otra versión (ver load_stale_categorizations).
+    
+    Args:
+        current_versions: Versiones vigentes
+        
+    Returns:
+        Cantidad de filas desactualizadas
+    """
+    if not db_exists_and_has_data():
+        return 0
+    
+    count = get_connection().execute(
+        "SELECT COUNT(*) FROM clients WHERE "
+        + _STALE_CONDITION.format(placeholders=", ".join("?" * len(current_versions))),
+        tuple(current_versions)
+    ).fetchone()[0]
+    
+    return count
+
+
+def update_categorizations(updates: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Reemplaza la categorización de filas existentes, identificadas por id.
+    
+    Solo cambian las columnas de categorización: los datos del CSV y el
+    orden de las filas se conservan.
+    
+    Args:
+        updates: Lista de (id, categorización)
+        
+    Returns:
+        Número de filas actualizadas
+    """
+    if not updates:
+        return 0
+    
+    assignments = ", ".join(f"{column} = ?" for column in CATEGORY_UPDATE_COLUMNS)
+    
+    with transaction() as conn:
+        cursor = conn.executemany(
+            f"UPDATE clients SET {assignments} WHERE id = ?",
+            [(*categorization_to_values(category), row_id) for row_id, category in updates]
+        )
+        rows_updated = cursor.rowcount
+        refresh_child_tables(cursor, [row_id for row_id, _ in updates])
+        bump_generation(conn)
+    
+    return rows_updated
 
 
 def delete_database() -> bool:
@@ -131,8 +298,11 @@ def delete_database() -> bool:
         True si se eliminó exitosamente
     """
     try:
-        if DB_PATH.exists():
-            DB_PATH.unlink()
+        close_connections()
+        delete_snapshot()
+        for path in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal"), DB_PATH.with_name(DB_PATH.name + "-shm")):
+            if path.exists():
+                path.unlink()
         return True
     except Exception as e:
         print(f"Error eliminando DB: {e}")
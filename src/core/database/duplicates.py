@@ -2,35 +2,72 @@
 Verificación de duplicados en la base de datos.
 """
 
-import sqlite3
 import pandas as pd
-from typing import Tuple, Set
+from typing import List, Tuple, Set
 
-from .config import DB_PATH
+from .connection import transaction
 from .utils import db_exists_and_has_data
 
 
-def get_existing_keys() -> Set[Tuple[str, str, str]]:
+def get_natural_keys(df: pd.DataFrame) -> List[Tuple[str, str, str]]:
     """
-    Obtiene todas las claves únicas (client_name, email, fecha) existentes en la DB.
+    Obtiene la clave natural (client_name, email, fecha) de cada fila.
     
+    Args:
+        df: DataFrame con columnas del CSV (o client_name)
+        
     Returns:
-        Set de tuplas (client_name, correo_electronico, fecha_reunion)
+        Lista de tuplas en el orden de las filas, con los valores tal como
+        los guarda dataframe_to_records
     """
-    if not db_exists_and_has_data():
-        return set()
+    empty = pd.Series("", index=df.index)
+    names = df["Nombre"] if "Nombre" in df.columns else df.get("client_name", empty)
+    emails = df.get("Correo Electronico", empty)
+    # str() de cada valor (no astype) para conservar el formato de Timestamp guardado
+    fechas = [str(fecha) for fecha in df.get("Fecha de la Reunion", empty)]
+    
+    return list(zip(names.tolist(), emails.tolist(), fechas))
+
+
+def find_existing_keys(keys: List[Tuple[str, str, str]]) -> Set[int]:
+    """
+    Busca qué claves naturales ya existen en la DB.
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    Las claves se cargan en una tabla temporal y se resuelven con un solo
+    JOIN contra el índice único de clients, sin leer la tabla completa.
     
-    cursor.execute("""
-        SELECT client_name, correo_electronico, fecha_reunion
-        FROM clients
-    """)
-    existing_records = set(cursor.fetchall())
-    conn.close()
+    Args:
+        keys: Lista de tuplas (client_name, correo_electronico, fecha_reunion)
+        
+    Returns:
+        Set con las posiciones (en keys) de las claves existentes
+    """
+    if not keys or not db_exists_and_has_data():
+        return set()
+    
+    # La conexión se reutiliza, así que la tabla temporal se elimina al terminar
+    with transaction(deferred=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TEMP TABLE upload_keys (
+                position INTEGER, client_name TEXT, correo_electronico TEXT, fecha_reunion TEXT
+            )
+        """)
+        cursor.executemany(
+            "INSERT INTO upload_keys VALUES (?, ?, ?, ?)",
+            [(position, *key) for position, key in enumerate(keys)]
+        )
+        rows = cursor.execute("""
+            SELECT k.position
+            FROM upload_keys k
+            JOIN clients c
+              ON c.client_name = k.client_name
+             AND c.correo_electronico = k.correo_electronico
+             AND c.fecha_reunion = k.fecha_reunion
+        """).fetchall()
+        cursor.execute("DROP TABLE temp.upload_keys")
     
-    return existing_records
+    return {position for (position,) in rows}
 
 
 def check_duplicates(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
@@ -43,20 +80,12 @@ def check_duplicates(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
     Returns:
         Tupla con (df_no_duplicados, cantidad_duplicados)
     """
-    existing_records = get_existing_keys()
+    existing_positions = find_existing_keys(get_natural_keys(df))
     
-    if not existing_records:
+    if not existing_positions:
         return df, 0
     
-    mask = []
-    for _, row in df.iterrows():
-        client_name = row.get('Nombre', row.get('client_name'))
-        correo = row.get('Correo Electronico', '')
-        fecha = str(row.get('Fecha de la Reunion', ''))
-        
-        unique_key = (client_name, correo, fecha)
-        is_duplicate = unique_key in existing_records
-        mask.append(not is_duplicate)
+    mask = [position not in existing_positions for position in range(len(df))]
     
     df_no_duplicados = df[mask].copy()
     duplicados = len(df) - len(df_no_duplicados)
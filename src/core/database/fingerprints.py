@@ -0,0 +1,134 @@
+"""
+Índice MinHash/LSH de transcripciones ya categorizadas.
+
+Cada transcripción categorizada con éxito guarda su firma MinHash y su
+categorización. La firma se divide en bandas; dos transcripciones que
+comparten el bucket de alguna banda son candidatas a casi-duplicado y la
+similitud final se calcula en src.core.ai.near_duplicates. Cada firma
+guarda la versión de categorización de su resultado y las búsquedas solo
+consideran la versión pedida. Vive en la misma base que clients, así
+"Reprocesar todo" también lo vacía.
+"""
+
+import json
+import time
+from typing import Dict, Any, List, Sequence, Tuple
+
+from .config import DB_PATH
+from .connection import get_connection, transaction
+from .schema import init_database
+
+
+def store_fingerprints(entries: List[Tuple[str, bytes, List[int], Dict[str, Any]]], version: str) -> int:
+    """
+    Guarda firmas y categorizaciones en el índice.
+    
+    Las transcripciones ya indexadas (mismo hash normalizado) con otra
+    versión reemplazan su categorización; con la misma versión se ignoran.
+    
+    Args:
+        entries: Lista de tuplas (hash de la transcripción normalizada,
+            firma serializada, bucket por banda, categorización)
+        version: Versión de categorización de los resultados
+        
+    Returns:
+        Cantidad de firmas nuevas
+    """
+    if not entries:
+        return 0
+    
+    init_database()
+    
+    now = time.time()
+    added = 0
+    
+    with transaction() as conn:
+        cursor = conn.cursor()
+        for transcript_hash, signature, buckets, result in entries:
+            serialized = json.dumps(result, ensure_ascii=False)
+            cursor.execute("""
+                INSERT OR IGNORE INTO transcript_fingerprints (transcript_hash, signature, result, version, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (transcript_hash, signature, serialized, version, now))
+            if cursor.rowcount == 0:
+                # La firma y sus bandas no cambian: solo se actualiza el resultado
+                cursor.execute("""
+                    UPDATE transcript_fingerprints SET result = ?, version = ?, created_at = ?
+                    WHERE transcript_hash = ? AND version IS NOT ?
+                """, (serialized, version, now, transcript_hash, version))
+                continue
+            
+            fingerprint_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO transcript_lsh_bands (band, bucket, fingerprint_id) VALUES (?, ?, ?)",
+                [(band, bucket, fingerprint_id) for band, bucket in enumerate(buckets)]
+            )
+            added += 1
+    
+    return added
+
+
+def find_fingerprint_candidates(
+    queries: List[List[int]],
+    versions: Sequence[str]
+) -> Dict[int, List[Tuple[bytes, Dict[str, Any]]]]:
+    """
+    Busca firmas que comparten al menos un bucket LSH con cada consulta.
+    
+    Args:
+        queries: Bucket por banda de cada transcripción a consultar
+        versions: Versiones de categorización aceptadas
+        
+    Returns:
+        Dict {posición de la consulta: [(firma serializada, categorización), ...]}
+    """
+    if not queries or not DB_PATH.exists():
+        return {}
+    
+    init_database()
+    
+    # Las consultas van a una tabla temporal para resolverlas con un solo JOIN;
+    # la conexión se reutiliza, así que la tabla se elimina al terminar
+    with transaction(deferred=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("CREATE TEMP TABLE lsh_query (position INTEGER, band INTEGER, bucket INTEGER)")
+        cursor.executemany(
+            "INSERT INTO lsh_query (position, band, bucket) VALUES (?, ?, ?)",
+            [
+                (position, band, bucket)
+                for position, buckets in enumerate(queries)
+                for band, bucket in enumerate(buckets)
+            ]
+        )
+        cursor.execute(f"""
+            SELECT DISTINCT q.position, f.id, f.signature, f.result
+            FROM lsh_query q
+            JOIN transcript_lsh_bands b ON b.band = q.band AND b.bucket = q.bucket
+            JOIN transcript_fingerprints f ON f.id = b.fingerprint_id
+            WHERE f.version IN ({', '.join('?' * len(versions))})
+        """, tuple(versions))
+        rows = cursor.fetchall()
+        cursor.execute("DROP TABLE temp.lsh_query")
+    
+    candidates: Dict[int, List[Tuple[bytes, Dict[str, Any]]]] = {}
+    for position, _, signature, result in rows:
+        candidates.setdefault(position, []).append((signature, json.loads(result)))
+    
+    return candidates
+
+
+def count_fingerprints() -> int:
+    """
+    Cuenta las transcripciones indexadas.
+    
+    Returns:
+        Cantidad de firmas en el índice
+    """
+    if not DB_PATH.exists():
+        return 0
+    
+    init_database()
+    
+    count = get_connection().execute("SELECT COUNT(*) FROM transcript_fingerprints").fetchone()[0]
+    
+    return count
@@ -0,0 +1,217 @@
+"""
+Trabajos de categorización reanudables.
+
+Cada carga de transcripciones es un trabajo identificado por el hash de su
+contenido. Los resultados se guardan batch a batch en
+categorization_job_results, así un proceso interrumpido retoma desde el
+último checkpoint al volver a cargar el mismo archivo.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .connection import get_connection, transaction
+from .schema import init_database
+
+
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+_JOB_COLUMNS = (
+    "job_id, status, total_items, completed_items, runs, "
+    "run_started_at, run_start_items, started_at, updated_at, finished_at"
+)
+
+
+def build_job_id(transcripts: List[str], client_names: List[str]) -> str:
+    """
+    Construye el identificador de un trabajo a partir de su contenido.
+    
+    Args:
+        transcripts: Transcripciones del trabajo
+        client_names: Nombres de clientes alineados con transcripts
+        
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = json.dumps([list(transcripts), list(client_names)], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def start_categorization_job(transcripts: List[str], client_names: List[str]) -> Dict[str, Any]:
+    """
+    Crea un trabajo o reanuda el existente con el mismo contenido.
+    
+    Un trabajo interrumpido (running) o fallido conserva sus checkpoints y
+    suma una ejecución. Uno ya completado se reinicia desde cero.
+    
+    Args:
+        transcripts: Transcripciones a categorizar
+        client_names: Nombres de clientes alineados con transcripts
+        
+    Returns:
+        Dict del trabajo (ver get_categorization_job)
+    """
+    init_database()
+    
+    job_id = build_job_id(transcripts, client_names)
+    now = time.time()
+    
+    with transaction() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT status FROM categorization_jobs WHERE job_id = ?", (job_id,))
+        row = cursor.fetchone()
+        
+        if row is None:
+            cursor.execute(f"""
+                INSERT INTO categorization_jobs ({_JOB_COLUMNS})
+                VALUES (?, ?, ?, 0, 1, ?, 0, ?, ?, NULL)
+            """, (job_id, JOB_RUNNING, len(transcripts), now, now, now))
+        elif row[0] == JOB_COMPLETED:
+            cursor.execute("DELETE FROM categorization_job_results WHERE job_id = ?", (job_id,))
+            cursor.execute("""
+                UPDATE categorization_jobs
+                SET status = ?, completed_items = 0, runs = runs + 1, run_started_at = ?,
+                    run_start_items = 0, started_at = ?, updated_at = ?, finished_at = NULL
+                WHERE job_id = ?
+            """, (JOB_RUNNING, now, now, now, job_id))
+        else:
+            cursor.execute("""
+                UPDATE categorization_jobs
+                SET status = ?, runs = runs + 1, run_started_at = ?,
+                    run_start_items = completed_items, updated_at = ?, finished_at = NULL
+                WHERE job_id = ?
+            """, (JOB_RUNNING, now, now, job_id))
+    
+    return get_categorization_job(job_id)
+
+
+def save_job_checkpoint(job_id: str, entries: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """
+    Guarda los resultados exitosos de un batch y actualiza el progreso del trabajo.
+    
+    Los resultados por defecto (categorización fallida) no se guardan, de
+    modo que al reanudar se vuelven a intentar.
+    
+    Args:
+        job_id: Identificador del trabajo
+        entries: Lista de tuplas (índice en el trabajo, resultado)
+    """
+    rows = [
+        (job_id, index, json.dumps(result, ensure_ascii=False))
+        for index, result in entries
+        if result.get("_categorization_success", False)
+    ]
+    
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO categorization_job_results (job_id, item_index, result)
+            VALUES (?, ?, ?)
+        """, rows)
+        conn.execute("""
+            UPDATE categorization_jobs
+            SET completed_items = (
+                    SELECT COUNT(*) FROM categorization_job_results WHERE job_id = ?
+                ),
+                updated_at = ?
+            WHERE job_id = ?
+        """, (job_id, time.time(), job_id))
+
+
+def load_job_checkpoint(job_id: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Carga los resultados guardados de un trabajo.
+    
+    Args:
+        job_id: Identificador del trabajo
+        
+    Returns:
+        Dict {índice en el trabajo: resultado}
+    """
+    init_database()
+    
+    rows = get_connection().execute(
+        "SELECT item_index, result FROM categorization_job_results WHERE job_id = ?",
+        (job_id,)
+    ).fetchall()
+    checkpoint = {index: json.loads(result) for index, result in rows}
+    
+    return checkpoint
+
+
+def finish_categorization_job(job_id: str, success: bool = True) -> None:
+    """
+    Marca el fin de una ejecución del trabajo.
+    
+    Al completarse, los resultados ya están en la tabla clients y se
+    eliminan los checkpoints y los items de la cola. Si falla, se
+    conservan para reanudar.
+    
+    Args:
+        job_id: Identificador del trabajo
+        success: True si los datos quedaron guardados
+    """
+    now = time.time()
+    
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE categorization_jobs
+            SET status = ?, updated_at = ?, finished_at = ?
+            WHERE job_id = ?
+        """, (JOB_COMPLETED if success else JOB_FAILED, now, now, job_id))
+        
+        if success:
+            conn.execute("DELETE FROM categorization_job_results WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM categorization_queue WHERE job_id = ?", (job_id,))
+
+
+def get_categorization_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna el estado de un trabajo.
+    
+    Args:
+        job_id: Identificador del trabajo
+        
+    Returns:
+        Dict con status, total_items, completed_items, runs, started_at,
+        finished_at, elapsed (segundos de la ejecución actual) y throughput
+        (transcripciones por segundo en la ejecución actual), o None
+    """
+    jobs = _query_jobs("WHERE job_id = ?", (job_id,))
+    return jobs[0] if jobs else None
+
+
+def list_categorization_jobs(limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Lista los trabajos más recientes.
+    
+    Args:
+        limit: Cantidad máxima de trabajos
+        
+    Returns:
+        Lista de dicts (ver get_categorization_job), del más reciente al más antiguo
+    """
+    return _query_jobs("ORDER BY updated_at DESC LIMIT ?", (limit,))
+
+
+def _query_jobs(clause: str, params: Tuple) -> List[Dict[str, Any]]:
+    """Ejecuta un SELECT sobre categorization_jobs y calcula las métricas derivadas."""
+    init_database()
+    
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(f"SELECT {_JOB_COLUMNS} FROM categorization_jobs {clause}", params)
+    rows = [dict(row) for row in cursor.fetchall()]
+    
+    for job in rows:
+        end = job["finished_at"] or job["updated_at"]
+        job["elapsed"] = max(0.0, end - job["run_started_at"])
+        processed = job["completed_items"] - job["run_start_items"]
+        job["throughput"] = processed / job["elapsed"] if job["elapsed"] > 0 else 0.0
+    
+    return rows
@@ -3,43 +3,268 @@ Schema y funciones de inicialización de la base de datos.
 """
 
 import sqlite3
+import threading
+import time
+
 from .config import DB_PATH
+from .connection import transaction
+from .child_tables import populate_child_tables
+
+
+_prepared = False
+_prepare_lock = threading.Lock()
+
+# Filas de clients que repiten la clave natural de otra con menor id
+_DUPLICATE_ROWS = """
+    client_name IS NOT NULL
+    AND correo_electronico IS NOT NULL
+    AND fecha_reunion IS NOT NULL
+    AND id NOT IN (
+        SELECT MIN(id) FROM clients
+        GROUP BY client_name, correo_electronico, fecha_reunion
+    )
+"""
 
 
-def init_database() -> None:
+def init_database() -> int:
     """
-    Inicializa la base de datos SQLite con la tabla clients.
-    Crea el directorio data/ si no existe.
+    Inicializa la base de datos SQLite con:
+    - clients y sus tablas hijas de preocupaciones y upsell
+    - las tablas de trabajos de categorización (checkpoints por batch)
+    - la cola que consumen los workers fuera de proceso
+    - el índice MinHash/LSH de transcripciones casi duplicadas
+    
+    Crea el directorio data/ si no existe y agrega las columnas nuevas a
+    bases creadas con versiones anteriores.
+    
+    La clave natural de un lead (client_name, correo_electronico,
+    fecha_reunion) tiene un índice UNIQUE: los INSERT usan ON CONFLICT DO
+    NOTHING y la verificación de duplicados es una búsqueda en el índice.
+    
+    El schema se prepara una vez por proceso; las llamadas siguientes solo
+    verifican que el archivo siga existiendo (delete_database lo borra).
+    
+    Returns:
+        Cantidad de registros duplicados que se movieron a
+        clients_duplicates_backup al crear el índice único (0 si el índice
+        ya existía o si el schema ya estaba preparado)
     """
-    DB_PATH.parent.mkdir(exist_ok=True)
+    global _prepared
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    if _prepared and DB_PATH.exists():
+        return 0
+    
+    with _prepare_lock:
+        if _prepared and DB_PATH.exists():
+            return 0
+        
+        with transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS clients (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client_name TEXT NOT NULL,
+                    correo_electronico TEXT,
+                    numero_telefono TEXT,
+                    fecha_reunion TEXT,
+                    vendedor_asignado TEXT,
+                    closed INTEGER,
+                    transcript TEXT NOT NULL,
+                    sector_principal TEXT,
+                    sector_secundario TEXT,
+                    volumen_numerico INTEGER,
+                    volumen_nivel TEXT,
+                    es_pico_estacional INTEGER,
+                    fuente_primaria TEXT,
+                    fuente_detalle TEXT,
+                    preocupaciones TEXT,
+                    urgencia_nivel TEXT,
+                    potencial_upsell TEXT,
+                    categorization_success INTEGER,
+                    categorization_version TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            _add_missing_column(cursor, "clients", "categorization_version", "TEXT")
+            removed_duplicates = _create_natural_key_index(cursor)
+            # Cubre los filtros del sidebar y closed: los agregados del
+            # dashboard (analytics_queries.py) no leen las transcripciones
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_clients_filters
+                ON clients (
+                    vendedor_asignado, fecha_reunion, sector_principal,
+                    fuente_primaria, volumen_nivel, urgencia_nivel, closed
+                )
+            """)
+            
+            has_child_tables = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'client_concerns'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS client_concerns (
+                    client_id INTEGER NOT NULL,
+                    tipo TEXT NOT NULL,
+                    impacto TEXT,
+                    ejemplo_frase TEXT,
+                    rank INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_concerns_client
+                ON client_concerns (client_id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_concerns_tipo
+                ON client_concerns (tipo, client_id)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS client_upsell (
+                    client_id INTEGER NOT NULL,
+                    addon TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_upsell_client
+                ON client_upsell (client_id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_upsell_addon
+                ON client_upsell (addon, client_id)
+            """)
+            if not has_child_tables:
+                # Bases anteriores a las tablas hijas: se derivan del JSON guardado
+                populate_child_tables(cursor)
+            
+            # Generación de los datos de clients para invalidar el snapshot (snapshot.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dataset_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    generation INTEGER NOT NULL
+                )
+            """)
+            cursor.execute(
+                "INSERT OR IGNORE INTO dataset_state (id, generation) VALUES (1, ?)",
+                (time.time_ns(),)
+            )
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS categorization_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    total_items INTEGER NOT NULL,
+                    completed_items INTEGER NOT NULL DEFAULT 0,
+                    runs INTEGER NOT NULL DEFAULT 1,
+                    run_started_at REAL NOT NULL,
+                    run_start_items INTEGER NOT NULL DEFAULT 0,
+                    started_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS categorization_job_results (
+                    job_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item_index)
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS categorization_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    client_name TEXT,
+                    transcript TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    claimed_at REAL,
+                    UNIQUE (job_id, item_index)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_queue_status
+                ON categorization_queue (status, claimed_at)
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS categorization_workers (
+                    worker_id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    processed_items INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS transcript_fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    transcript_hash TEXT NOT NULL UNIQUE,
+                    signature BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    version TEXT,
+                    created_at REAL NOT NULL
+                )
+            """)
+            _add_missing_column(cursor, "transcript_fingerprints", "version", "TEXT")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS transcript_lsh_bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    fingerprint_id INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_lsh_bucket
+                ON transcript_lsh_bands (band, bucket)
+            """)
+        
+        _prepared = True
+    
+    return removed_duplicates
+
+
+def _add_missing_column(cursor: sqlite3.Cursor, table: str, column: str, column_type: str) -> None:
+    """Agrega una columna a una tabla existente si todavía no la tiene."""
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def _create_natural_key_index(cursor: sqlite3.Cursor) -> int:
+    """
+    Crea el índice UNIQUE de la clave natural de clients.
+    
+    En bases anteriores al índice quita primero las filas repetidas
+    (conserva la de menor id) y las copia a clients_duplicates_backup para
+    poder revisarlas o recuperarlas. Las claves con algún valor NULL no se
+    consideran repetidas, igual que en el índice.
+    
+    Args:
+        cursor: Cursor dentro de la transacción de init_database
+        
+    Returns:
+        Cantidad de filas repetidas que se quitaron de clients
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_clients_natural_key'"
+    ).fetchone()
+    if exists:
+        return 0
+    
+    cursor.execute("CREATE TABLE IF NOT EXISTS clients_duplicates_backup AS SELECT * FROM clients WHERE 0")
+    cursor.execute(f"INSERT INTO clients_duplicates_backup SELECT * FROM clients WHERE {_DUPLICATE_ROWS}")
+    cursor.execute(f"DELETE FROM clients WHERE {_DUPLICATE_ROWS}")
+    removed = cursor.rowcount
+    if removed > 0:
+        print(f"🧹 Se movieron {removed} registros duplicados a clients_duplicates_backup antes de crear el índice único")
     
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS clients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_name TEXT NOT NULL,
-            correo_electronico TEXT,
-            numero_telefono TEXT,
-            fecha_reunion TEXT,
-            vendedor_asignado TEXT,
-            closed INTEGER,
-            transcript TEXT NOT NULL,
-            sector_principal TEXT,
-            sector_secundario TEXT,
-            volumen_numerico INTEGER,
-            volumen_nivel TEXT,
-            es_pico_estacional INTEGER,
-            fuente_primaria TEXT,
-            fuente_detalle TEXT,
-            preocupaciones TEXT,
-            urgencia_nivel TEXT,
-            potencial_upsell TEXT,
-            categorization_success INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+        CREATE UNIQUE INDEX idx_clients_natural_key
+        ON clients (client_name, correo_electronico, fecha_reunion)
     """)
-    
-    conn.commit()
-    conn.close()
+    return removed
@@ -4,11 +4,19 @@ Serialización y deserialización entre DataFrame y registros de base de datos.
 
 import json
 import pandas as pd
-from typing import List, Tuple
+from typing import Dict, Any, List, Tuple
 
 from src.core.utils import build_preocupaciones_texto
 
 
+# Columnas de categorización de clients, en el orden de categorization_to_values
+CATEGORY_UPDATE_COLUMNS = (
+    "sector_principal", "sector_secundario", "volumen_numerico", "volumen_nivel",
+    "es_pico_estacional", "fuente_primaria", "fuente_detalle", "preocupaciones",
+    "urgencia_nivel", "potencial_upsell", "categorization_success", "categorization_version"
+)
+
+
 def dataframe_to_records(df: pd.DataFrame) -> List[Tuple]:
     """
     Convierte un DataFrame en una lista de tuplas para inserción en SQLite.
@@ -42,13 +50,40 @@ def dataframe_to_records(df: pd.DataFrame) -> List[Tuple]:
             preocupaciones_json,
             row.get('urgencia_nivel'),
             potencial_upsell_json,
-            1 if row.get('_categorization_success', True) else 0
+            1 if row.get('_categorization_success', True) else 0,
+            row.get('_categorization_version')
         )
         records.append(record)
     
     return records
 
 
+def categorization_to_values(category: Dict[str, Any]) -> Tuple:
+    """
+    Convierte una categorización en los valores de sus columnas para UPDATE.
+    
+    Args:
+        category: Diccionario con categorías de Gemini
+        
+    Returns:
+        Tupla en el orden de CATEGORY_UPDATE_COLUMNS
+    """
+    return (
+        category.get('sector_principal', 'Otros'),
+        category.get('sector_secundario'),
+        category.get('volumen_numerico'),
+        category.get('volumen_nivel', 'Desconocido'),
+        1 if category.get('es_pico_estacional') else 0,
+        category.get('fuente_primaria', 'Otro'),
+        category.get('fuente_detalle', ''),
+        json.dumps(category.get('preocupaciones', []), ensure_ascii=False),
+        category.get('urgencia_nivel', 'Media'),
+        json.dumps(category.get('potencial_upsell', []), ensure_ascii=False),
+        1 if category.get('_categorization_success', True) else 0,
+        category.get('_categorization_version')
+    )
+
+
 def records_to_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
     """
     Transforma el DataFrame crudo de SQLite al formato esperado por la aplicación.
@@ -60,6 +95,7 @@ def records_to_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
         DataFrame transformado con columnas renombradas y tipos correctos
     """
     df = df_raw.rename(columns={
+        'id': 'client_id',
         'client_name': 'Nombre',
         'correo_electronico': 'Correo Electronico',
         'numero_telefono': 'Numero de Telefono',
@@ -73,7 +109,8 @@ def records_to_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
     df['potencial_upsell'] = df['potencial_upsell'].apply(json.loads)
     df['es_pico_estacional'] = df['es_pico_estacional'].astype(bool)
     df['_categorization_success'] = df['categorization_success'].astype(bool)
-    df = df.drop(columns=['categorization_success'])
+    df['_categorization_version'] = df['categorization_version']
+    df = df.drop(columns=['categorization_success', 'categorization_version'])
     
     df['preocupaciones_texto'] = df['preocupaciones'].apply(build_preocupaciones_texto)
     
@@ -0,0 +1,115 @@
+"""
+Snapshot columnar (Arrow IPC) del dataset procesado.
+
+load_processed_data se ejecuta en cada rerun de Streamlit. En lugar de
+repetir el SELECT completo, el json.loads de cada fila y pd.to_datetime,
+lee un archivo Arrow IPC sin compresión con memory map. El snapshot
+guarda en sus metadatos la generación de la base
+(dataset_state.generation), que cada escritura de clients incrementa en
+su misma transacción. Si no coincide, la carga vuelve a SQLite y
+reescribe el snapshot. El valor inicial de la generación se toma del
+reloj, así un snapshot no se confunde con una base recreada.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from .config import SNAPSHOT_PATH
+
+
+_GENERATION_KEY = b"generation"
+_LIST_COLUMNS = ("preocupaciones", "potencial_upsell")
+
+
+def get_generation(conn: sqlite3.Connection) -> int:
+    """
+    Retorna la generación actual de los datos de clients.
+    
+    Args:
+        conn: Conexión a la base principal
+        
+    Returns:
+        Generación vigente
+    """
+    return conn.execute("SELECT generation FROM dataset_state WHERE id = 1").fetchone()[0]
+
+
+def bump_generation(conn: sqlite3.Connection) -> None:
+    """
+    Invalida el snapshot (llamar dentro de la transacción que escribe clients).
+    
+    Args:
+        conn: Conexión con la transacción de escritura abierta
+    """
+    conn.execute("UPDATE dataset_state SET generation = generation + 1 WHERE id = 1")
+
+
+def read_snapshot(generation: int) -> Optional[pd.DataFrame]:
+    """
+    Lee el snapshot si corresponde a la generación indicada.
+    
+    Args:
+        generation: Generación vigente de la base
+        
+    Returns:
+        DataFrame en el formato de load_processed_data, o None si no hay
+        snapshot o está desactualizado
+    """
+    if not SNAPSHOT_PATH.exists():
+        return None
+    
+    try:
+        with pa.memory_map(str(SNAPSHOT_PATH)) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if metadata.get(_GENERATION_KEY) != str(generation).encode():
+                return None
+            
+            table = reader.read_all()
+            df = table.to_pandas()
+            # to_pandas entrega arrays de numpy; la app espera listas de dicts/strings
+            for column in _LIST_COLUMNS:
+                df[column] = table.column(column).to_pylist()
+            return df
+    except (OSError, pa.ArrowException) as e:
+        print(f"⚠️ Snapshot ilegible, se recarga desde SQLite: {e}")
+        return None
+
+
+def write_snapshot(df: pd.DataFrame, generation: int) -> None:
+    """
+    Escribe el snapshot de forma atómica (archivo temporal + os.replace).
+    Cada thread usa su propio archivo temporal: dos sesiones pueden
+    reconstruirlo a la vez.
+    
+    Si el DataFrame no se puede convertir a Arrow se omite: la próxima
+    carga vuelve a leer SQLite.
+    
+    Args:
+        df: DataFrame de load_processed_data
+        generation: Generación de la base con que se leyó df
+    """
+    temp_path = SNAPSHOT_PATH.with_name(f"{SNAPSHOT_PATH.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _GENERATION_KEY: str(generation).encode(),
+        })
+        with pa.OSFile(str(temp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, SNAPSHOT_PATH)
+    except (OSError, pa.ArrowException) as e:
+        print(f"⚠️ No se pudo escribir el snapshot: {e}")
+
+
+def delete_snapshot() -> None:
+    """Elimina el snapshot (al borrar la base)."""
+    if SNAPSHOT_PATH.exists():
+        SNAPSHOT_PATH.unlink()
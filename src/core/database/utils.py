@@ -2,8 +2,9 @@
 Funciones de utilidad para la base de datos.
 """
 
-import sqlite3
 from .config import DB_PATH
+from .connection import get_connection
+from .schema import init_database
 
 
 def db_exists_and_has_data() -> bool:
@@ -17,11 +18,7 @@ def db_exists_and_has_data() -> bool:
         return False
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM clients")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+        init_database()
+        return get_connection().execute("SELECT EXISTS (SELECT 1 FROM clients)").fetchone()[0] == 1
     except Exception:
         return False
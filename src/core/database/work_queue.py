@@ -0,0 +1,269 @@
+"""
+Cola de categorización en SQLite para workers fuera de proceso.
+
+La UI encola las transcripciones pendientes de un trabajo y los workers
+(worker.py) las reclaman en grupos. Cada reclamo es un lease: si el
+worker muere, los items vuelven a estar disponibles tras
+QUEUE_LEASE_SECONDS; mientras vive, su heartbeat renueva el lease. Los
+resultados se guardan como checkpoint del trabajo (jobs.py), así la UI
+solo necesita consultar el progreso.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import DB_PATH, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, WORKER_HEARTBEAT_TIMEOUT
+from .connection import get_connection, transaction
+from .schema import init_database
+
+
+QUEUE_PENDING = "pending"
+QUEUE_PROCESSING = "processing"
+QUEUE_DONE = "done"
+QUEUE_FAILED = "failed"
+QUEUE_CANCELLED = "cancelled"
+
+
+def enqueue_items(job_id: str, items: List[Tuple[int, str, str]]) -> int:
+    """
+    Encola transcripciones de un trabajo.
+    
+    Los items ya encolados que fallaron o se cancelaron vuelven a quedar
+    pendientes; los que están en proceso o terminados no se tocan.
+    
+    Args:
+        job_id: Identificador del trabajo
+        items: Lista de tuplas (índice en el trabajo, nombre del cliente, transcripción)
+        
+    Returns:
+        Cantidad de items encolados
+    """
+    if not items:
+        return 0
+    
+    init_database()
+    
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO categorization_queue (job_id, item_index, client_name, transcript, status)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (job_id, item_index) DO UPDATE
+            SET status = excluded.status, attempts = 0, worker_id = NULL, claimed_at = NULL
+            WHERE categorization_queue.status IN (?, ?)
+        """, [
+            (job_id, index, name, transcript, QUEUE_PENDING, QUEUE_FAILED, QUEUE_CANCELLED)
+            for index, name, transcript in items
+        ])
+    
+    return len(items)
+
+
+def claim_items(
+    worker_id: str,
+    limit: int,
+    lease_seconds: int = QUEUE_LEASE_SECONDS
+) -> Tuple[Optional[str], List[Tuple[int, str, str]]]:
+    """
+    Reclama hasta `limit` items pendientes de un mismo trabajo.
+    
+    La transacción usa BEGIN IMMEDIATE para que dos workers no puedan
+    reclamar los mismos items. También recupera items cuyo lease venció.
+    
+    Args:
+        worker_id: Identificador del worker
+        limit: Cantidad máxima de items
+        lease_seconds: Segundos tras los cuales un item en proceso se considera abandonado
+        
+    Returns:
+        Tupla (job_id, [(índice, nombre, transcripción), ...]); (None, []) si no hay trabajo
+    """
+    init_database()
+    
+    now = time.time()
+    available = """
+        (status = ? OR (status = ? AND claimed_at < ?)) AND attempts < ?
+    """
+    available_params = (QUEUE_PENDING, QUEUE_PROCESSING, now - lease_seconds, QUEUE_MAX_ATTEMPTS)
+    
+    with transaction() as conn:
+        cursor = conn.cursor()
+        
+        # Leases vencidos sin intentos restantes: se dan por fallidos
+        cursor.execute("""
+            UPDATE categorization_queue SET status = ?
+            WHERE status = ? AND claimed_at < ? AND attempts >= ?
+        """, (QUEUE_FAILED, QUEUE_PROCESSING, now - lease_seconds, QUEUE_MAX_ATTEMPTS))
+        
+        cursor.execute(
+            f"SELECT job_id FROM categorization_queue WHERE {available} ORDER BY id LIMIT 1",
+            available_params
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None, []
+        
+        job_id = row[0]
+        cursor.execute(f"""
+            SELECT id, item_index, client_name, transcript FROM categorization_queue
+            WHERE job_id = ? AND {available}
+            ORDER BY item_index
+            LIMIT ?
+        """, (job_id, *available_params, limit))
+        rows = cursor.fetchall()
+        
+        cursor.executemany("""
+            UPDATE categorization_queue
+            SET status = ?, worker_id = ?, claimed_at = ?, attempts = attempts + 1
+            WHERE id = ?
+        """, [(QUEUE_PROCESSING, worker_id, now, row_id) for row_id, _, _, _ in rows])
+    
+    return job_id, [(index, name, transcript) for _, index, name, transcript in rows]
+
+
+def complete_items(job_id: str, worker_id: str, succeeded: List[int], failed: List[int]) -> int:
+    """
+    Cierra los items procesados por un worker.
+    
+    Solo se cierran los items que siguen en proceso a nombre de
+    `worker_id`: si el lease venció y otro worker los reclamó, o la UI
+    canceló el trabajo, el estado actual no se pisa.
+    
+    Los fallidos vuelven a quedar pendientes hasta agotar QUEUE_MAX_ATTEMPTS.
+    
+    Args:
+        job_id: Identificador del trabajo
+        worker_id: Identificador del worker que los reclamó
+        succeeded: Índices categorizados correctamente
+        failed: Índices que quedaron con la categorización por defecto
+        
+    Returns:
+        Cantidad de items cerrados
+    """
+    with transaction() as conn:
+        changes_before = conn.total_changes
+        conn.executemany("""
+            UPDATE categorization_queue SET status = ?
+            WHERE job_id = ? AND item_index = ? AND status = ? AND worker_id = ?
+        """, [(QUEUE_DONE, job_id, index, QUEUE_PROCESSING, worker_id) for index in succeeded])
+        conn.executemany("""
+            UPDATE categorization_queue
+            SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker_id = NULL, claimed_at = NULL
+            WHERE job_id = ? AND item_index = ? AND status = ? AND worker_id = ?
+        """, [
+            (QUEUE_MAX_ATTEMPTS, QUEUE_FAILED, QUEUE_PENDING, job_id, index, QUEUE_PROCESSING, worker_id)
+            for index in failed
+        ])
+        return conn.total_changes - changes_before
+
+
+def extend_leases(worker_id: str) -> int:
+    """
+    Renueva el lease de los items que un worker tiene en proceso.
+    
+    Se llama desde el heartbeat: un grupo que tarda más que
+    QUEUE_LEASE_SECONDS no vuelve a la cola mientras el worker siga vivo.
+    
+    Args:
+        worker_id: Identificador del worker
+        
+    Returns:
+        Cantidad de items renovados
+    """
+    init_database()
+    
+    cursor = get_connection().execute(
+        "UPDATE categorization_queue SET claimed_at = ? WHERE status = ? AND worker_id = ?",
+        (time.time(), QUEUE_PROCESSING, worker_id)
+    )
+    return cursor.rowcount
+
+
+def cancel_job_items(job_id: str) -> None:
+    """
+    Cancela los items aún no terminados de un trabajo.
+    
+    Args:
+        job_id: Identificador del trabajo
+    """
+    init_database()
+    
+    get_connection().execute(
+        "UPDATE categorization_queue SET status = ? WHERE job_id = ? AND status IN (?, ?)",
+        (QUEUE_CANCELLED, job_id, QUEUE_PENDING, QUEUE_PROCESSING)
+    )
+
+
+def get_queue_counts(job_id: str) -> Dict[str, int]:
+    """
+    Cuenta los items de un trabajo por estado.
+    
+    Args:
+        job_id: Identificador del trabajo
+        
+    Returns:
+        Dict {estado: cantidad} con pending, processing, done, failed y cancelled
+    """
+    init_database()
+    
+    counts = dict(get_connection().execute(
+        "SELECT status, COUNT(*) FROM categorization_queue WHERE job_id = ? GROUP BY status",
+        (job_id,)
+    ).fetchall())
+    
+    return {
+        status: counts.get(status, 0)
+        for status in (QUEUE_PENDING, QUEUE_PROCESSING, QUEUE_DONE, QUEUE_FAILED, QUEUE_CANCELLED)
+    }
+
+
+def register_worker_heartbeat(worker_id: str, processed_items: int = 0) -> None:
+    """
+    Registra que un worker sigue vivo.
+    
+    Args:
+        worker_id: Identificador del worker
+        processed_items: Items procesados desde el último heartbeat
+    """
+    init_database()
+    
+    now = time.time()
+    get_connection().execute("""
+        INSERT INTO categorization_workers (worker_id, started_at, last_seen, processed_items)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (worker_id) DO UPDATE
+        SET last_seen = excluded.last_seen,
+            processed_items = categorization_workers.processed_items + excluded.processed_items
+    """, (worker_id, now, now, processed_items))
+
+
+def unregister_worker(worker_id: str) -> None:
+    """
+    Elimina el registro de un worker que termina de forma ordenada.
+    
+    Args:
+        worker_id: Identificador del worker
+    """
+    get_connection().execute("DELETE FROM categorization_workers WHERE worker_id = ?", (worker_id,))
+
+
+def count_active_workers(max_age: int = WORKER_HEARTBEAT_TIMEOUT) -> int:
+    """
+    Cuenta los workers con heartbeat reciente.
+    
+    Args:
+        max_age: Segundos máximos desde el último heartbeat
+        
+    Returns:
+        Cantidad de workers activos
+    """
+    if not DB_PATH.exists():
+        return 0
+    
+    init_database()
+    
+    count = get_connection().execute(
+        "SELECT COUNT(*) FROM categorization_workers WHERE last_seen >= ?",
+        (time.time() - max_age,)
+    ).fetchone()[0]
+    
+    return count
@@ -5,9 +5,12 @@ Maneja la lógica de carga desde SQLite y la categorización con Gemini AI.
 
 from .api import load_or_process_data, has_data
 from .transformer import expand_categories_to_dataframe
+from .recategorize import retry_failed_categorizations, recategorize_stale_rows
 
 __all__ = [
     "load_or_process_data",
     "has_data",
-    "expand_categories_to_dataframe"
+    "expand_categories_to_dataframe",
+    "retry_failed_categorizations",
+    "recategorize_stale_rows"
 ]
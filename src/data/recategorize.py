@@ -0,0 +1,134 @@
+"""
+Re-categorización selectiva de filas ya guardadas.
+
+En lugar de borrar la base y volver a categorizar todo, toma de SQLite
+solo las filas que lo necesitan, las pasa por el pipeline de batches
+(caché, casi-duplicados, rate limiter, reintentos) y actualiza cada fila
+por id:
+- retry_failed_categorizations: filas con categorización fallida
+- recategorize_stale_rows: filas categorizadas con otra versión de
+  instrucciones/schema/modelo, por prioridad y con un máximo por ejecución
+  
+Lo usan el sidebar y la CLI recategorize.py.
+"""
+
+from typing import Dict, List, Optional, Callable, Tuple
+
+from src.core.ai import batch_categorize_transcripts, get_categorization_version, get_current_versions
+from src.core.ai.defaults import STALE_RECATEGORIZATION_BUDGET
+from src.core.database import (
+    count_stale_categorizations,
+    load_failed_categorizations,
+    load_stale_categorizations,
+    update_categorizations,
+    start_categorization_job,
+    finish_categorization_job
+)
+
+
+def retry_failed_categorizations(
+    progress_callback: Optional[Callable] = None,
+    run_stats: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """
+    Vuelve a categorizar las filas con categorization_success = 0.
+    
+    Las filas que siguen fallando conservan sus valores por defecto. La
+    ejecución es un trabajo reanudable: si se interrumpe, la siguiente
+    retoma desde el último checkpoint. Requiere Gemini configurado
+    (configure_gemini).
+    
+    Args:
+        progress_callback: Función opcional (actual, total) de progreso
+        run_stats: Dict opcional que se completa con el origen de los resultados
+            (ver batch_categorize_transcripts)
+            
+    Returns:
+        Dict con failed (filas seleccionadas), recovered (actualizadas con
+        éxito) y still_failed
+    """
+    rows = load_failed_categorizations()
+    recovered = _recategorize_rows(rows, progress_callback, run_stats)
+    
+    return {"failed": len(rows), "recovered": recovered, "still_failed": len(rows) - recovered}
+
+
+def recategorize_stale_rows(
+    budget: int = STALE_RECATEGORIZATION_BUDGET,
+    progress_callback: Optional[Callable] = None,
+    run_stats: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """
+    Re-categoriza las filas de una versión anterior, hasta `budget` por ejecución.
+    
+    Se procesan primero los leads abiertos y las reuniones más recientes;
+    las filas que fallan conservan su categorización anterior y quedan
+    pendientes para la próxima ejecución. Requiere Gemini configurado.
+    
+    Args:
+        budget: Máximo de filas a enviar en esta ejecución
+        progress_callback: Función opcional (actual, total) de progreso
+        run_stats: Dict opcional que se completa con el origen de los resultados
+        
+    Returns:
+        Dict con version (vigente), stale (desactualizadas al empezar),
+        selected, updated y remaining
+    """
+    version = get_categorization_version()
+    stale = count_stale_categorizations(get_current_versions())
+    rows = load_stale_categorizations(get_current_versions(), limit=budget)
+    updated = _recategorize_rows(rows, progress_callback, run_stats)
+    
+    return {
+        "version": version,
+        "stale": stale,
+        "selected": len(rows),
+        "updated": updated,
+        "remaining": stale - updated,
+    }
+
+
+def _recategorize_rows(
+    rows: List[Tuple[int, str, str]],
+    progress_callback: Optional[Callable],
+    run_stats: Optional[Dict[str, int]]
+) -> int:
+    """
+    Categoriza filas guardadas y actualiza por id las que salen bien.
+    
+    Args:
+        rows: Lista de (id, client_name, transcript)
+        progress_callback: Función opcional (actual, total) de progreso
+        run_stats: Dict opcional con el origen de los resultados
+        
+    Returns:
+        Número de filas actualizadas
+    """
+    if not rows:
+        return 0
+    
+    row_ids = [row_id for row_id, _, _ in rows]
+    client_names = [name for _, name, _ in rows]
+    transcripts = [transcript for _, _, transcript in rows]
+    
+    job = start_categorization_job(transcripts, client_names)
+    try:
+        results = batch_categorize_transcripts(
+            transcripts,
+            client_names,
+            progress_callback,
+            job_id=job["job_id"],
+            run_stats=run_stats
+        )
+    except Exception:
+        finish_categorization_job(job["job_id"], success=False)
+        raise
+    
+    updated = update_categorizations([
+        (row_id, result)
+        for row_id, result in zip(row_ids, results)
+        if result.get("_categorization_success", True)
+    ])
+    finish_categorization_job(job["job_id"])
+    
+    return updated
@@ -2,15 +2,39 @@
 Opciones avanzadas del sidebar.
 """
 
+from datetime import datetime
+
 import streamlit as st
 
-from src.core.ai import clear_categorization_cache
-from src.core.database import delete_database
+from src.core.ai import (
+    clear_categorization_cache,
+    configure_gemini,
+    get_categorization_version,
+    get_current_versions,
+    get_cache_stats,
+    get_cascade_stats,
+    get_client_latency_stats,
+    get_compaction_stats,
+    get_concurrency_stats,
+    get_context_cache_stats
+)
+from src.core.database import (
+    count_failed_categorizations,
+    count_fingerprints,
+    count_stale_categorizations,
+    delete_database,
+    list_categorization_jobs
+)
+from src.core.ai.defaults import STALE_RECATEGORIZATION_BUDGET
+from src.data.recategorize import recategorize_stale_rows, retry_failed_categorizations
 
 
 def render_advanced_options() -> None:
     """Renderiza el expander de opciones avanzadas con reprocesamiento y caché."""
     with st.expander("⚙️ Opciones Avanzadas"):
+        _render_retry_failed()
+        _render_stale_recategorization()
+        
         st.caption("**Reprocesar todo:** Borra la base de datos y vuelve a categorizar las transcripciones con Gemini.")
         
         if st.button("Reprocesar Todo", type="primary", use_container_width=True, key="btn_reprocess"):
@@ -19,10 +43,205 @@ def render_advanced_options() -> None:
         if st.button("Limpiar Caché", type="secondary", use_container_width=True, key="btn_clear_cache"):
             clear_categorization_cache()
         
+        _render_cache_stats()
+        _render_latency_stats()
+        _render_concurrency_stats()
+        _render_context_cache_stats()
+        _render_compaction_stats()
+        _render_cascade_stats()
+        _render_job_history()
+        
         if st.session_state.get("confirm_reprocess", False):
             _handle_reprocess_confirmation()
 
 
+def _render_retry_failed() -> None:
+    """Ofrece volver a categorizar solo las filas con categorización fallida."""
+    failed_count = count_failed_categorizations()
+    if failed_count == 0:
+        return
+    
+    st.caption(
+        f"**Reintentar fallidas:** Vuelve a categorizar solo los {failed_count} leads con valores "
+        "por defecto; el resto de la base no se toca."
+    )
+    
+    if st.button("Reintentar Fallidas", type="primary", use_container_width=True, key="btn_retry_failed"):
+        _execute_retry_failed(failed_count)
+
+
+def _execute_retry_failed(failed_count: int) -> None:
+    """Re-categoriza las filas fallidas mostrando el progreso."""
+    configure_gemini()
+    
+    progress_bar = st.progress(0, text=f"Reintentando {failed_count} categorizaciones fallidas...")
+    
+    def update_progress(current, total):
+        progress_bar.progress(current / total, text=f"Procesando {current} de {total} transcripciones")
+    
+    try:
+        summary = retry_failed_categorizations(progress_callback=update_progress)
+    except Exception as e:
+        progress_bar.empty()
+        st.error(f"❌ Error durante el reintento: {str(e)}")
+        return
+    
+    progress_bar.empty()
+    
+    if summary["recovered"] > 0:
+        st.success(f"✅ {summary['recovered']} de {summary['failed']} leads categorizados correctamente")
+    if summary["still_failed"] > 0:
+        st.warning(f"⚠️ {summary['still_failed']} leads siguen con categorización fallida")
+    
+    if st.button("🔄 Recargar Dashboard", type="primary", use_container_width=True, key="reload_after_retry"):
+        st.rerun()
+
+
+def _render_stale_recategorization() -> None:
+    """Ofrece re-categorizar las filas de una versión anterior del prompt/schema/modelo."""
+    version = get_categorization_version()
+    stale_count = count_stale_categorizations(get_current_versions())
+    if stale_count == 0:
+        return
+    
+    budget = min(stale_count, STALE_RECATEGORIZATION_BUDGET)
+    st.caption(
+        f"**Actualizar versión:** {stale_count} leads se categorizaron con otra versión de las "
+        f"instrucciones, el schema o el modelo (vigente: `{version}`). Se procesan hasta {budget} "
+        "por vez, primero los leads abiertos."
+    )
+    
+    if st.button("Actualizar Versión", type="secondary", use_container_width=True, key="btn_recategorize_stale"):
+        _execute_stale_recategorization(budget)
+
+
+def _execute_stale_recategorization(budget: int) -> None:
+    """Re-categoriza hasta `budget` filas desactualizadas mostrando el progreso."""
+    configure_gemini()
+    
+    progress_bar = st.progress(0, text=f"Re-categorizando {budget} leads desactualizados...")
+    
+    def update_progress(current, total):
+        progress_bar.progress(current / total, text=f"Procesando {current} de {total} transcripciones")
+    
+    try:
+        summary = recategorize_stale_rows(budget, progress_callback=update_progress)
+    except Exception as e:
+        progress_bar.empty()
+        st.error(f"❌ Error durante la re-categorización: {str(e)}")
+        return
+    
+    progress_bar.empty()
+    
+    st.success(f"✅ {summary['updated']} de {summary['selected']} leads actualizados a la versión vigente")
+    if summary["remaining"] > 0:
+        st.info(f"⏭️ Quedan {summary['remaining']} leads desactualizados")
+    
+    if st.button("🔄 Recargar Dashboard", type="primary", use_container_width=True, key="reload_after_stale"):
+        st.rerun()
+
+
+def _render_cache_stats() -> None:
+    """Muestra el tamaño y la tasa de aciertos del caché persistente."""
+    stats = get_cache_stats()
+    st.caption(
+        f"💾 Caché: {stats['entries']} categorizaciones "
+        f"({stats['size_bytes'] / 1024:.0f} KB) · "
+        f"{stats['hits']} aciertos / {stats['misses']} fallos "
+        f"({stats['hit_rate']:.0%}) · "
+        f"{count_fingerprints()} transcripciones indexadas para casi-duplicados"
+    )
+
+
+def _render_latency_stats() -> None:
+    """Muestra las latencias de Gemini separando conexión inicial y generación."""
+    stats = get_client_latency_stats()
+    if stats["calls"] == 0:
+        return
+    
+    overhead = stats["connection_overhead"]
+    st.caption(
+        f"⏱️ Gemini: {stats['calls']} llamadas ({stats['errors']} errores) · "
+        f"generación p50 {stats['warm']['p50']:.1f}s / p95 {stats['warm']['p95']:.1f}s"
+        + (f" · conexión inicial +{overhead:.1f}s" if overhead is not None else "")
+    )
+
+
+def _render_concurrency_stats() -> None:
+    """Muestra la concurrencia adaptativa y el estado del circuit breaker."""
+    stats = get_concurrency_stats()
+    if stats["dispatched"] == 0:
+        return
+    
+    state_labels = {"closed": "🟢 normal", "open": "🔴 en pausa", "half_open": "🟡 probando"}
+    backoff = f" ({stats['backoff_remaining']:.0f}s restantes)" if stats["backoff_remaining"] > 0 else ""
+    st.caption(
+        f"🚦 Concurrencia: {stats['in_flight']}/{stats['limit']} en vuelo · "
+        f"{state_labels.get(stats['state'], stats['state'])}{backoff} · "
+        f"{stats['rate_limited']} rechazadas por límite de API · "
+        f"{stats['circuit_opens']} pausas"
+    )
+
+
+def _render_context_cache_stats() -> None:
+    """Muestra cuántos tokens de instrucciones se sirvieron desde el caché de contexto."""
+    stats = get_context_cache_stats()
+    calls = stats["cached_calls"] + stats["inline_calls"]
+    if calls == 0:
+        return
+    
+    st.caption(
+        f"🧠 Caché de contexto: {stats['cached_calls']}/{calls} llamadas · "
+        f"{stats['cached_tokens']:,} tokens de instrucciones sin reenviar · "
+        f"{stats['active_caches']} cachés activos"
+        + (f" · {stats['failures']} fallos al crear" if stats["failures"] else "")
+    )
+
+
+def _render_compaction_stats() -> None:
+    """Muestra cuántos tokens de transcripciones ahorró la compactación."""
+    stats = get_compaction_stats()
+    if stats["raw_tokens"] == 0:
+        return
+    
+    st.caption(
+        f"🗜️ Compactación: {stats['raw_tokens']:,} → {stats['compact_tokens']:,} tokens de transcripciones "
+        f"(−{stats['reduction']:.0%}) · {stats['boilerplate_phrases']} frases de cortesía aprendidas"
+    )
+
+
+def _render_cascade_stats() -> None:
+    """Muestra cuántas transcripciones resolvió cada modelo de la cascada."""
+    stats = get_cascade_stats()
+    fast, strong = stats["tiers"]["fast"], stats["tiers"]["strong"]
+    if fast["items"] == 0:
+        return
+    
+    escalated = sum(stats["escalations"].values())
+    st.caption(
+        f"🪜 Cascada: {fast['resolved']}/{fast['items']} en {fast['model']} "
+        f"(p50 {fast['latency']['p50']:.1f}s) · {escalated} escaladas a {strong['model']} "
+        f"(p50 {strong['latency']['p50']:.1f}s) · "
+        + ", ".join(f"{reason}: {count}" for reason, count in sorted(stats["escalations"].items()))
+    )
+
+
+def _render_job_history() -> None:
+    """Muestra el estado de los últimos trabajos de categorización."""
+    status_labels = {"running": "🔄 en curso/interrumpido", "completed": "✅ completado", "failed": "❌ fallido"}
+    
+    for job in list_categorization_jobs(limit=3):
+        started = datetime.fromtimestamp(job["started_at"]).strftime("%d/%m %H:%M")
+        finished = (
+            datetime.fromtimestamp(job["finished_at"]).strftime("%H:%M") if job["finished_at"] else "—"
+        )
+        st.caption(
+            f"🗂️ Trabajo {started}→{finished}: {status_labels.get(job['status'], job['status'])} · "
+            f"{job['completed_items']}/{job['total_items']} · {job['runs']} ejecución(es) · "
+            f"{job['throughput']:.2f} transcripciones/s"
+        )
+
+
 def _handle_reprocess_confirmation() -> None:
     """Maneja la confirmación de reprocesamiento con botones de confirmación."""
     st.warning("⚠️ **¿Estás seguro?** Esto borrará todos los datos procesados para llamar nuevamente a Gemini API.")
@@ -39,7 +258,8 @@ def _execute_reprocess() -> None:
     if delete_database():
         st.success("✅ Base de datos eliminada")
     
-    clear_categorization_cache()
+    # El caché persistente se conserva: las transcripciones idénticas no vuelven a pagar Gemini
+    clear_categorization_cache(persistent=False)
     
     st.session_state.categorized = False
     st.session_state.categorizing = False
@@ -2,24 +2,52 @@
 Procesamiento de archivos con IA (Google Gemini).
 """
 
+import time
+from typing import Dict, Any, Optional
+
 import streamlit as st
 import pandas as pd
 
-from src.data.transformer import expand_categories_to_dataframe
+from src.data.transformer import prepare_category_columns, apply_categories_to_row
 from src.core.ai import batch_categorize_transcripts, configure_gemini
+from src.core.ai.defaults import get_default_categorization
+from src.core.database import (
+    start_categorization_job,
+    load_job_checkpoint,
+    enqueue_items,
+    get_queue_counts,
+    cancel_job_items,
+    count_active_workers
+)
+from src.core.database.config import QUEUE_POLL_INTERVAL
 
 
-def categorize_dataframe(df: pd.DataFrame, show_progress: bool = True) -> pd.DataFrame:
+def categorize_dataframe(
+    df: pd.DataFrame,
+    show_progress: bool = True,
+    job_id: Optional[str] = None
+) -> pd.DataFrame:
     """
     Categoriza todas las transcripciones de un DataFrame usando Gemini AI en batches.
     
+    Si hay un trabajo y workers activos (worker.py), las transcripciones se
+    encolan y esta sesión solo muestra el progreso; si no, se categorizan
+    en el proceso de Streamlit.
+    
     Args:
         df: DataFrame con los datos normalizados
         show_progress: Si debe mostrar la barra de progreso
-        
+        job_id: Trabajo reanudable (start_categorization_job) para guardar
+            un checkpoint por batch
+            
     Returns:
         DataFrame con categorías expandidas
     """
+    if job_id and count_active_workers() > 0:
+        df_categorized = _categorize_with_workers(df, job_id, show_progress)
+        if df_categorized is not None:
+            return df_categorized
+    
     configure_gemini()
     
     total_rows = len(df)
@@ -37,16 +65,137 @@ def categorize_dataframe(df: pd.DataFrame, show_progress: bool = True) -> pd.Dat
                 text=f"Procesando {current} de {total} transcripciones"
             )
     
-    categories = batch_categorize_transcripts(
+    # Las filas se completan a medida que llega cada categorización
+    df_categorized = prepare_category_columns(df)
+    
+    def apply_result(index, category):
+        apply_categories_to_row(df_categorized, df_categorized.index[index], category)
+    
+    run_stats: Dict[str, int] = {}
+    batch_categorize_transcripts(
         transcripts=df["Transcripcion"].tolist(),
         client_names=df["Nombre"].tolist(),
-        _progress_callback=update_progress if show_progress else None
+        _progress_callback=update_progress if show_progress else None,
+        _result_callback=apply_result,
+        job_id=job_id,
+        run_stats=run_stats
+    )
+    
+    if show_progress:
+        progress_bar.empty()
+        status_container.empty()
+        _render_reuse_summary(run_stats)
+    
+    return df_categorized
+
+
+def _render_reuse_summary(run_stats: Dict[str, int]) -> None:
+    """Muestra cuántas transcripciones de la carga se resolvieron sin llamar a Gemini."""
+    total = run_stats.get("total", 0)
+    reused = total - run_stats.get("model_items", total)
+    if reused <= 0:
+        return
+    
+    st.caption(
+        f"♻️ {reused} de {total} transcripciones sin llamar a Gemini ({reused / total:.0%}): "
+        f"{run_stats['cache_hits']} idénticas en caché, "
+        f"{run_stats['near_duplicate_hits']} casi duplicadas, "
+        f"{run_stats.get('coalesced_items', 0)} repetidas en la misma carga, "
+        f"{run_stats['checkpoint_hits']} recuperadas del checkpoint"
     )
+
+
+def _categorize_with_workers(df: pd.DataFrame, job_id: str, show_progress: bool) -> Optional[pd.DataFrame]:
+    """
+    Encola las transcripciones pendientes del trabajo y espera a los workers.
+    
+    Args:
+        df: DataFrame con los datos normalizados
+        job_id: Trabajo de categorización
+        show_progress: Si debe mostrar la barra de progreso
+        
+    Returns:
+        DataFrame con categorías expandidas, o None si los workers dejaron
+        de responder (los items pendientes se cancelan y el checkpoint
+        queda disponible para continuar en la sesión)
+    """
+    total_rows = len(df)
+    checkpoint = load_job_checkpoint(job_id)
+    queued = enqueue_items(job_id, [
+        (index, name, transcript)
+        for index, (name, transcript) in enumerate(zip(df["Nombre"], df["Transcripcion"]))
+        if index not in checkpoint
+    ])
+    
+    if show_progress:
+        progress_bar = st.progress(0, text="Esperando a los workers...")
+        status_container = st.empty()
+        status_container.info(
+            f"🛰️ {queued} transcripciones encoladas para {count_active_workers()} worker(s) de categorización..."
+        )
     
-    df_categorized = expand_categories_to_dataframe(df, categories)
+    df_categorized = prepare_category_columns(df)
+    applied = set()
+    completed = True
+    
+    while True:
+        for index, category in load_job_checkpoint(job_id).items():
+            if index not in applied and index < total_rows:
+                apply_categories_to_row(df_categorized, df_categorized.index[index], category)
+                applied.add(index)
+        
+        counts = get_queue_counts(job_id)
+        if show_progress:
+            progress_bar.progress(
+                len(applied) / total_rows if total_rows else 1.0,
+                text=f"Procesando {len(applied)} de {total_rows} transcripciones ({counts['processing']} en curso)"
+            )
+        
+        if counts["pending"] + counts["processing"] == 0:
+            break
+        
+        if count_active_workers() == 0:
+            cancel_job_items(job_id)
+            completed = False
+            break
+        
+        time.sleep(QUEUE_POLL_INTERVAL)
     
     if show_progress:
         progress_bar.empty()
         status_container.empty()
     
+    if not completed:
+        st.warning("⚠️ Los workers dejaron de responder; la categorización continúa en esta sesión")
+        return None
+    
+    # Las transcripciones que agotaron sus intentos usan valores por defecto
+    for index, idx in enumerate(df_categorized.index):
+        if index not in applied:
+            apply_categories_to_row(df_categorized, idx, get_default_categorization())
+    
     return df_categorized
+
+
+def start_dataframe_job(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Crea o reanuda el trabajo de categorización para las transcripciones del DataFrame.
+    
+    Si el mismo archivo quedó a medias en una ejecución anterior, informa
+    cuántas transcripciones se recuperan del checkpoint.
+    
+    Args:
+        df: DataFrame con los datos normalizados
+        
+    Returns:
+        Dict del trabajo (job_id, status, completed_items, total_items, runs, ...)
+    """
+    job = start_categorization_job(df["Transcripcion"].tolist(), df["Nombre"].tolist())
+    
+    if job["runs"] > 1 and job["completed_items"] > 0:
+        st.info(
+            f"♻️ Reanudando categorización (intento {job['runs']}): "
+            f"{job['completed_items']} de {job['total_items']} transcripciones ya estaban listas"
+        )
+    
+    return job
@@ -6,12 +6,13 @@ import streamlit as st
 import pandas as pd
 
 from src.data.validation import get_validation_summary
-from src.core.database import append_processed_data, check_duplicates
+from src.core.database import append_processed_data, check_duplicates, finish_categorization_job
 from .csv_handler import (
     validate_and_normalize_file,
     categorize_dataframe,
     display_file_summary
 )
+from .ai_processor import start_dataframe_job
 
 
 def render_file_uploader() -> None:
@@ -51,7 +52,7 @@ def render_file_uploader() -> None:
             
             if st.button("✅ Procesar y Agregar Datos", type="primary", use_container_width=True):
                 _process_and_append_data(df_normalized)
-                
+        
         except Exception as e:
             st.error(f"❌ Error inesperado: {str(e)}")
 
@@ -63,6 +64,7 @@ def _process_and_append_data(df: pd.DataFrame) -> None:
     Args:
         df: DataFrame normalizado con los nuevos datos
     """
+    job = None
     try:
         df_filtrado, duplicados = check_duplicates(df)
         
@@ -75,11 +77,13 @@ def _process_and_append_data(df: pd.DataFrame) -> None:
                 st.rerun()
             return
         
-        df_categorized = categorize_dataframe(df_filtrado, show_progress=True)
+        job = start_dataframe_job(df_filtrado)
+        df_categorized = categorize_dataframe(df_filtrado, show_progress=True, job_id=job["job_id"])
         
         status_container = st.empty()
         status_container.info("💾 Guardando datos en la base de datos...")
         rows_added = append_processed_data(df_categorized)
+        finish_categorization_job(job["job_id"])
         status_container.empty()
         
         additional_duplicates = len(df_categorized) - rows_added
@@ -99,7 +103,9 @@ def _process_and_append_data(df: pd.DataFrame) -> None:
         else:
             if st.button("🔙 Volver", type="secondary", use_container_width=True, key="back_after_no_upload"):
                 st.rerun()
-            
+    
     except Exception as e:
+        if job is not None:
+            finish_categorization_job(job["job_id"], success=False)
         st.error(f"❌ Error durante el procesamiento: {str(e)}")
         st.exception(e)
@@ -6,12 +6,13 @@ import streamlit as st
 import pandas as pd
 
 from src.data.validation import get_validation_summary
-from src.core.database import save_processed_data
+from src.core.database import save_processed_data, finish_categorization_job
 from .csv_handler import (
     validate_and_normalize_file,
     categorize_dataframe,
     display_file_summary
 )
+from .ai_processor import start_dataframe_job
 
 
 def render_initial_uploader() -> None:
@@ -86,7 +87,7 @@ def render_initial_uploader() -> None:
                 
                 if button_pressed:
                     _process_and_save_initial_data(df_normalized)
-                    
+        
         except Exception as e:
             st.error(f"❌ Error inesperado: {str(e)}")
             st.exception(e)
@@ -99,14 +100,17 @@ def _process_and_save_initial_data(df: pd.DataFrame) -> None:
     Args:
         df: DataFrame normalizado con los datos iniciales
     """
+    job = None
     try:
         total_rows = len(df)
         
-        df_categorized = categorize_dataframe(df, show_progress=True)
+        job = start_dataframe_job(df)
+        df_categorized = categorize_dataframe(df, show_progress=True, job_id=job["job_id"])
         
         status_container = st.empty()
         status_container.info("💾 Guardando datos en la base de datos...")
         save_processed_data(df_categorized)
+        finish_categorization_job(job["job_id"])
         status_container.empty()
         
         st.session_state.processing_complete = True
@@ -128,7 +132,9 @@ def _process_and_save_initial_data(df: pd.DataFrame) -> None:
         with col2:
             if st.button("🎉 Ver Dashboard", type="primary", use_container_width=True):
                 st.rerun()
-            
+    
     except Exception as e:
+        if job is not None:
+            finish_categorization_job(job["job_id"], success=False)
         st.error(f"❌ Error durante el procesamiento: {str(e)}")
         st.exception(e)
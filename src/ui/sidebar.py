@@ -104,4 +104,4 @@ def _render_failed_categorizations_indicator(df: pd.DataFrame) -> None:
         failed_count = (~df["_categorization_success"]).sum()
         if failed_count > 0:
             st.error(f"⚠️ **{int(failed_count)} leads** con categorización fallida")
-            st.caption("Estos leads tienen valores por defecto. Considera reprocesarlos.")
+            st.caption("Estos leads tienen valores por defecto. Reintenta solo estos desde ⚙️ Opciones Avanzadas.")
@@ -4,34 +4,36 @@ Tab Deep Analysis - Análisis profundo de datos.
 
 import streamlit as st
 import pandas as pd
+from typing import Dict, Any, Optional
 
 from src.analytics import calculate_close_heatmap, calculate_source_roi
 from ..components import render_chart_with_expander
 
 
-def render_deep_analysis_tab(df: pd.DataFrame) -> None:
+def render_deep_analysis_tab(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> None:
     """
     Renderiza la pestaña de Análisis Profundo.
     
     Args:
         df: DataFrame filtrado con los datos
+        filters: Filtros del sidebar para calcular los agregados en SQLite
     """
     st.header("🔬 Análisis Profundo")
     
     st.subheader("Sweet Spots: Sector × Volumen")
-    heatmap = calculate_close_heatmap(df)
+    heatmap = calculate_close_heatmap(df, filters)
     st.plotly_chart(heatmap, use_container_width=True, key="deep_heatmap")
     
     st.markdown("---")
     
-    _render_source_roi(df)
+    _render_source_roi(df, filters)
 
 
-def _render_source_roi(df: pd.DataFrame) -> None:
+def _render_source_roi(df: pd.DataFrame, filters: Optional[Dict[str, Any]]) -> None:
     """Renderiza el análisis de ROI de fuentes de descubrimiento."""
     st.subheader("ROI de Fuentes de Descubrimiento")
     
-    source_roi_data = calculate_source_roi(df)
+    source_roi_data = calculate_source_roi(df, filters)
     
     st.plotly_chart(source_roi_data["chart"], use_container_width=True, key="deep_source_roi")
     
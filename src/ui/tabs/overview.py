@@ -4,6 +4,7 @@ Tab Overview - Métricas principales de ventas.
 
 import streamlit as st
 import pandas as pd
+from typing import Dict, Any, Optional
 
 from src.analytics import (
     calculate_global_close_rate,
@@ -15,19 +16,20 @@ from src.analytics import (
 from ..components import render_chart_with_expander
 
 
-def render_overview_tab(df: pd.DataFrame) -> None:
+def render_overview_tab(df: pd.DataFrame, filters: Optional[Dict[str, Any]] = None) -> None:
     """
     Renderiza la pestaña de Overview con las métricas principales.
     
     Args:
         df: DataFrame filtrado con los datos
+        filters: Filtros del sidebar para calcular los agregados en SQLite
     """
     st.header("📊 Métricas Clave de Ventas")
     
-    _render_global_close_rate(df)
+    _render_global_close_rate(df, filters)
     st.markdown("---")
     
-    _render_seller_close_rate(df)
+    _render_seller_close_rate(df, filters)
     st.markdown("---")
     
     _render_lead_potential_index(df)
@@ -42,11 +44,11 @@ def render_overview_tab(df: pd.DataFrame) -> None:
         _render_upsell_opportunities(df)
 
 
-def _render_global_close_rate(df: pd.DataFrame) -> None:
+def _render_global_close_rate(df: pd.DataFrame, filters: Optional[Dict[str, Any]]) -> None:
     """Renderiza la métrica de tasa de cierre global con pronóstico."""
     st.subheader("Tasa de Cierre Global + Pronóstico 6 meses")
     
-    close_rate_data = calculate_global_close_rate(df)
+    close_rate_data = calculate_global_close_rate(df, filters)
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -71,11 +73,11 @@ def _render_global_close_rate(df: pd.DataFrame) -> None:
     st.plotly_chart(close_rate_data["chart"], use_container_width=True, key="overview_close_rate")
 
 
-def _render_seller_close_rate(df: pd.DataFrame) -> None:
+def _render_seller_close_rate(df: pd.DataFrame, filters: Optional[Dict[str, Any]]) -> None:
     """Renderiza la métrica de tasa de cierre por vendedor."""
     st.subheader("Tasa de Cierre por Vendedor")
     
-    seller_data = calculate_close_rate_by_seller(df)
+    seller_data = calculate_close_rate_by_seller(df, filters)
     
     render_chart_with_expander(
         chart_fig=seller_data["chart"],
@@ -0,0 +1,20 @@
+"""
+Fixtures compartidas de los tests.
+"""
+
+import pytest
+
+from src.core.database import schema
+from src.core.database.connection import close_connections
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """
+    Corre el test en un directorio temporal: DB_PATH, el caché y el
+    snapshot son rutas relativas, así que apuntan a bases vacías.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(schema, "_prepared", False)
+    yield tmp_path
+    close_connections()
@@ -0,0 +1,114 @@
+"""
+Tests de los agregados del dashboard en SQL (src/core/database/analytics_queries.py).
+
+Cada métrica se calcula por los dos caminos, SQL con los filtros del
+sidebar y pandas sobre el DataFrame filtrado, y deben coincidir.
+
+Uso:
+    python -m pytest tests/test_analytics_queries.py
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from scripts.benchmark_database import build_processed
+from src.analytics.close_rate.calculations import calculate_monthly_stats, prepare_heatmap_data
+from src.analytics.close_rate.metrics import (
+    calculate_close_heatmap,
+    calculate_close_rate_by_seller,
+    calculate_global_close_rate
+)
+from src.analytics.roi import calculate_source_roi
+from src.core.database import load_processed_data, save_processed_data
+from src.ui.sidebar import apply_filters
+
+
+_SECTORS = ["Retail", "Salud", "Educación", None]
+_SOURCES = ["Google", "LinkedIn", "Referido"]
+_VOLUMES = ["Bajo (<100)", "Medio (100-250)", "Alto (251-500)", "Desconocido"]
+_URGENCIES = ["Alta", "Media", "Baja"]
+
+FILTERS = {
+    "vendedores": ["Ana", "Bruno"],
+    "fecha_inicio": date(2024, 2, 1),
+    "fecha_fin": date(2024, 11, 15),
+    "sectores": ["Retail", "Salud"],
+    "fuentes": ["Google", "Referido"],
+    "volumenes": ["Bajo (<100)", "Medio (100-250)", "Alto (251-500)"],
+    "urgencias": ["Alta", "Media"],
+    "search_text": "zafiro",
+}
+
+
+@pytest.fixture
+def df_filtered(temp_db):
+    """Guarda leads variados y retorna los que pasan FILTERS según pandas."""
+    df = build_processed(240)
+    df["sector_principal"] = [_SECTORS[i % 4] for i in range(len(df))]
+    df["fuente_primaria"] = [_SOURCES[i % 3] for i in range(len(df))]
+    df["volumen_nivel"] = [_VOLUMES[i % 4 if i % 7 else 0] for i in range(len(df))]
+    df["urgencia_nivel"] = [_URGENCIES[i % 5 % 3] for i in range(len(df))]
+    # search_text debe encontrarse en el nombre, la transcripción o las preocupaciones
+    df.loc[df.index % 2 == 0, "Nombre"] += " Zafiro"
+    df.loc[df.index % 3 == 0, "Transcripcion"] += " Usamos el sistema ZAFIRO."
+    df["preocupaciones"] = [
+        [{"tipo": "Integración", "impacto": "Alto", "ejemplo_frase": "migrar desde zafiro"}] if i % 5 == 0 else []
+        for i in range(len(df))
+    ]
+    save_processed_data(df)
+    
+    filtered = apply_filters(load_processed_data(), FILTERS)
+    assert 0 < len(filtered) < len(df)
+    return filtered
+
+
+def test_global_close_rate_matches(df_filtered):
+    sql = calculate_global_close_rate(df_filtered, FILTERS)
+    pandas = calculate_global_close_rate(df_filtered)
+    
+    assert sql["current_rate"] == pytest.approx(pandas["current_rate"])
+    assert sql["predicted_6m"] == pytest.approx(pandas["predicted_6m"])
+
+
+def test_close_rate_by_seller_matches(df_filtered):
+    sql = calculate_close_rate_by_seller(df_filtered, FILTERS)["seller_stats"]
+    pandas = calculate_close_rate_by_seller(df_filtered)["seller_stats"]
+    
+    pd.testing.assert_frame_equal(
+        sql.sort_values("vendedor").reset_index(drop=True),
+        pandas.sort_values("vendedor").reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+def test_source_roi_matches(df_filtered):
+    sql = calculate_source_roi(df_filtered, FILTERS)["source_stats"]
+    pandas = calculate_source_roi(df_filtered)["source_stats"]
+    
+    pd.testing.assert_frame_equal(
+        sql.sort_values("fuente").reset_index(drop=True),
+        pandas.sort_values("fuente").reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+def test_monthly_stats_match(df_filtered):
+    sql = calculate_monthly_stats(df_filtered, FILTERS)
+    pandas = calculate_monthly_stats(df_filtered)
+    
+    pd.testing.assert_frame_equal(sql, pandas, check_dtype=False)
+
+
+def test_heatmap_matches(df_filtered):
+    sql_rates, sql_counts, sql_columns = prepare_heatmap_data(df_filtered, FILTERS)
+    rates, counts, columns = prepare_heatmap_data(df_filtered)
+    
+    assert sql_columns == columns
+    pd.testing.assert_frame_equal(sql_rates, rates, check_dtype=False, check_names=False)
+    pd.testing.assert_frame_equal(sql_counts, counts, check_dtype=False, check_names=False)
+    
+    sql_figure = calculate_close_heatmap(df_filtered, FILTERS)
+    pandas_figure = calculate_close_heatmap(df_filtered)
+    assert sql_figure.data[0].z.tolist() == pandas_figure.data[0].z.tolist()
@@ -0,0 +1,174 @@
+"""
+Tests de la recuperación parcial de batch.py: asociación por
+transcripcion_id en _request_group y reintentos/bisección en _categorize_group.
+
+Las llamadas a Gemini se reemplazan por funciones que entregan objetos fijos.
+
+Uso:
+    python -m pytest tests/test_batch_recovery.py
+"""
+
+import pytest
+
+from src.core.ai import batch
+from src.core.ai.defaults import get_default_categorization
+
+
+SECTORS = ["Salud", "Eventos", "Consultoría", "Educación / EdTech", "Retail / E-commerce"]
+
+
+def _categorization(sector, transcript_id=None):
+    """Categorización válida identificable por sector_principal."""
+    result = get_default_categorization()
+    result.pop("_categorization_success")
+    result["sector_principal"] = sector
+    if transcript_id is not None:
+        result["transcripcion_id"] = transcript_id
+    return result
+
+
+@pytest.fixture
+def respond_with(monkeypatch):
+    """Reemplaza la llamada en streaming: entrega `objects` y luego lanza `error` si se indica."""
+    def install(objects, error=None):
+        def fake_stream(prompt, on_item, **kwargs):
+            for obj in objects:
+                on_item(obj)
+            if error:
+                raise error
+        monkeypatch.setattr(batch, "STREAM_BATCH_RESPONSES", True)
+        monkeypatch.setattr(batch, "stream_gemini_batch_api", fake_stream)
+    return install
+
+
+def _request(indices, batch_start=0):
+    transcripts = [f"Transcripción {i}" for i in range(5)]
+    names = [f"Cliente {i}" for i in range(5)]
+    return batch._request_group(indices, transcripts, names, batch_start)
+
+
+def test_results_are_matched_by_transcript_id(respond_with):
+    # batch_start 10: los ids de las posiciones 1 y 3 son 12 y 14
+    respond_with([_categorization("Eventos", 14), _categorization("Salud", 12)])
+    
+    salvaged = _request([1, 3], batch_start=10)
+    
+    assert salvaged[1]["sector_principal"] == "Salud"
+    assert salvaged[3]["sector_principal"] == "Eventos"
+    assert all(result["_categorization_success"] for result in salvaged.values())
+    assert all("transcripcion_id" not in result for result in salvaged.values())
+
+
+def test_duplicate_unknown_and_invalid_ids_are_dropped(respond_with):
+    invalid = _categorization("Salud", 3)
+    del invalid["urgencia_nivel"]
+    respond_with([
+        _categorization("Eventos", 1),
+        _categorization("Consultoría", 1),
+        _categorization("Salud", 99),
+        _categorization("Salud", "no-es-numero"),
+        invalid,
+    ])
+    
+    salvaged = _request([0, 1, 2])
+    
+    assert list(salvaged) == [0]
+    assert salvaged[0]["sector_principal"] == "Eventos"
+
+
+def test_missing_ids_fall_back_to_order_only_when_counts_match(respond_with):
+    respond_with([_categorization("Eventos"), _categorization("Salud")])
+    assert {i: r["sector_principal"] for i, r in _request([2, 4]).items()} == {2: "Eventos", 4: "Salud"}
+    
+    respond_with([_categorization("Eventos")])
+    assert _request([2, 4]) == {}
+
+
+def test_objects_received_before_a_cut_are_kept(respond_with):
+    respond_with([_categorization("Eventos", 1)], error=RuntimeError("stream cortado"))
+    
+    assert list(_request([0, 1])) == [0]
+
+
+def test_cut_without_objects_raises(respond_with):
+    respond_with([], error=RuntimeError("stream cortado"))
+    
+    with pytest.raises(RuntimeError):
+        _request([0, 1])
+
+
+@pytest.fixture
+def fake_group(monkeypatch):
+    """Reemplaza _request_group por `handler(indices)` y registra cada llamada."""
+    calls = []
+    
+    def install(handler):
+        def fake_request_group(indices, *args, **kwargs):
+            calls.append(list(indices))
+            return handler(list(indices))
+        monkeypatch.setattr(batch, "_request_group", fake_request_group)
+        monkeypatch.setattr(batch.time, "sleep", lambda seconds: None)
+        return calls
+    
+    return install
+
+
+def _categorize(indices, size=5):
+    transcripts = [f"Transcripción {i}" for i in range(size)]
+    results = [None] * size
+    last_error = batch._categorize_group(indices, transcripts, [""] * size, 0, results)
+    return results, last_error
+
+
+def test_partial_responses_resend_only_missing_positions(fake_group):
+    # Cada llamada solo devuelve la primera posición pendiente
+    calls = fake_group(lambda indices: {indices[0]: _categorization(SECTORS[indices[0]])})
+    
+    results, last_error = _categorize([0, 1, 2])
+    
+    assert calls == [[0, 1, 2], [1, 2], [2]]
+    assert [result["sector_principal"] for result in results[:3]] == SECTORS[:3]
+    assert last_error == ""
+
+
+def test_bisection_isolates_failing_transcript(fake_group):
+    def handler(indices):
+        if 3 in indices:
+            raise ValueError("JSON inválido")
+        return {i: _categorization(SECTORS[i]) for i in indices}
+    calls = fake_group(handler)
+    
+    results, last_error = _categorize([0, 1, 2, 3, 4])
+    
+    assert [result is None for result in results] == [False, False, False, True, False]
+    assert last_error == "JSON inválido"
+    assert calls[:batch.SPLIT_AFTER_FAILURES] == [[0, 1, 2, 3, 4]] * batch.SPLIT_AFTER_FAILURES
+    # El item problemático solo agota los reintentos cuando queda aislado
+    assert calls.count([3]) == batch.RETRY_ATTEMPTS
+
+
+def test_rate_limit_requeues_without_counting_as_failure(fake_group):
+    attempts = []
+    
+    def handler(indices):
+        attempts.append(indices)
+        if len(attempts) <= batch.SPLIT_AFTER_FAILURES:
+            raise RuntimeError("429 Resource has been exhausted")
+        return {i: _categorization(SECTORS[i]) for i in indices}
+    calls = fake_group(handler)
+    
+    results, _ = _categorize([0, 1, 2])
+    
+    # Sin bisección: todos los reenvíos llevan el grupo completo
+    assert calls == [[0, 1, 2]] * (batch.SPLIT_AFTER_FAILURES + 1)
+    assert all(result is not None for result in results[:3])
+
+
+def test_rate_limit_beyond_requeue_budget_raises(fake_group):
+    def handler(indices):
+        raise RuntimeError("429 quota")
+    calls = fake_group(handler)
+    
+    with pytest.raises(RuntimeError):
+        _categorize([0, 1])
+    assert len(calls) == batch.RATE_LIMIT_MAX_REQUEUES + 1
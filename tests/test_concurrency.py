@@ -0,0 +1,64 @@
+"""
+Tests de la clasificación de errores 429 y del circuit breaker (src/core/ai/concurrency.py).
+
+Uso:
+    python -m pytest tests/test_concurrency.py
+"""
+
+import pytest
+from google.api_core.exceptions import InternalServerError, ResourceExhausted
+
+from src.core.ai.concurrency import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    OUTCOME_ERROR,
+    OUTCOME_RATE_LIMITED,
+    AdaptiveConcurrencyController,
+    is_rate_limit_error
+)
+
+
+@pytest.mark.parametrize("error", [
+    ResourceExhausted("Resource has been exhausted"),
+    RuntimeError("429 Resource has been exhausted (e.g. check quota). [synthetic]"),
+    RuntimeError("Quota exceeded for quota metric 'Generate Content API requests'"),
+])
+def test_rate_limit_errors(error):
+    assert is_rate_limit_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    RuntimeError("failed to generate content"),
+    ValueError("Invalid generation config"),
+    RuntimeError("Content blocked: moderate risk"),
+    InternalServerError("500 An internal error has occurred"),
+])
+def test_other_errors_are_not_rate_limits(error):
+    assert not is_rate_limit_error(error)
+
+
+def _release_after(controller: AdaptiveConcurrencyController, error: Exception) -> None:
+    """Despacha una llamada y la libera como lo hace batch._request_group ante `error`."""
+    dispatched_at = controller.acquire()
+    controller.release(dispatched_at, OUTCOME_RATE_LIMITED if is_rate_limit_error(error) else OUTCOME_ERROR)
+
+
+def test_non_rate_limit_error_does_not_open_circuit():
+    controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=4)
+    
+    _release_after(controller, RuntimeError("failed to generate content"))
+    
+    stats = controller.get_stats()
+    assert stats["state"] == CIRCUIT_CLOSED
+    assert stats["limit"] == 4
+    assert stats["circuit_opens"] == 0
+
+
+def test_rate_limit_error_opens_circuit():
+    controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=4, base_cooldown=60)
+    
+    _release_after(controller, ResourceExhausted("Resource has been exhausted"))
+    
+    stats = controller.get_stats()
+    assert stats["state"] == CIRCUIT_OPEN
+    assert stats["limit"] == 2
@@ -0,0 +1,80 @@
+"""
+Tests del parser incremental de arrays JSON (src/core/ai/json_stream.py).
+
+Uso:
+    python -m pytest tests/test_json_stream.py
+"""
+
+import json
+
+import pytest
+
+from src.core.ai.json_stream import JsonArrayStreamParser
+
+
+def _feed_chunks(chunks):
+    """Alimenta los fragmentos en orden y retorna (objetos decodificados, parser)."""
+    parser = JsonArrayStreamParser()
+    objects = []
+    for chunk in chunks:
+        objects.extend(json.loads(text) for text in parser.feed(chunk))
+    return objects, parser
+
+
+def test_objects_are_emitted_as_soon_as_they_close():
+    parser = JsonArrayStreamParser()
+    
+    assert parser.feed('[{"a": 1}, {"b"') == ['{"a": 1}']
+    assert parser.feed(': 2}]') == ['{"b": 2}']
+    assert not parser.has_pending
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_split_at_any_position(size):
+    text = json.dumps([{"id": i, "frase": f"texto {i}", "lista": [1, {"x": i}]} for i in range(5)])
+    chunks = [text[start:start + size] for start in range(0, len(text), size)]
+    
+    objects, parser = _feed_chunks(chunks)
+    
+    assert objects == json.loads(text)
+    assert not parser.has_pending
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    items = [
+        {"frase": 'dijo "no {tenemos} tiempo" ]['},
+        {"frase": "barra final \\", "otro": "}"},
+        {"frase": "unicode ñ y \\\" escapado"},
+    ]
+    text = json.dumps(items, ensure_ascii=False)
+    
+    objects, parser = _feed_chunks([text[:13], text[13:40], text[40:]])
+    
+    assert objects == items
+    assert not parser.has_pending
+
+
+def test_escape_split_across_chunks():
+    objects, _ = _feed_chunks(['[{"frase": "a\\', '"b"}]'])
+    
+    assert objects == [{"frase": 'a"b'}]
+
+
+def test_truncated_array_keeps_closed_objects():
+    objects, parser = _feed_chunks(['[{"id": 1}, {"id": 2, "frase": "corta'])
+    
+    assert objects == [{"id": 1}]
+    assert parser.has_pending
+
+
+def test_non_object_elements_are_ignored():
+    objects, _ = _feed_chunks(['[1, "texto {", null, {"id": 3}, [4]]'])
+    
+    assert objects == [{"id": 3}]
+
+
+def test_single_object_without_array():
+    objects, parser = _feed_chunks(['{"id": 1, "anidado": {"a": [1, 2]}}'])
+    
+    assert objects == [{"id": 1, "anidado": {"a": [1, 2]}}]
+    assert not parser.has_pending
@@ -0,0 +1,83 @@
+"""
+Tests de la pre-extracción local de volumen (src/core/ai/local_extractor.py).
+
+Uso:
+    python -m pytest tests/test_local_extractor.py
+"""
+
+import pytest
+
+from src.core.ai.defaults import PRE_EXTRACTION_MIN_CONFIDENCE
+from src.core.ai.local_extractor import extract_local_fields, get_confident_fields
+
+
+@pytest.mark.parametrize("transcript, weekly, level", [
+    ("Recibimos 1,5 mil mensajes al mes", 375, "Alto (251-500)"),
+    ("Son unas 2.5 mil consultas semanales", 2500, "Muy Alto (>500)"),
+    ("Recibimos 1.500 mensajes al mes", 375, "Alto (251-500)"),
+    ("Recibimos cerca de 80 consultas diarias por WhatsApp", 560, "Muy Alto (>500)"),
+    ("Manejamos 120 mensajes de WhatsApp por día", 840, "Muy Alto (>500)"),
+])
+def test_interaction_counts_are_confident(transcript, weekly, level):
+    fields = get_confident_fields(extract_local_fields(transcript))
+    
+    assert fields["volumen_numerico"] == weekly
+    assert fields["volumen_nivel"] == level
+
+
+@pytest.mark.parametrize("transcript", [
+    "Tenemos 30 agentes trabajando por día",
+    "Abrimos 7 días a la semana",
+])
+def test_counts_without_interaction_noun_are_not_confident(transcript):
+    extraction = extract_local_fields(transcript)
+    
+    assert extraction["volumen_numerico"]["confidence"] < PRE_EXTRACTION_MIN_CONFIDENCE
+    assert "volumen_numerico" not in get_confident_fields(extraction)
+    assert "volumen_nivel" not in get_confident_fields(extraction)
+
+
+def test_count_without_interaction_noun_does_not_mask_a_real_one():
+    fields = get_confident_fields(extract_local_fields(
+        "Abrimos 7 días a la semana y recibimos 300 mensajes semanales"
+    ))
+    
+    assert fields["volumen_numerico"] == 300
+
+
+@pytest.mark.parametrize("transcript", [
+    "Tenemos muchos mensajes duplicados en el CRM",
+    "Queremos promocionar el producto",
+])
+def test_peak_words_inside_other_words_are_not_peaks(transcript):
+    assert extract_local_fields(transcript)["es_pico_estacional"]["value"] is False
+
+
+@pytest.mark.parametrize("transcript", [
+    "En temporada alta el volumen se duplica",
+    "Con las promociones tenemos picos",
+    "En diciembre las consultas se triplicaron",
+])
+def test_peak_words_are_detected(transcript):
+    fields = get_confident_fields(extract_local_fields(transcript))
+    
+    assert fields["es_pico_estacional"] is True
+
+
+@pytest.mark.parametrize("transcript", [
+    "Recibimos 200 mensajes y 50 consultas diarias",
+    "Tenemos 3 llamadas a la semana con el directorio",
+])
+def test_ambiguous_counts_are_not_confident(transcript):
+    extraction = extract_local_fields(transcript)
+    
+    assert extraction["volumen_numerico"]["confidence"] < PRE_EXTRACTION_MIN_CONFIDENCE
+    assert "volumen_nivel" not in get_confident_fields(extraction)
+
+
+def test_count_in_another_sentence_does_not_lower_confidence():
+    fields = get_confident_fields(extract_local_fields(
+        "Tenemos 2 mensajes pendientes de ayer. Recibimos 300 mensajes semanales."
+    ))
+    
+    assert fields["volumen_numerico"] == 300
@@ -0,0 +1,80 @@
+"""
+Tests de la migración del schema (src/core/database/schema.py).
+
+Uso:
+    python -m pytest tests/test_schema.py
+"""
+
+import sqlite3
+
+from src.core.database import init_database
+from src.core.database.config import DB_PATH
+from src.core.database.connection import get_connection
+
+
+def _create_legacy_database(rows):
+    """Crea clients como en las versiones sin índice único ni categorization_version."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("""
+        CREATE TABLE clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_name TEXT NOT NULL,
+            correo_electronico TEXT,
+            numero_telefono TEXT,
+            fecha_reunion TEXT,
+            vendedor_asignado TEXT,
+            closed INTEGER,
+            transcript TEXT NOT NULL,
+            sector_principal TEXT,
+            sector_secundario TEXT,
+            volumen_numerico INTEGER,
+            volumen_nivel TEXT,
+            es_pico_estacional INTEGER,
+            fuente_primaria TEXT,
+            fuente_detalle TEXT,
+            preocupaciones TEXT,
+            urgencia_nivel TEXT,
+            potencial_upsell TEXT,
+            categorization_success INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO clients (client_name, correo_electronico, fecha_reunion, transcript) VALUES (?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_migration_moves_duplicates_to_backup(temp_db):
+    _create_legacy_database([
+        ("Ana", "ana@x.com", "2024-01-01", "primera"),
+        ("Ana", "ana@x.com", "2024-01-01", "repetida"),
+        ("Ana", "ana@x.com", "2024-01-01", "repetida otra vez"),
+        ("Ana", "ana@x.com", "2024-02-01", "otra reunión"),
+        ("Bruno", None, "2024-01-01", "sin correo"),
+        ("Bruno", None, "2024-01-01", "sin correo, no es repetida"),
+    ])
+    
+    assert init_database() == 2
+    
+    conn = get_connection()
+    kept = [row[0] for row in conn.execute("SELECT transcript FROM clients ORDER BY id")]
+    backup = [row[0] for row in conn.execute("SELECT transcript FROM clients_duplicates_backup ORDER BY id")]
+    assert kept == ["primera", "otra reunión", "sin correo", "sin correo, no es repetida"]
+    assert backup == ["repetida", "repetida otra vez"]
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_clients_natural_key'"
+    ).fetchone()
+
+
+def test_migration_runs_once(temp_db):
+    _create_legacy_database([
+        ("Ana", "ana@x.com", "2024-01-01", "primera"),
+        ("Ana", "ana@x.com", "2024-01-01", "repetida"),
+    ])
+    
+    assert init_database() == 1
+    assert init_database() == 0
@@ -0,0 +1,56 @@
+"""
+Tests del snapshot Arrow del dataset procesado (src/core/database/snapshot.py).
+
+Uso:
+    python -m pytest tests/test_snapshot.py
+"""
+
+import pandas as pd
+import pytest
+
+from scripts.benchmark_database import build_processed
+from src.core.database import save_processed_data
+from src.core.database.connection import get_connection, transaction
+from src.core.database.crud import _load_from_database
+from src.core.database.snapshot import bump_generation, get_generation, read_snapshot, write_snapshot
+
+
+@pytest.fixture
+def df_loaded(temp_db):
+    """Guarda leads con preocupaciones y upsell y los retorna como los lee SQLite."""
+    df = build_processed(12)
+    df["preocupaciones"] = [
+        [{"tipo": "Integración", "impacto": "Alto", "ejemplo_frase": f"frase {i}"}] * (i % 3)
+        for i in range(len(df))
+    ]
+    df["potencial_upsell"] = [["Voicebot", "Analytics"][:i % 3] for i in range(len(df))]
+    df["volumen_numerico"] = [None if i % 4 == 0 else i * 100 for i in range(len(df))]
+    save_processed_data(df)
+    return _load_from_database(get_connection())
+
+
+def test_round_trip_preserves_dtypes_and_lists(df_loaded):
+    generation = get_generation(get_connection())
+    write_snapshot(df_loaded, generation)
+    
+    df = read_snapshot(generation)
+    
+    pd.testing.assert_frame_equal(df, df_loaded)
+    for column in ("preocupaciones", "potencial_upsell"):
+        assert all(isinstance(value, list) for value in df[column])
+        assert df[column].tolist() == df_loaded[column].tolist()
+
+
+def test_other_generation_is_ignored(df_loaded):
+    generation = get_generation(get_connection())
+    write_snapshot(df_loaded, generation)
+    
+    assert read_snapshot(generation + 1) is None
+    
+    with transaction() as conn:
+        bump_generation(conn)
+    assert read_snapshot(get_generation(get_connection())) is None
+
+
+def test_missing_snapshot_is_ignored(df_loaded):
+    assert read_snapshot(get_generation(get_connection())) is None
@@ -0,0 +1,126 @@
+"""
+Tests de la cola de categorización (src/core/database/work_queue.py).
+
+Uso:
+    python -m pytest tests/test_work_queue.py
+"""
+
+import threading
+import time
+
+from src.core.ai import worker
+from src.core.database.connection import get_connection
+from src.core.database.config import QUEUE_MAX_ATTEMPTS
+from src.core.database.work_queue import (
+    claim_items,
+    complete_items,
+    enqueue_items,
+    extend_leases,
+    get_queue_counts
+)
+
+
+def _enqueue(job_id="job", count=4):
+    enqueue_items(job_id, [(i, f"Cliente {i}", f"Transcripción {i}") for i in range(count)])
+
+
+def _claimed_at(job_id="job"):
+    return dict(get_connection().execute(
+        "SELECT item_index, claimed_at FROM categorization_queue WHERE job_id = ?", (job_id,)
+    ).fetchall())
+
+
+def _age_leases(seconds, job_id="job"):
+    get_connection().execute(
+        "UPDATE categorization_queue SET claimed_at = claimed_at - ? WHERE job_id = ?", (seconds, job_id)
+    )
+
+
+def test_claim_is_exclusive_and_limited(temp_db):
+    _enqueue()
+    
+    job_id, first = claim_items("w1", 3)
+    _, second = claim_items("w2", 3)
+    
+    assert job_id == "job"
+    assert [index for index, _, _ in first] == [0, 1, 2]
+    assert [index for index, _, _ in second] == [3]
+    assert claim_items("w3", 3) == (None, [])
+    assert get_queue_counts("job")["processing"] == 4
+
+
+def test_expired_lease_is_reclaimed(temp_db):
+    _enqueue(count=2)
+    claim_items("w1", 2, lease_seconds=60)
+    
+    assert claim_items("w2", 2, lease_seconds=60) == (None, [])
+    
+    _age_leases(120)
+    _, reclaimed = claim_items("w2", 2, lease_seconds=60)
+    assert [index for index, _, _ in reclaimed] == [0, 1]
+
+
+def test_expired_lease_without_attempts_left_fails(temp_db):
+    _enqueue(count=1)
+    for _ in range(QUEUE_MAX_ATTEMPTS):
+        claim_items("w1", 1, lease_seconds=60)
+        _age_leases(120)
+    
+    assert claim_items("w2", 1, lease_seconds=60) == (None, [])
+    assert get_queue_counts("job")["failed"] == 1
+
+
+def test_completion_is_guarded_by_lease_owner(temp_db):
+    _enqueue()
+    claim_items("w1", 4, lease_seconds=60)
+    _age_leases(120)
+    claim_items("w2", 4, lease_seconds=60)
+    
+    # w1 perdió el lease: no pisa el reclamo de w2
+    assert complete_items("job", "w1", succeeded=[0, 1], failed=[2, 3]) == 0
+    assert get_queue_counts("job")["processing"] == 4
+    
+    assert complete_items("job", "w2", succeeded=[0, 1], failed=[2, 3]) == 4
+    counts = get_queue_counts("job")
+    assert (counts["done"], counts["pending"], counts["processing"]) == (2, 2, 0)
+
+
+def test_completion_does_not_overwrite_cancellation(temp_db):
+    _enqueue(count=2)
+    claim_items("w1", 2)
+    get_connection().execute("UPDATE categorization_queue SET status = 'cancelled'")
+    
+    assert complete_items("job", "w1", succeeded=[0], failed=[1]) == 0
+    assert get_queue_counts("job")["cancelled"] == 2
+
+
+def test_extend_leases_only_touches_own_items(temp_db):
+    _enqueue()
+    claim_items("w1", 2, lease_seconds=60)
+    claim_items("w2", 2, lease_seconds=60)
+    _age_leases(120)
+    before = _claimed_at()
+    
+    assert extend_leases("w1") == 2
+    
+    after = _claimed_at()
+    assert after[0] > before[0] and after[1] > before[1]
+    assert (after[2], after[3]) == (before[2], before[3])
+    _, reclaimed = claim_items("w3", 4, lease_seconds=60)
+    assert [index for index, _, _ in reclaimed] == [2, 3]
+
+
+def test_heartbeat_loop_renews_leases(temp_db, monkeypatch):
+    _enqueue(count=2)
+    claim_items("w1", 2, lease_seconds=60)
+    _age_leases(120)
+    monkeypatch.setattr(worker, "WORKER_HEARTBEAT_TIMEOUT", 0.03)
+    
+    stopped = threading.Event()
+    heartbeat = threading.Thread(target=worker._heartbeat_loop, args=("w1", stopped))
+    heartbeat.start()
+    time.sleep(0.1)
+    stopped.set()
+    heartbeat.join()
+    
+    assert claim_items("w2", 2, lease_seconds=60) == (None, [])
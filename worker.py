@@ -0,0 +1,87 @@
+"""
+⚙️ WORKER DE CATEGORIZACIÓN
+Procesa la cola de transcripciones fuera del proceso de Streamlit.
+
+Cuando hay al menos un worker activo, la app solo encola las
+transcripciones y muestra el progreso. Se pueden levantar varios
+workers en paralelo en la misma máquina; como comparten la API key,
+conviene repartir la cuota con --rpm/--tpm.
+
+Uso:
+    python worker.py
+    python worker.py --rpm 5 --threads 2     # 3 workers con 15 RPM en total
+    python worker.py --once                  # vacía la cola y termina
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+
+from src.core.ai.config import GEMINI_API_KEY, configure_gemini
+from src.core.ai.defaults import (
+    MAX_BATCH_ITEMS,
+    MAX_CONCURRENT_BATCHES,
+    REQUESTS_PER_MINUTE,
+    TOKENS_PER_MINUTE
+)
+from src.core.ai.concurrency import configure_concurrency_controller
+from src.core.ai.rate_limiter import configure_rate_limiter
+from src.core.ai.worker import run_worker
+
+
+def parse_args() -> argparse.Namespace:
+    """Define los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Worker de categorización con Gemini")
+    parser.add_argument("--threads", type=int, default=MAX_CONCURRENT_BATCHES,
+                        help="Batches en paralelo dentro del worker")
+    parser.add_argument("--claim-size", type=int, default=MAX_BATCH_ITEMS * MAX_CONCURRENT_BATCHES,
+                        help="Transcripciones que se reclaman de la cola por vez")
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE,
+                        help="Requests por minuto asignados a este worker")
+    parser.add_argument("--tpm", type=int, default=TOKENS_PER_MINUTE,
+                        help="Tokens por minuto asignados a este worker")
+    parser.add_argument("--once", action="store_true",
+                        help="Terminar cuando la cola quede vacía")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Configura Gemini y procesa la cola hasta recibir SIGINT/SIGTERM."""
+    args = parse_args()
+    
+    if not GEMINI_API_KEY:
+        print("⚠️ GEMINI_API_KEY no está configurada. Por favor, configura la variable de entorno.")
+        sys.exit(1)
+    
+    configure_gemini()
+    configure_rate_limiter(args.rpm, args.tpm)
+    configure_concurrency_controller(args.threads, max_limit=args.threads)
+    
+    stop_requested = False
+    
+    def request_stop(signum, frame):
+        nonlocal stop_requested
+        stop_requested = True
+        print("🛑 Terminando después del grupo en curso...")
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"🚀 Worker {worker_id} esperando transcripciones ({args.rpm} RPM, {args.threads} hilos)")
+    
+    total = run_worker(
+        worker_id,
+        claim_size=args.claim_size,
+        max_workers=args.threads,
+        exit_when_idle=args.once,
+        should_stop=lambda: stop_requested
+    )
+    
+    print(f"👋 Worker {worker_id} terminado: {total} transcripciones categorizadas")
+
+
+if __name__ == "__main__":
+    main()